@@ -0,0 +1,81 @@
+"""
+Run the benchmarks, or compare two sets of results.
+
+Examples::
+
+    python -m benchmarks run --output baseline.json
+    python -m benchmarks run --output current.json --baseline baseline.json
+    python -m benchmarks compare baseline.json current.json
+    python -m benchmarks list
+"""
+import argparse
+import sys
+
+from benchmarks import runner
+from benchmarks.cases import all_cases
+
+
+def main(argv=None) -> int:
+    """Run the command line interface, and return the exit status."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="measure the benchmarks")
+    run.add_argument("-k", dest="select", action="append", default=[],
+                     help="only run the cases whose names contain this string (repeatable)")
+    run.add_argument("--repeat", type=int, default=5, help="timed runs per case (default: 5)")
+    run.add_argument("--output", help="save the results to this json file")
+    run.add_argument("--baseline", help="compare the results to this json file")
+    _add_thresholds(run)
+
+    compare = commands.add_parser("compare", help="compare results against a baseline")
+    compare.add_argument("baseline", help="the json file to compare against")
+    compare.add_argument("current", help="the json file with the new results")
+    _add_thresholds(compare)
+
+    commands.add_parser("list", help="list the benchmark cases")
+
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        for case in all_cases():
+            print(case.name)
+        return 0
+    if args.command == "run":
+        cases = [case for case in all_cases()
+                 if not args.select or any(s in case.name for s in args.select)]
+        results = runner.run_suite(cases, repeat=args.repeat, log=print)
+        if args.output:
+            runner.save(results, args.output)
+        if args.baseline:
+            return _compare(runner.load(args.baseline), results, args)
+        return 0
+    if args.command == "compare":
+        return _compare(runner.load(args.baseline), runner.load(args.current), args)
+    parser.print_help()
+    return 2
+
+
+def _add_thresholds(parser: argparse.ArgumentParser) -> None:
+    """Add the options that set what counts as a regression."""
+    parser.add_argument("--time-threshold", type=float, default=0.2,
+                        help="fractional slowdown that is a regression (default: 0.2)")
+    parser.add_argument("--memory-threshold", type=float, default=0.2,
+                        help="fractional increase in peak memory that is a regression "
+                             "(default: 0.2)")
+
+
+def _compare(baseline, current, args) -> int:
+    """Print the comparison, and return 1 if anything regressed."""
+    lines, regressions = runner.compare(baseline, current,
+                                        time_threshold=args.time_threshold,
+                                        memory_threshold=args.memory_threshold)
+    print("\n".join(lines))
+    if regressions:
+        print("{} regression(s): {}".format(len(regressions), ", ".join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
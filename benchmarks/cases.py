@@ -0,0 +1,220 @@
+"""The benchmark cases, built on the cake, Strehlow & Cook and synthetic demos at some scales."""
+import json
+import statistics
+import subprocess
+import sys
+from typing import Callable, Dict, List
+
+from benchmarks.runner import measure
+
+CAKE_SCALES = (1, 10, 100)  # The number of cakes, each with its own seed
+STREHLOW_SCALES = ("small", "full")  # The table to build the compounds from
+SYNTHETIC_SCALES = (1000, 10000)  # The number of materials in a synthetic history
+
+_IMPORT_SCRIPT = """
+import json, sys, time, tracemalloc
+if sys.argv[1:] == ["trace"]:
+    tracemalloc.start()
+start = time.perf_counter()
+import gemd.json, gemd.util, gemd.demo.cake
+elapsed = time.perf_counter() - start
+print(json.dumps({"time": elapsed, "peak_memory": tracemalloc.get_traced_memory()[1]}))
+"""
+
+
+class Case(object):
+    """
+    A benchmark case.
+
+    :param name: the name of the case, e.g. "dump/cake-10"
+    :param setup: a function that prepares the inputs, which are not measured, and returns the
+        function to measure
+    """
+
+    def __init__(self, name: str, setup: Callable[[], Callable[[], None]]):
+        self.name = name
+        self.setup = setup
+
+    def measure(self, *, repeat: int) -> Dict[str, float]:
+        """Measure the case; see :func:`benchmarks.runner.measure`."""
+        return measure(self.setup(), repeat=repeat)
+
+
+class ImportCase(Case):
+    """Importing the package, which is measured in a fresh interpreter each time."""
+
+    def __init__(self):
+        Case.__init__(self, "import", setup=None)
+
+    def measure(self, *, repeat: int) -> Dict[str, float]:
+        """Measure the import in `repeat` subprocesses, and one more that traces memory."""
+        times = [_run_import()["time"] for _ in range(repeat)]
+        return {"time": statistics.median(times), "min_time": min(times),
+                "peak_memory": _run_import("trace")["peak_memory"]}
+
+
+def _run_import(*args: str) -> Dict[str, float]:
+    """Import the package in a new interpreter."""
+    output = subprocess.check_output([sys.executable, "-c", _IMPORT_SCRIPT] + list(args))
+    return json.loads(output.decode())
+
+
+def all_cases() -> List[Case]:
+    """Get every benchmark case, in the order they should be run."""
+    cases = [ImportCase()]
+    datasets = [("cake-{}".format(n), _cake_builder(n)) for n in CAKE_SCALES] + \
+        [("strehlow-{}".format(size), _strehlow_builder(size)) for size in STREHLOW_SCALES]
+    for label, build in datasets:
+        cases.extend(_graph_cases(label, build))
+    for size in STREHLOW_SCALES:
+        cases.append(Case("table/strehlow-{}".format(size), _table_setup(size)))
+    cases.append(Case("parse_units", _parse_units_setup))
+    for count in SYNTHETIC_SCALES:
+        cases.extend(_synthetic_cases(count))
+    return cases
+
+
+def _graph_cases(label: str, build: Callable) -> List[Case]:
+    """The cases that operate on a graph of objects."""
+    from gemd.json import GEMDJson
+    from gemd.util import flatten, recursive_foreach, set_uuids, substitute_links
+
+    def construct():
+        return build
+
+    def dump():
+        obj = build()
+        return lambda: GEMDJson().dumps(obj)
+
+    def load():
+        dumped = GEMDJson().dumps(build())
+        return lambda: GEMDJson().loads(dumped)
+
+    def copy():
+        obj = build()
+        return lambda: GEMDJson().copy(obj)
+
+    def flatten_():
+        obj = build()
+        return lambda: flatten(obj, "benchmark")
+
+    def substitute_links_():
+        obj = build()
+        set_uuids(obj, "benchmark")
+        entities = []
+        recursive_foreach(obj, entities.append)
+        return lambda: [substitute_links(entity) for entity in entities]
+
+    def validate():
+        checks = _bounds_checks(build())
+        return lambda: [bounds.contains(value) for bounds, value in checks]
+
+    return [Case("{}/{}".format(name, label), setup) for name, setup in [
+        ("construct", construct), ("dump", dump), ("load", load), ("copy", copy),
+        ("flatten", flatten_), ("substitute_links", substitute_links_), ("validate", validate)
+    ]]
+
+
+def _cake_builder(count: int) -> Callable:
+    """Get a function that makes `count` cakes, with seeds 0 to count - 1."""
+    def build():
+        from gemd.demo.cake import make_cake
+        return [make_cake(seed=seed) for seed in range(count)]
+    return build
+
+
+def _strehlow_builder(size: str) -> Callable:
+    """Get a function that makes the Strehlow & Cook compounds from one of the tables."""
+    tables = []  # The table is read on the first build, and reused
+
+    def build():
+        from gemd.demo.strehlow_and_cook import import_table, make_strehlow_objects, \
+            FULL_TABLE, SMALL_TABLE
+        if not tables:
+            tables.append(import_table(FULL_TABLE if size == "full" else SMALL_TABLE))
+        return make_strehlow_objects(tables[0])
+    return build
+
+
+def _table_setup(size: str) -> Callable:
+    """Set up building the training table for the Strehlow & Cook compounds."""
+    def setup():
+        from gemd.demo.strehlow_and_cook import make_strehlow_table
+        compounds = _strehlow_builder(size)()
+        return lambda: make_strehlow_table(compounds)
+    return setup
+
+
+def _synthetic_cases(materials: int) -> List[Case]:
+    """The cases on a synthetic history, which has about 7 entities per material."""
+    from gemd.json import GEMDJson
+
+    def build():
+        from gemd.demo.synthetic import make_synthetic_history
+        return make_synthetic_history(materials, seed=0)
+
+    def load():
+        dumped = GEMDJson().dumps(build())
+        return lambda: GEMDJson().loads(dumped)
+
+    def copy():
+        history = build()
+        return lambda: GEMDJson().copy(history)
+
+    def history_index():
+        from gemd.util import HistoryIndex
+        history = build()
+        return lambda: HistoryIndex(history, specs=True)
+
+    return [Case("{}/synthetic-{}".format(name, materials), setup) for name, setup in [
+        ("load", load), ("copy", copy), ("history_index", history_index)
+    ]]
+
+
+def _parse_units_setup() -> Callable:
+    """Set up parsing the units of every real value in the demos, as ingest would."""
+    from gemd.entity.value.continuous_value import ContinuousValue
+    from gemd.units import parse_units
+    from gemd.util import recursive_foreach
+
+    unit_strings = []
+
+    def collect(entity):
+        for _, value in _attributes(entity):
+            if isinstance(value, ContinuousValue):
+                unit_strings.append(value.units)
+
+    recursive_foreach([_cake_builder(10)(), _strehlow_builder("small")()], collect)
+    return lambda: [parse_units(units) for units in unit_strings]
+
+
+def _bounds_checks(obj) -> List:
+    """Get the (template bounds, value) pair of every attribute with a template and value."""
+    from gemd.entity.template.attribute_template import AttributeTemplate
+    from gemd.util import recursive_foreach
+
+    checks = []
+
+    def collect(entity):
+        for template, value in _attributes(entity):
+            if isinstance(template, AttributeTemplate) and value is not None:
+                checks.append((template.bounds, value))
+
+    recursive_foreach(obj, collect)
+    return checks
+
+
+def _attributes(entity) -> List:
+    """Get the (template, value) pair of every attribute of a spec or run."""
+    from gemd.entity.object.base_object import BaseObject
+
+    attributes = []
+    if not isinstance(entity, BaseObject):  # Templates list attribute templates instead
+        return attributes
+    for name in ("properties", "conditions", "parameters"):
+        for attribute in getattr(entity, name, []):
+            # PropertyAndConditions holds a property and its conditions
+            for attr in [getattr(attribute, "property", attribute)] + \
+                    list(getattr(attribute, "conditions", [])):
+                attributes.append((attr.template, attr.value))
+    return attributes
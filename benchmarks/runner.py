@@ -0,0 +1,126 @@
+"""Measure benchmark cases, and save and compare the results."""
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+
+def measure(run: Callable[[], None], *, repeat: int = 5) -> Dict[str, float]:
+    """
+    Time a function and measure the peak memory it allocates.
+
+    The function is timed `repeat` times with the garbage collector running as usual, and then
+    run once more with allocations traced, since tracing slows it down.
+
+    :param run: the function to measure
+    :param repeat: the number of timed runs
+    :return: the median and minimum time in seconds, and the peak memory in bytes
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"time": statistics.median(times), "min_time": min(times), "peak_memory": peak}
+
+
+def run_suite(cases, *, repeat: int = 5, log=None) -> Dict:
+    """
+    Measure a list of cases.
+
+    :param cases: the :class:`Case <benchmarks.cases.Case>` objects to measure
+    :param repeat: the number of timed runs of each case
+    :param log: optional function to call with a line of progress for each case
+    :return: the results, in the format that :func:`save` writes
+    """
+    results = {}
+    for case in cases:
+        results[case.name] = case.measure(repeat=repeat)
+        if log is not None:
+            log(_format_result(case.name, results[case.name]))
+    return {"meta": _metadata(repeat), "results": results}
+
+
+def save(results: Dict, path: str) -> None:
+    """Write results to a json file."""
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load(path: str) -> Dict:
+    """Read results from a json file."""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare(baseline: Dict, current: Dict, *, time_threshold: float = 0.2,
+            memory_threshold: float = 0.2) -> Tuple[List[str], List[str]]:
+    """
+    Compare results against a baseline.
+
+    :param baseline: the results to compare against
+    :param current: the new results
+    :param time_threshold: the fractional increase in median time that is a regression
+    :param memory_threshold: the fractional increase in peak memory that is a regression
+    :return: a line for each case in both results, with the regressions marked, and the
+        names of the cases that regressed
+    """
+    lines, regressions = [], []
+    for name in sorted(set(baseline["results"]) & set(current["results"])):
+        old, new = baseline["results"][name], current["results"][name]
+        time_ratio = _ratio(new["time"], old["time"])
+        memory_ratio = _ratio(new["peak_memory"], old["peak_memory"])
+        regressed = []
+        if time_ratio > 1 + time_threshold:
+            regressed.append("time")
+        if memory_ratio > 1 + memory_threshold:
+            regressed.append("memory")
+        if regressed:
+            regressions.append(name)
+        lines.append("{:<40} time {:>7.2f}x  memory {:>7.2f}x  {}".format(
+            name, time_ratio, memory_ratio,
+            "REGRESSION ({})".format(", ".join(regressed)) if regressed else "").rstrip())
+    return lines, regressions
+
+
+def _ratio(new: float, old: float) -> float:
+    """Get the ratio of a new measurement to an old one, allowing for zeros."""
+    if old == 0:
+        return 1.0 if new == 0 else float("inf")
+    return new / old
+
+
+def _format_result(name: str, result: Dict[str, float]) -> str:
+    """Format the result of a case as a line of progress."""
+    return "{:<40} {:>10.4f} s  {:>10.1f} KiB".format(
+        name, result["time"], result["peak_memory"] / 1024)
+
+
+def _metadata(repeat: int) -> Dict:
+    """Describe the environment that the results were measured in."""
+    try:
+        import pkg_resources
+        version = pkg_resources.get_distribution("gemd").version
+    except Exception:  # Not installed, e.g. running from a checkout
+        version = None
+    return {
+        "gemd_version": version,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": datetime.now().isoformat(),
+        "repeat": repeat,
+    }
@@ -0,0 +1,32 @@
+"""Test that the benchmark cases can be set up and run."""
+from benchmarks import cases
+
+
+def test_all_cases(monkeypatch):
+    """Test that every case runs, at the smallest scale of each dataset."""
+    monkeypatch.setattr(cases, "CAKE_SCALES", (1,))
+    monkeypatch.setattr(cases, "STREHLOW_SCALES", ("small",))
+    monkeypatch.setattr(cases, "SYNTHETIC_SCALES", (10,))
+    names = [case.name for case in cases.all_cases()]
+    assert len(names) == len(set(names)), "Case names should be unique"
+    assert "history_index/synthetic-10" in names
+
+    for case in cases.all_cases():
+        if isinstance(case, cases.ImportCase):
+            result = case.measure(repeat=1)
+            assert result["time"] > 0 and result["peak_memory"] > 0
+        else:
+            case.setup()()
+
+
+def test_measure():
+    """Test that a case measures the function returned by its setup."""
+    prepared = []
+
+    def setup():
+        prepared.append(True)
+        return lambda: None
+
+    result = cases.Case("noop", setup).measure(repeat=2)
+    assert prepared == [True]
+    assert set(result) == {"time", "min_time", "peak_memory"}
@@ -0,0 +1,63 @@
+"""Test the command line interface of the benchmarks."""
+import json
+
+import pytest
+
+from benchmarks import __main__ as cli
+from benchmarks.cases import Case
+
+
+@pytest.fixture
+def cases(monkeypatch):
+    """Replace the benchmark cases with a few that are fast to measure."""
+    measured = []
+
+    def setup(name):
+        return lambda: lambda: measured.append(name)
+
+    fake = [Case(name, setup(name)) for name in ("dump/small", "load/small", "copy/small")]
+    monkeypatch.setattr(cli, "all_cases", lambda: fake)
+    return measured
+
+
+def test_list(cases, capsys):
+    """Test that list prints the name of every case."""
+    assert cli.main(["list"]) == 0
+    assert capsys.readouterr().out.split() == ["dump/small", "load/small", "copy/small"]
+
+
+def test_run(cases, capsys, tmpdir):
+    """Test that run measures the selected cases, and saves and compares the results."""
+    output = str(tmpdir.join("current.json"))
+    assert cli.main(["run", "-k", "dump", "-k", "copy", "--repeat", "1",
+                     "--output", output]) == 0
+    assert sorted(set(cases)) == ["copy/small", "dump/small"]
+    with open(output) as f:
+        assert sorted(json.load(f)["results"]) == ["copy/small", "dump/small"]
+    capsys.readouterr()
+
+    assert cli.main(["run", "-k", "load", "--repeat", "1", "--baseline", output]) == 0
+    assert capsys.readouterr().out.split()[0] == "load/small", "No cases in common"
+
+
+def test_compare(capsys, tmpdir):
+    """Test that compare exits with status 1 only if something regressed."""
+    def write(name, time, memory):
+        path = str(tmpdir.join(name))
+        with open(path, "w") as f:
+            json.dump({"meta": {}, "results": {"case": {
+                "time": time, "min_time": time, "peak_memory": memory}}}, f)
+        return path
+
+    baseline = write("baseline.json", 1.0, 100)
+    slower = write("slower.json", 2.0, 100)
+    assert cli.main(["compare", baseline, slower]) == 1
+    assert "1 regression(s): case" in capsys.readouterr().out
+    assert cli.main(["compare", baseline, slower, "--time-threshold", "1.5"]) == 0
+    assert "REGRESSION" not in capsys.readouterr().out
+
+
+def test_no_command(capsys):
+    """Test that the usage is printed without a command."""
+    assert cli.main([]) == 2
+    assert "usage: python -m benchmarks" in capsys.readouterr().out
@@ -0,0 +1,71 @@
+"""Test measuring, saving and comparing benchmark results."""
+import pytest
+
+from benchmarks import runner
+from benchmarks.cases import Case
+
+
+def _results(**cases):
+    """Make results with the given (time, peak_memory) of each case."""
+    return {"meta": {}, "results": {name: {"time": t, "min_time": t, "peak_memory": m}
+                                    for name, (t, m) in cases.items()}}
+
+
+def test_measure():
+    """Test that a function is timed, and its peak allocation is traced."""
+    calls = []
+
+    def run():
+        calls.append([0] * 100000)
+
+    result = runner.measure(run, repeat=3)
+    assert len(calls) == 4, "Three timed runs and one traced run"
+    assert 0 <= result["min_time"] <= result["time"]
+    assert result["peak_memory"] >= 100000 * 8
+
+
+def test_run_suite(tmpdir):
+    """Test that every case is measured and logged, and that results survive a round trip."""
+    cases = [Case("a", lambda: lambda: None), Case("b", lambda: lambda: sum(range(100)))]
+    lines = []
+    results = runner.run_suite(cases, repeat=2, log=lines.append)
+    assert sorted(results["results"]) == ["a", "b"]
+    assert [line.split()[0] for line in lines] == ["a", "b"]
+    assert results["meta"]["repeat"] == 2
+    assert {"gemd_version", "python", "platform", "timestamp"} <= set(results["meta"])
+
+    path = str(tmpdir.join("results.json"))
+    runner.save(results, path)
+    assert runner.load(path) == results
+
+
+def test_metadata_without_distribution(monkeypatch):
+    """Test that the version is left out when gemd is not installed."""
+    import pkg_resources
+
+    def missing(name):
+        raise pkg_resources.DistributionNotFound(name)
+
+    monkeypatch.setattr(pkg_resources, "get_distribution", missing)
+    assert runner._metadata(1)["gemd_version"] is None
+
+
+def test_compare():
+    """Test that slowdowns and memory increases beyond the thresholds are regressions."""
+    baseline = _results(same=(1.0, 100), slower=(1.0, 100), bigger=(1.0, 100),
+                        zero=(0.0, 0), removed=(1.0, 100))
+    current = _results(same=(1.1, 110), slower=(1.5, 100), bigger=(0.5, 200),
+                       zero=(0.0, 10), added=(1.0, 100))
+    lines, regressions = runner.compare(baseline, current)
+    assert regressions == ["bigger", "slower", "zero"]
+    assert [line.split()[0] for line in lines] == ["bigger", "same", "slower", "zero"]
+    assert lines[1] == "{:<40} time {:>7.2f}x  memory {:>7.2f}x".format("same", 1.1, 1.1)
+    assert lines[0].endswith("REGRESSION (memory)")
+    assert lines[2].endswith("REGRESSION (time)")
+    assert "inf" in lines[3]
+
+    lines, regressions = runner.compare(baseline, current, time_threshold=1.0,
+                                        memory_threshold=float("inf"))
+    assert regressions == []
+    assert runner._ratio(0.0, 0.0) == 1.0
+    assert runner._ratio(2.0, 1.0) == pytest.approx(2.0)
@@ -377,17 +377,19 @@ def make_strehlow_table(compounds):
 
     for comp in compounds:
         row = [comp.spec.name]
-        x = list(filter(lambda y: y.name == chem_tmpl.name, comp.spec.properties))
-        if x:
-            row.append(x[0].value)
+        x = comp.spec.get_property(chem_tmpl.name)
+        if x is not None:
+            row.append(x.value)
         else:
             row.append(None)
 
+        measurement = comp.measurements[0]
         for term in terms:
-            x = list(filter(lambda y: y.name == term,
-                            comp.measurements[0].properties + comp.measurements[0].conditions))
-            if x:
-                row.append(x[0].value)
+            x = measurement.get_property(term)
+            if x is None:
+                x = measurement.get_condition(term)
+            if x is not None:
+                row.append(x.value)
             else:
                 row.append(None)
 
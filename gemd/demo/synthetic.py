@@ -0,0 +1,248 @@
+"""Generate synthetic material histories of arbitrary size and shape, for load testing."""
+import random
+
+from gemd.demo.cake import make_cake_templates, DEMO_SCOPE
+from gemd.entity.attribute import Condition, Parameter, Property, PropertyAndConditions
+from gemd.entity.bounds import CategoricalBounds, CompositionBounds, IntegerBounds, \
+    MolecularStructureBounds, RealBounds
+from gemd.entity.object import IngredientSpec, MaterialSpec, MeasurementRun, MeasurementSpec, \
+    ProcessSpec
+from gemd.entity.util import make_instance
+from gemd.entity.value import NominalCategorical, NominalComposition, NominalInteger, \
+    NominalReal, Smiles
+
+SYNTHETIC_SCOPE = DEMO_SCOPE + '-synthetic'
+
+_MATERIAL_TEMPLATES = ["Generic Material", "Nutritional Material", "Formulaic Material",
+                       "Baked Good", "Dessert"]
+_PROCESS_TEMPLATES = ["Mixing", "Baking", "Icing"]  # Raw materials are made by Procuring
+_MEASUREMENT_TEMPLATES = ["Doneness", "Taste test", "Nutritional Analysis",
+                          "Elemental Analysis"]
+
+
+def make_synthetic_history(materials=100, *, depth=4, fan_in=3, measurements=1,
+                           attribute_density=0.5, template_sharing=1.0, seed=None, tmpl=None,
+                           scope=SYNTHETIC_SCOPE):
+    """
+    Generate a material history with a given size and shape.
+
+    The history is a graph of specs, built with the cake templates, and runs that mirror them,
+    built with :func:`make_instance <gemd.entity.util.make_instance>`.  The materials are
+    arranged in `depth` layers beneath the terminal material, whose sizes grow geometrically
+    with `fan_in`: each process takes about `fan_in` ingredients from the layer below, and
+    reuses materials when that layer is too small.  The materials of the last layer are raw,
+    i.e. procured.  Every entity gets a sequential uid in `scope`, so histories with the same
+    arguments and seed are identical.
+
+    Since nearly every material is an ingredient once, there are about
+    ``materials * (6 + measurements)`` entities, plus the templates; e.g. 1.4 million for
+    200,000 materials with the defaults.  Every entity is kept, so the cyclic garbage
+    collector only slows their creation; wrap the call in :func:`gc_paused
+    <gemd.util.impl.gc_paused>` to build large histories faster.
+
+    Parameters
+    ----------
+    materials: int
+        The number of material specs (and runs), including the terminal material.
+        Must be more than `depth`.
+    depth: int
+        The number of processes between a raw material and the terminal material.
+    fan_in: int
+        The number of ingredients per process.
+    measurements: int
+        The number of measurements of each material run.
+    attribute_density: float
+        The probability that each attribute allowed by the template of an object is given a
+        value, from 0 to 1.
+    template_sharing: float
+        The probability that an object uses one of the shared cake templates, from 0 to 1.
+        Otherwise, it gets a new template with the same attribute templates.
+    seed: int, optional
+        The seed for the random choices.
+    tmpl: dict, optional
+        The templates, as returned by :func:`make_cake_templates
+        <gemd.demo.cake.make_cake_templates>`.
+    scope: str
+        The scope of the uids.
+
+    Returns
+    -------
+    MaterialRun
+        The terminal material run.
+
+    """
+    if depth < 1 or fan_in < 1:
+        raise ValueError("depth and fan_in must be at least 1")
+    if materials <= depth:
+        raise ValueError("There must be more materials ({}) than layers ({})".format(
+            materials, depth))
+    if tmpl is None:
+        tmpl = make_cake_templates()
+    generator = _Generator(rng=random.Random(seed), tmpl=tmpl,
+                           attribute_density=attribute_density,
+                           template_sharing=template_sharing, scope=scope)
+
+    layers = [[generator.material(raw=False)]]
+    for size in _layer_sizes(materials - 1, depth=depth, fan_in=fan_in):
+        layers.append([generator.material(raw=len(layers) == depth) for _ in range(size)])
+    for upper, lower in zip(layers, layers[1:]):
+        generator.connect(upper, lower, fan_in=fan_in)
+
+    terminal = make_instance(layers[0][0])
+    generator.instantiate(terminal, measurements=measurements)
+    return terminal
+
+
+def _layer_sizes(count, *, depth, fan_in):
+    """Split `count` materials into `depth` layers, growing by a factor of `fan_in`."""
+    weights = [fan_in ** k for k in range(1, depth + 1)]
+    total = sum(weights)
+    sizes = [max(1, count * weight // total) for weight in weights]
+    while sum(sizes) < count:
+        sizes[-1] += count - sum(sizes)
+    while sum(sizes) > count:
+        largest = sizes.index(max(sizes))
+        sizes[largest] -= 1
+    return sizes
+
+
+class _Generator(object):
+    """The state of a synthetic history as it is generated."""
+
+    def __init__(self, *, rng, tmpl, attribute_density, template_sharing, scope):
+        self.rng = rng
+        self.tmpl = tmpl
+        self.attribute_density = attribute_density
+        self.template_sharing = template_sharing
+        self.scope = scope
+        self.counts = {}  # prefix -> the number of uids assigned
+        self.categories = {}  # id(bounds) -> sorted categories or components
+        self.measurement_specs = {}  # template name -> measurement spec
+
+    def number(self, prefix):
+        """Get the next number for objects with a prefix."""
+        count = self.counts.get(prefix, 0)
+        self.counts[prefix] = count + 1
+        return count
+
+    def uids(self, prefix):
+        """Get the uids for the next object with a prefix."""
+        return {self.scope: "{}-{}".format(prefix, self.number(prefix))}
+
+    def template(self, name):
+        """Get a template by name, or a new template with the same attribute templates."""
+        template = self.tmpl[name]
+        if self.rng.random() < self.template_sharing:
+            return template
+        kwargs = {attr: getattr(template, attr)
+                  for attr in ("properties", "conditions", "parameters")
+                  if hasattr(template, attr)}
+        return type(template)(name=template.name, uids=self.uids("template"), **kwargs)
+
+    def material(self, *, raw):
+        """Make a material spec and the process spec that makes it."""
+        process_name = "Procuring" if raw else self.rng.choice(_PROCESS_TEMPLATES)
+        process_template = self.template(process_name)
+        number = self.number("material")
+        process = ProcessSpec(
+            name="{} {}".format(process_name, number),
+            uids={self.scope: "process-{}".format(number)},
+            template=process_template,
+            conditions=self.attributes(Condition, process_template.conditions),
+            parameters=self.attributes(Parameter, process_template.parameters)
+        )
+        template = self.template(self.rng.choice(_MATERIAL_TEMPLATES))
+        properties = [PropertyAndConditions(prop)
+                      for prop in self.attributes(Property, template.properties)]
+        return MaterialSpec(name="Material {}".format(number),
+                            uids={self.scope: "material-{}".format(number)},
+                            template=template, process=process, properties=properties)
+
+    def connect(self, upper, lower, *, fan_in):
+        """Add ingredients from the lower layer to the processes of the upper layer."""
+        sources = [[] for _ in upper]
+        # Use every material in the lower layer, and then fill each process up to fan_in
+        for i, material in enumerate(lower):
+            sources[i % len(upper)].append(material)
+        for found in sources:
+            if len(found) < fan_in:
+                used = {id(material) for material in found}
+                candidates = [x for x in self.rng.sample(lower, min(fan_in, len(lower)))
+                              if id(x) not in used]
+                found.extend(candidates[:fan_in - len(found)])
+        for material, ingredients in zip(upper, sources):
+            for ingredient in ingredients:
+                mass_fraction = None
+                if self.rng.random() < self.attribute_density:
+                    mass_fraction = NominalReal(1.0 / len(ingredients), '')
+                IngredientSpec(name=ingredient.name, material=ingredient,
+                               process=material.process, mass_fraction=mass_fraction,
+                               uids=self.uids("ingredient"))
+
+    def instantiate(self, terminal, *, measurements):
+        """Give uids, attributes and measurements to the runs, all reachable from terminal."""
+        from gemd.entity.object import MaterialRun, ProcessRun, IngredientRun
+        from gemd.util import recursive_foreach
+
+        prefixes = {MaterialRun: "material-run", ProcessRun: "process-run",
+                    IngredientRun: "ingredient-run"}
+        runs = []
+        recursive_foreach(terminal, lambda x: runs.append(x) if type(x) in prefixes else None)
+        for run in runs:
+            run.uids = self.uids(prefixes[type(run)])
+            if isinstance(run, ProcessRun):
+                template = run.spec.template
+                run.conditions = self.attributes(Condition, template.conditions)
+                run.parameters = self.attributes(Parameter, template.parameters)
+            elif isinstance(run, MaterialRun):
+                for _ in range(measurements):
+                    self.measurement(run)
+
+    def measurement(self, material):
+        """Make a measurement of a material run."""
+        name = self.rng.choice(_MEASUREMENT_TEMPLATES)
+        if name not in self.measurement_specs:
+            template = self.template(name)
+            self.measurement_specs[name] = MeasurementSpec(
+                name=template.name, uids=self.uids("measurement-spec"), template=template)
+        spec = self.measurement_specs[name]
+        MeasurementRun(
+            name=spec.name,
+            uids=self.uids("measurement"),
+            spec=spec,
+            material=material,
+            properties=self.attributes(Property, spec.template.properties),
+            conditions=self.attributes(Condition, spec.template.conditions),
+            parameters=self.attributes(Parameter, spec.template.parameters)
+        )
+
+    def attributes(self, clazz, allowed):
+        """Make a random subset of attributes of a type, with values within their bounds."""
+        attributes = []
+        for template, bounds in allowed:
+            if self.rng.random() < self.attribute_density:
+                attributes.append(clazz(name=template.name, template=template,
+                                        value=self.value(bounds or template.bounds)))
+        return attributes
+
+    def value(self, bounds):
+        """Make a random value within some bounds."""
+        if isinstance(bounds, RealBounds):
+            return NominalReal(self.rng.uniform(bounds.lower_bound, bounds.upper_bound),
+                               bounds.default_units)
+        elif isinstance(bounds, IntegerBounds):
+            return NominalInteger(self.rng.randint(bounds.lower_bound, bounds.upper_bound))
+        elif isinstance(bounds, CategoricalBounds):
+            return NominalCategorical(self.rng.choice(self.choices(bounds, bounds.categories)))
+        elif isinstance(bounds, CompositionBounds):
+            component = self.rng.choice(self.choices(bounds, bounds.components))
+            return NominalComposition({component: 1.0})
+        elif isinstance(bounds, MolecularStructureBounds):
+            return Smiles("CCO")
+        raise TypeError("Unexpected bounds: {}".format(bounds))
+
+    def choices(self, bounds, values):
+        """Get the allowed values of categorical bounds, in a reproducible order."""
+        if id(bounds) not in self.categories:
+            self.categories[id(bounds)] = sorted(values)
+        return self.categories[id(bounds)]
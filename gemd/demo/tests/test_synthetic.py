@@ -0,0 +1,57 @@
+"""Test the synthetic history generator."""
+from collections import Counter
+
+import pytest
+
+from gemd.demo.synthetic import make_synthetic_history
+from gemd.entity.object import IngredientRun, MaterialRun, MaterialSpec, MeasurementRun, \
+    ProcessRun
+from gemd.json import GEMDJson
+from gemd.util import recursive_foreach
+
+
+def _count(obj):
+    counts = Counter()
+    recursive_foreach(obj, lambda x: counts.update([type(x)]))
+    return counts
+
+
+def test_shape():
+    """Test that the history has the requested size and shape."""
+    terminal = make_synthetic_history(200, depth=5, fan_in=2, measurements=3, seed=1)
+    assert isinstance(terminal, MaterialRun)
+    counts = _count(terminal)
+    assert counts[MaterialRun] == counts[MaterialSpec] == counts[ProcessRun] == 200
+    assert counts[MeasurementRun] == 600
+    assert counts[IngredientRun] >= 199
+
+    # Walk down the longest chain of processes to a raw material
+    material, chain = terminal, 0
+    while material.process.ingredients:
+        material = material.process.ingredients[0].material
+        chain += 1
+    assert chain == 5
+    assert material.process.template.name == "Procuring"
+    assert all(len(i.process.ingredients) >= 2 for i in terminal.process.ingredients)
+
+
+def test_options():
+    """Test the density and sharing options, and reproducibility."""
+    sparse = make_synthetic_history(50, attribute_density=0.0, template_sharing=0.0, seed=2)
+    assert all(not m.properties for m in sparse.measurements)
+    templates = set()
+    recursive_foreach(sparse, lambda x: templates.add(id(x.spec.template))
+                      if isinstance(x, MaterialRun) else None)
+    assert len(templates) == 50
+
+    dense = make_synthetic_history(50, attribute_density=1.0, seed=3)
+    assert all(m.properties for m in dense.measurements if m.template.properties)
+
+    encoder = GEMDJson()
+    assert encoder.dumps(make_synthetic_history(30, seed=4)) == \
+        encoder.dumps(make_synthetic_history(30, seed=4))
+
+    with pytest.raises(ValueError):
+        make_synthetic_history(3, depth=3)
+    with pytest.raises(ValueError):
+        make_synthetic_history(10, fan_in=0)
@@ -0,0 +1,143 @@
+"""An index over a list of attributes, for lookup by name or by template."""
+from typing import Any, List, Optional, Tuple
+
+from gemd.entity.link_by_uid import LinkByUID
+from gemd.entity.valid_list import ValidList
+
+
+class AttributeIndex(object):
+    """
+    A lookup table for the attributes in a list, keyed by name and by template.
+
+    An index is built from the list the first time it is queried, with
+    :func:`attribute_index`, and the list drops it whenever its contents change, including
+    when it is reordered.  Attributes are indexed by the name and template they have when the
+    index is built; renaming an attribute or changing its template in place is not tracked.
+
+    Templates may be looked up by the template object itself, a
+    :class:`LinkByUID <gemd.entity.link_by_uid.LinkByUID>` or a (scope, id) tuple.
+    An attribute that points to a template object is found by any of the template's uids,
+    including uids assigned after the attribute was indexed.
+
+    Parameters
+    ----------
+    attributes: List[BaseAttribute]
+        The attributes to index, in order.
+
+    """
+
+    def __init__(self, attributes):
+        self._by_name = {}  # name -> attributes
+        self._by_link = {}  # (lowercase scope, id) -> attributes whose template is a link
+        self._by_template = {}  # id(template) -> attributes whose template is an object
+        self._templates = {}  # id(template) -> template, for resolving uids
+        self._uid_map = {}  # (lowercase scope, id) -> id(template)
+        for attribute in attributes:
+            self._add(attribute)
+
+    def _add(self, attribute) -> None:
+        """Add an attribute to the index, after those already added."""
+        name, template = attribute.name, attribute.template
+        self._by_name.setdefault(name, []).append(attribute)
+        if isinstance(template, LinkByUID):
+            self._by_link.setdefault(self._key(template), []).append(attribute)
+        elif template is not None:
+            self._templates[id(template)] = template
+            self._by_template.setdefault(id(template), []).append(attribute)
+
+    def get(self, key, default: Any = None) -> Any:
+        """
+        Get the first attribute that matches a name or a template.
+
+        Parameters
+        ----------
+        key: str, AttributeTemplate, LinkByUID or Tuple[str, str]
+            The attribute name, or the template (or a reference to it) the attribute uses.
+        default: Any
+            The result to return if there is no match.
+
+        Returns
+        -------
+        BaseAttribute
+            The first matching attribute in the list, or `default` if there is no match.
+
+        """
+        matches = self.get_all(key)
+        return matches[0] if matches else default
+
+    def get_all(self, key) -> List:
+        """
+        Get every attribute that matches a name or a template.
+
+        Parameters
+        ----------
+        key: str, AttributeTemplate, LinkByUID or Tuple[str, str]
+            The attribute name, or the template (or a reference to it) the attributes use.
+
+        Returns
+        -------
+        List[BaseAttribute]
+            The matching attributes.  Attributes that reference a template object are
+            listed before attributes that reference it through a link.
+
+        """
+        if isinstance(key, str):
+            return list(self._by_name.get(key, []))
+        if isinstance(key, (LinkByUID, tuple)):
+            uids = [self._key(key)]
+            template = self._templates.get(self._resolve(uids[0]))
+        else:
+            uids = []
+            template = key
+        result = []
+        if template is not None:
+            result.extend(self._by_template.get(id(template), []))
+            for scope, id_ in template.uids.items():
+                if (scope.lower(), id_) not in uids:
+                    uids.append((scope.lower(), id_))
+        for uid in uids:
+            result.extend(self._by_link.get(uid, []))
+        return result
+
+    def __contains__(self, key) -> bool:
+        return len(self.get_all(key)) > 0
+
+    def _resolve(self, uid: Tuple[str, str]) -> Optional[int]:
+        """Find the indexed template object with a given uid, refreshing the uid map on a miss."""
+        template_id = self._uid_map.get(uid)
+        template = self._templates.get(template_id)
+        if template is None or template.uids.get(uid[0]) != uid[1]:
+            self._uid_map = {(scope.lower(), id_): key
+                             for key, tmpl in self._templates.items()
+                             for scope, id_ in tmpl.uids.items()}
+            template_id = self._uid_map.get(uid)
+        return template_id
+
+    @staticmethod
+    def _key(link) -> Tuple[str, str]:
+        """Normalize a LinkByUID or (scope, id) tuple into an index key."""
+        if isinstance(link, LinkByUID):
+            return link.scope.lower(), link.id
+        scope, id_ = link
+        return scope.lower(), id_
+
+
+def attribute_index(attributes: ValidList) -> AttributeIndex:
+    """
+    Get the index of a list of attributes, building it if the list has changed since.
+
+    Parameters
+    ----------
+    attributes: ValidList
+        The attributes held by an object.
+
+    Returns
+    -------
+    AttributeIndex
+        An index of the attributes in their current order.
+
+    """
+    index = attributes._cache
+    if index is None:
+        index = attributes._cache = AttributeIndex(attributes)
+    return index
@@ -1,6 +1,7 @@
 """Base class for all entities."""
 from gemd.entity.dict_serializable import DictSerializable
-from gemd.entity.case_insensitive_dict import CaseInsensitiveDict
+from gemd.entity.case_insensitive_dict import CompactCaseInsensitiveDict
+from gemd.entity.change_tracker import mark_modified
 
 
 class BaseEntity(DictSerializable):
@@ -51,11 +52,11 @@ class BaseEntity(DictSerializable):
     @uids.setter
     def uids(self, uids):
         if uids is None:
-            self._uids = CaseInsensitiveDict()
+            self._uids = CompactCaseInsensitiveDict()
         elif isinstance(uids, dict):
-            self._uids = CaseInsensitiveDict(**uids)
+            self._uids = CompactCaseInsensitiveDict(**uids)
         else:
-            self._uids = CaseInsensitiveDict(**{uids[0]: uids[1]})
+            self._uids = CompactCaseInsensitiveDict(**{uids[0]: uids[1]})
 
     def add_uid(self, scope, uid):
         """
@@ -70,3 +71,4 @@ class BaseEntity(DictSerializable):
 
         """
         self.uids[scope] = uid
+        mark_modified(self)
@@ -101,6 +101,8 @@ class RealBounds(BaseBounds):
             A tuple of the (lower_bound, upper_bound) in the target units.
 
         """
+        if target_units == self.default_units:
+            return self.lower_bound, self.upper_bound
         try:
             lower_bound = units.convert_units(
                 self.lower_bound, self.default_units, target_units)
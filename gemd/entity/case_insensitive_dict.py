@@ -191,3 +191,226 @@ class CaseInsensitiveDict(dict):
             raise ValueError(
                 "Key '{}' already exists in dict with different case: '{}'".format(key, prev))
         self.lowercase_dict[key.lower()] = key
+
+
+class CompactCaseInsensitiveDict(CaseInsensitiveDict):
+    """
+    A case-insensitive dictionary tuned for holding a handful of keys, such as an entity's uids.
+
+    It behaves like :class:`CaseInsensitiveDict`, but instead of mirroring every key in a
+    second dictionary it keeps a tuple of (lowercase key, key) pairs in a slot.  Since
+    CaseInsensitiveDict does not declare slots, instances still have a ``__dict__``, but nothing
+    is stored in it.  Lookups with the same case as the stored key are answered by the
+    underlying dictionary without lowercasing anything; other lookups scan the (short) tuple.
+
+    Parameters
+    ----------
+    seq: iterable or mapping, optional
+        The key-value pairs of the dictionary. Can either be a mapping object with (key, value)
+        pairs, or an iterable of tuples of the form (key, value).
+    **kwargs: keyword args, optional
+        An alternative way of initializing the dictionary with key-value pairs.
+
+    """
+
+    __slots__ = ('_lowered',)
+
+    def __init__(self, seq: Sequence = None, **kwargs) -> None:
+        dict.__init__(self, seq or {}, **kwargs)
+        self._lowered = ()
+        for key in self:
+            self._register_key(key)
+
+    @property
+    def lowercase_dict(self) -> dict:
+        """A mapping from each lowercase key to the key as it is stored."""
+        return dict(self._lowered)
+
+    def _find(self, key: str) -> Optional[str]:
+        """Return the stored key that matches `key` case-insensitively, or None."""
+        if dict.__contains__(self, key):
+            return key
+        lowered = key.lower()
+        for low, stored in self._lowered:
+            if low == lowered:
+                return stored
+        return None
+
+    def __getitem__(self, key: str) -> Any:
+        stored = self._find(key)
+        if stored is None:
+            raise KeyError(key)
+        return dict.__getitem__(self, stored)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get the value for a given case-insensitive key.
+
+        Parameters
+        ----------
+        key: str
+            The key to look up (possibly with a different casing).
+
+        default: Any
+            The result to return if the key is not present.
+
+        Returns
+        -------
+        Any
+            The value associated with the case-insensitive version of `key`, or `default`
+            if `key` is not present.
+
+        """
+        stored = self._find(key)
+        if stored is None:
+            return default
+        return dict.__getitem__(self, stored)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._register_key(key)
+        dict.__setitem__(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return self._find(key) is not None
+
+    def __delitem__(self, key) -> None:
+        stored = self._find(key)
+        dict.__delitem__(self, key if stored is None else stored)
+        self._unregister_key(stored)
+
+    def clear(self) -> None:
+        """Remove all items from the dictionary."""
+        dict.clear(self)
+        self._lowered = ()
+
+    def pop(self, key: str, default=_RaiseKeyError) -> Any:
+        """
+        Remove and return the value for a given key from the dictionary.
+
+        If key is in the dictionary, remove it and return its value, else return default.
+        If default is not given and key is not in the dictionary, a KeyError is raised.
+
+        Parameters
+        ----------
+        key: str
+            The key to look up (possibly with a different casing).
+
+        default: Any
+            The result to return if the key is not present.
+
+        Returns
+        -------
+        Any
+            The value associated with the case-insensitive version of `key`, or `default`
+            if `key` is not present.
+
+        """
+        stored = self._find(key)
+        if stored is None:
+            if default is _RaiseKeyError:
+                raise KeyError(key)
+            return default
+        self._unregister_key(stored)
+        return dict.pop(self, stored)
+
+    def popitem(self) -> Tuple:
+        """
+        Remove and return the most recently added (key, value) pair from the dictionary.
+
+        Returns
+        -------
+        Tuple(str, Any)
+            The key-value pair
+
+        """
+        result = dict.popitem(self)
+        self._unregister_key(result[0])
+        return result
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        """
+        Return the value for a case-insensitive key, inserting `default` if it is not present.
+
+        Parameters
+        ----------
+        key: str
+            The key to look up (possibly with a different casing).
+
+        default: Any
+            The value to insert and return if the key is not present.
+
+        Returns
+        -------
+        Any
+            The value associated with the case-insensitive version of `key`.
+
+        """
+        stored = self._find(key)
+        if stored is not None:
+            return dict.__getitem__(self, stored)
+        self[key] = default
+        return default
+
+    def copy(self) -> 'CompactCaseInsensitiveDict':
+        """
+        Return a shallow copy of the dictionary.
+
+        Returns
+        -------
+        CompactCaseInsensitiveDict
+            A duplicate of the dictionary
+
+        """
+        return CompactCaseInsensitiveDict(dict.copy(self))
+
+    def update(self, mapping: Optional[Mapping[str, Any]] = None, **kwargs) -> None:
+        """
+        Update the dictionary with the key/value pairs from other, overwriting existing keys.
+
+        Parameters
+        ----------
+        mapping: Mapping
+            The set of (key, value) pairs to store
+
+        kwargs: (str, Any)
+            Alternatively, the set of keyword arguments
+
+        """
+        items = list(mapping.items()) if mapping is not None else []
+        items += list(kwargs.items())
+        for key, _ in items:
+            stored = self._find(key)
+            if stored is not None and stored != key:
+                raise ValueError(
+                    "Key '{}' already exists in dict with different case: "
+                    "'{}'".format(key, stored))
+        for key, value in items:
+            self[key] = value
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def _register_key(self, key: str) -> None:
+        """
+        Register a key to the dictionary.
+
+        Check to make sure it doesn't already exist in a different case.
+
+        Parameters
+        ----------
+        key: str
+            The key to register.
+
+        """
+        lowered = key.lower()
+        for low, stored in self._lowered:
+            if low == lowered:
+                if stored != key:
+                    raise ValueError("Key '{}' already exists in dict with different case: "
+                                     "'{}'".format(key, stored))
+                return
+        self._lowered += ((lowered, key),)
+
+    def _unregister_key(self, key: Optional[str]) -> None:
+        """Forget a stored key."""
+        self._lowered = tuple(x for x in self._lowered if x[1] != key)
@@ -0,0 +1,153 @@
+"""Opt-in tracking of the entities that are modified in memory."""
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import List
+
+from gemd.entity.context_var import ContextVar
+from gemd.entity.valid_list import ValidList
+
+# The trackers that are recording changes in the current thread or asyncio task
+_active = ContextVar("gemd_change_trackers", default=())
+_lock = threading.Lock()
+_started = 0  # The number of trackers that are started, in any thread or task
+
+
+class ChangeTracker(object):
+    """
+    Records which entities are modified while it is active.
+
+    While a tracker is active, assigning to a field of an entity (through a setter or
+    otherwise) marks the entity as modified, as do adding a uid with
+    :meth:`~gemd.entity.base_entity.BaseEntity.add_uid` and adding, replacing, removing or
+    reordering an element of one of its validated list fields (such as its properties or
+    parameters, but not its tags, which are a plain list).  Entities
+    that are created while a tracker is active are marked as modified, since they are new.
+    Assignments to fields that are only maintained as the inverse of another link, such as
+    `ProcessRun.output_material`, do not mark the entity.
+
+    Other changes made in place to the objects an entity holds, such as setting the value of
+    one of its attributes or assigning to its uids dict directly, are not tracked; reassign
+    the field or :meth:`mark` the entity instead.  List fields are tracked if they were
+    assigned while a tracker was active or were passed to :meth:`track`.
+
+    A tracker only records the changes made in the thread (or asyncio task) that started it,
+    and in the tasks that it creates afterwards; stopping it stops it in all of them.
+    Assignments are only intercepted while some tracker is started, in any thread, so
+    entities cost nothing extra to build and modify otherwise.  A tracker can be used as a
+    context manager, which starts it on entry and stops it on exit.
+
+    """
+
+    def __init__(self):
+        self._modified = weakref.WeakValueDictionary()  # id(entity) -> entity
+        self._started = False
+
+    def start(self) -> None:
+        """Start recording changes in this thread or task."""
+        if self not in _active.get():
+            _active.set(_active.get() + (self, ))
+        if not self._started:
+            self._started = True
+            _count_started(1)
+
+    def stop(self) -> None:
+        """Stop recording changes.  The changes recorded so far are kept."""
+        if self in _active.get():
+            _active.set(tuple(x for x in _active.get() if x is not self))
+        if self._started:
+            self._started = False
+            _count_started(-1)
+
+    @property
+    def active(self) -> bool:
+        """Whether changes are being recorded in this thread or task."""
+        return self._started and self in _active.get()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def track(self, obj) -> None:
+        """
+        Track in-place changes to the list fields of existing entities.
+
+        Lists that are assigned to an entity while a tracker is active are tracked
+        automatically; this is only needed for entities that were created before.
+
+        Parameters
+        ----------
+        obj: BaseEntity or collection of them
+            The entities whose lists should be tracked, along with every entity they link to.
+
+        """
+        from gemd.util import recursive_foreach
+
+        recursive_foreach(obj, _attach_lists)
+
+    def mark(self, entity) -> None:
+        """Record that an entity was modified."""
+        self._modified[id(entity)] = entity
+
+    def is_modified(self, entity) -> bool:
+        """Whether an entity was modified since the last checkpoint."""
+        return self._modified.get(id(entity)) is entity
+
+    @property
+    def modified(self) -> List:
+        """Get the entities that were modified since the last checkpoint, in order."""
+        return list(self._modified.values())
+
+    def checkpoint(self) -> None:
+        """Forget the changes recorded so far."""
+        self._modified.clear()
+
+
+def mark_modified(entity) -> None:
+    """Record that an entity was modified, in every active tracker."""
+    for tracker in _active.get():
+        if tracker._started:
+            tracker.mark(entity)
+
+
+@contextmanager
+def paused():
+    """Suspend every active tracker while in the context, e.g. to make temporary copies."""
+    trackers = _active.get()
+    _active.set(())
+    try:
+        yield
+    finally:
+        _active.set(trackers)
+
+
+def _attach_lists(entity) -> None:
+    """Make the list fields of an entity report their changes to it."""
+    for name, value in vars(entity).items():
+        if isinstance(value, ValidList) and name not in entity.skip:
+            value._owner = weakref.ref(entity)
+
+
+def _count_started(increment: int) -> None:
+    """Count a tracker starting or stopping, intercepting assignments while any is started."""
+    from gemd.entity.base_entity import BaseEntity
+
+    global _started
+    with _lock:
+        _started += increment
+        if _started == increment == 1:
+            BaseEntity.__setattr__ = _tracking_setattr
+        elif _started == 0:
+            del BaseEntity.__setattr__
+
+
+def _tracking_setattr(entity, name, value) -> None:
+    """Assign a field of an entity, recording the change; BaseEntity.__setattr__ when tracking."""
+    object.__setattr__(entity, name, value)
+    if _active.get() and name not in entity.skip:
+        if isinstance(value, ValidList):
+            value._owner = weakref.ref(entity)
+        mark_modified(entity)
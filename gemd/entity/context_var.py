@@ -0,0 +1,27 @@
+"""State that is local to a thread and asyncio task, such as the active change trackers."""
+try:
+    from contextvars import ContextVar
+except ImportError:  # pragma: no cover
+    import threading
+
+    class ContextVar(object):
+        """
+        A thread-local stand-in for :class:`contextvars.ContextVar`, before python 3.7.
+
+        Without contextvars, asyncio tasks in the same thread share the value.
+        """
+
+        def __init__(self, name, *, default):
+            self.name = name
+            self._default = default
+            self._local = threading.local()
+
+        def get(self):
+            """Get the value in this thread."""
+            return getattr(self._local, "value", self._default)
+
+        def set(self, value):
+            """Set the value in this thread."""
+            self._local.value = value
+
+__all__ = ["ContextVar"]
@@ -1,4 +1,5 @@
 from abc import ABC
+from functools import lru_cache
 from logging import getLogger
 
 import json
@@ -31,8 +32,7 @@ class DictSerializable(ABC):
             The deserialized object.
 
         """
-        expected_arg_names = inspect.getfullargspec(cls.__init__).args
-        expected_arg_names += inspect.getfullargspec(cls.__init__).kwonlyargs
+        expected_arg_names = _init_arg_names(cls)
         kwargs = {}
         for name, arg in d.items():
             if name in expected_arg_names:
@@ -52,10 +52,11 @@ class DictSerializable(ABC):
         Returns
         -------
         dict
-            A dictionary representation of the object, where the keys are its fields.
+            A dictionary representation of the object, where the keys are its fields, in the
+            order of the arguments of the constructor, followed by "type".
 
         """
-        keys = {x.lstrip('_') for x in vars(self) if x not in self.skip}
+        keys = _field_order(type(self), tuple(vars(self)))
         attributes = {k: self.__getattribute__(k) for k in keys}
         attributes["type"] = self.typ
         return attributes
@@ -146,3 +147,25 @@ class DictSerializable(ABC):
     # TODO make a hash function which reflects __eq__?
     def __hash__(self):
         return super().__hash__()
+
+
+@lru_cache(maxsize=None)
+def _init_arg_names(cls):
+    """Get the names of the arguments of a class's constructor, which from_dict passes on."""
+    spec = inspect.getfullargspec(cls.__init__)
+    return frozenset(spec.args + spec.kwonlyargs)
+
+
+@lru_cache(maxsize=None)
+def _field_order(cls, names):
+    """
+    Get the fields that as_dict writes for a set of instance variables, in a fixed order.
+
+    The fields are the names of the variables, without leading underscores, other than those in
+    the class's skip set.  Those that are arguments of the constructor come first, in the same
+    order, and any others follow in sorted order.
+    """
+    spec = inspect.getfullargspec(cls.__init__)
+    positions = {name: i for i, name in enumerate(spec.args[1:] + spec.kwonlyargs)}
+    fields = {x.lstrip('_') for x in names if x not in cls.skip}
+    return tuple(sorted(fields, key=lambda x: (positions.get(x, len(positions)), x)))
@@ -1,5 +1,6 @@
 """For entities that have conditions."""
 from gemd.entity.attribute.condition import Condition
+from gemd.entity.attribute_index import attribute_index
 from gemd.entity.setters import validate_list
 
 
@@ -18,3 +19,22 @@ class HasConditions(object):
     @conditions.setter
     def conditions(self, conditions):
         self._conditions = validate_list(conditions, Condition)
+
+    def get_condition(self, key, default=None):
+        """
+        Look up a condition by name or by template, without scanning the list.
+
+        Parameters
+        ----------
+        key: str, ConditionTemplate, LinkByUID or Tuple[str, str]
+            The name of the condition, or its template (or a link or (scope, id) pair for it).
+        default: Any
+            The result to return if there is no matching condition.
+
+        Returns
+        -------
+        Condition
+            The first matching condition, or `default`.
+
+        """
+        return attribute_index(self._conditions).get(key, default)
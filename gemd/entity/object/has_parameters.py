@@ -1,5 +1,6 @@
 """For entities that have parameters."""
 from gemd.entity.attribute.parameter import Parameter
+from gemd.entity.attribute_index import attribute_index
 from gemd.entity.setters import validate_list
 
 
@@ -18,3 +19,22 @@ class HasParameters(object):
     @parameters.setter
     def parameters(self, parameters):
         self._parameters = validate_list(parameters, Parameter)
+
+    def get_parameter(self, key, default=None):
+        """
+        Look up a parameter by name or by template, without scanning the list.
+
+        Parameters
+        ----------
+        key: str, ParameterTemplate, LinkByUID or Tuple[str, str]
+            The name of the parameter, or its template (or a link or (scope, id) pair for it).
+        default: Any
+            The result to return if there is no matching parameter.
+
+        Returns
+        -------
+        Parameter
+            The first matching parameter, or `default`.
+
+        """
+        return attribute_index(self._parameters).get(key, default)
@@ -1,5 +1,6 @@
 """For entities that have properties."""
 from gemd.entity.attribute.property import Property
+from gemd.entity.attribute_index import attribute_index
 from gemd.entity.setters import validate_list
 
 
@@ -18,3 +19,22 @@ class HasProperties(object):
     @properties.setter
     def properties(self, properties):
         self._properties = validate_list(properties, Property)
+
+    def get_property(self, key, default=None):
+        """
+        Look up a property by name or by template, without scanning the list.
+
+        Parameters
+        ----------
+        key: str, PropertyTemplate, LinkByUID or Tuple[str, str]
+            The name of the property, or its template (or a link or (scope, id) pair for it).
+        default: Any
+            The result to return if there is no matching property.
+
+        Returns
+        -------
+        Property
+            The first matching property, or `default`.
+
+        """
+        return attribute_index(self._properties).get(key, default)
@@ -1,6 +1,7 @@
 from gemd.entity.attribute.property_and_conditions import PropertyAndConditions
 from gemd.entity.object.base_object import BaseObject
 from gemd.entity.object.has_template import HasTemplate
+from gemd.entity.attribute_index import attribute_index
 from gemd.entity.setters import validate_list
 
 
@@ -58,6 +59,25 @@ class MaterialSpec(BaseObject, HasTemplate):
     def properties(self, properties):
         self._properties = validate_list(properties, PropertyAndConditions)
 
+    def get_property(self, key, default=None):
+        """
+        Look up a property-and-conditions by the name or template of its property.
+
+        Parameters
+        ----------
+        key: str, PropertyTemplate, LinkByUID or Tuple[str, str]
+            The name of the property, or its template (or a link or (scope, id) pair for it).
+        default: Any
+            The result to return if there is no matching property.
+
+        Returns
+        -------
+        PropertyAndConditions
+            The first matching property-and-conditions, or `default`.
+
+        """
+        return attribute_index(self._properties).get(key, default)
+
     @property
     def process(self):
         """Get the originating process spec."""
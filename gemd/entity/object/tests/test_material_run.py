@@ -122,6 +122,15 @@ def test_build():
     mat_dict['spec'] = mat.spec.as_dict()
     assert MaterialRun.build(mat_dict) == mat
 
+    # Objects that are already built are copied, so the original graph is left alone
+    process = ProcessRun("a process")
+    mat.process = process
+    built = MaterialRun.build(mat.as_dict())
+    assert built.process == process
+    assert built.process is not process
+    assert built.process.output_material is built
+    assert process.output_material is mat
+
 
 def test_equality():
     """Test that equality check works as expected."""
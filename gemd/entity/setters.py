@@ -2,7 +2,7 @@
 from gemd.entity.valid_list import ValidList
 
 
-def validate_list(obj, typ, *, trigger=None):
+def validate_list(obj, typ, *, trigger=None, remove_trigger=None, trusted=False):
     """
     Attempts to return obj as a list, each element of which has type typ.
 
@@ -14,6 +14,11 @@ def validate_list(obj, typ, *, trigger=None):
         The desired type of obj, or if obj is a list, every element of obj.
     trigger: function
         A function to invoke when putting obj into a list.
+    remove_trigger: function
+        A function to invoke when an element is removed from the list.
+    trusted: bool
+        Whether the elements of obj are already known to have type typ, so that validating
+        them can be skipped.
 
     Returns
     -------
@@ -23,11 +28,11 @@ def validate_list(obj, typ, *, trigger=None):
 
     """
     if obj is None:
-        return ValidList([], typ, trigger)
+        return ValidList([], typ, trigger, remove_trigger=remove_trigger)
     elif isinstance(obj, (list, tuple)):
-        return ValidList(obj, typ, trigger)
+        return ValidList(obj, typ, trigger, remove_trigger=remove_trigger, trusted=trusted)
     else:
-        return ValidList([obj], typ, trigger)
+        return ValidList([obj], typ, trigger, remove_trigger=remove_trigger, trusted=trusted)
 
 
 def validate_str(obj):
@@ -61,7 +61,8 @@ class BaseTemplate(BaseEntity):
             first, second = template_or_tuple
             if isinstance(first, (LinkByUID, AttributeTemplate)) and \
                     (isinstance(second, BaseBounds) or second is None):
-                if isinstance(first, AttributeTemplate) and isinstance(second, BaseBounds):
+                if isinstance(first, AttributeTemplate) and isinstance(second, BaseBounds) \
+                        and second is not first.bounds:
                     if not first.bounds.contains(second):
                         raise ValueError("Range and template are inconsistent")
                 return [first, second]
@@ -0,0 +1,108 @@
+"""Tests of the attribute index on objects with attributes."""
+from gemd.entity.attribute.condition import Condition
+from gemd.entity.attribute.property import Property
+from gemd.entity.attribute.property_and_conditions import PropertyAndConditions
+from gemd.entity.attribute_index import attribute_index
+from gemd.entity.bounds.real_bounds import RealBounds
+from gemd.entity.link_by_uid import LinkByUID
+from gemd.entity.object import MaterialSpec, MeasurementRun
+from gemd.entity.template.property_template import PropertyTemplate
+from gemd.json import GEMDJson
+
+
+def _template():
+    return PropertyTemplate("density", bounds=RealBounds(0, 100, "g/cm^3"))
+
+
+def test_lookup_by_name():
+    """Test that attributes can be found by name, and that the index tracks list changes."""
+    first = Property("density")
+    second = Property("viscosity")
+    msr = MeasurementRun("msr", properties=[first, second],
+                         conditions=[Condition("temperature")])
+
+    assert msr.get_property("density") is first
+    assert msr.get_property("viscosity") is second
+    assert msr.get_property("temperature") is None
+    assert msr.get_property("temperature", "missing") == "missing"
+    assert msr.get_condition("temperature") is msr.conditions[0]
+    assert msr.get_parameter("temperature") is None
+
+    msr.properties.remove(first)
+    assert msr.get_property("density") is None
+    third = Property("density")
+    msr.properties[0] = third
+    assert msr.get_property("density") is third
+    assert msr.get_property("viscosity") is None
+
+    msr.properties.append(first)
+    assert msr.get_property("density") is third
+    msr.properties.pop(0)
+    assert msr.get_property("density") is first
+
+    msr.properties = [second]
+    assert msr.get_property("density") is None
+    assert msr.get_property("viscosity") is second
+
+
+def test_reordering():
+    """Test that lookups return the first match in the current order of the list."""
+    first, second, third = Property("density"), Property("density"), Property("viscosity")
+    msr = MeasurementRun("msr", properties=[first, second])
+    assert msr.get_property("density") is first
+
+    msr.properties.insert(0, third)
+    assert msr.get_property("viscosity") is third
+    msr.properties.insert(0, second)
+    assert msr.get_property("density") is second
+
+    msr.properties.sort(key=lambda x: x is not first)
+    assert msr.get_property("density") is first
+    msr.properties.reverse()
+    assert msr.get_property("density") is second
+
+    msr.properties = [first, third]
+    assert msr.get_property("density") is first
+    msr.properties *= 3
+    assert len(msr.properties) == 6
+    assert attribute_index(msr.properties).get_all("density") == [first] * 3
+    msr.properties *= 0
+    assert msr.properties == []
+    assert msr.get_property("density") is None
+
+
+def test_lookup_by_template():
+    """Test that attributes can be found by template, link or uid pair."""
+    tmpl = _template()
+    by_object = Property("density", template=tmpl)
+    by_link = Property("other density", template=LinkByUID("Scope", "42"))
+    msr = MeasurementRun("msr", properties=[by_object, by_link])
+
+    assert msr.get_property(tmpl) is by_object
+    assert msr.get_property(LinkByUID("scope", "42")) is by_link
+    assert msr.get_property(("SCOPE", "42")) is by_link
+
+    # uids assigned after indexing are still resolved
+    tmpl.add_uid("scope", "42")
+    index = attribute_index(msr.properties)
+    assert index.get_all(tmpl) == [by_object, by_link]
+    assert index.get_all(("scope", "42")) == [by_object, by_link]
+    assert ("scope", "43") not in index
+    assert attribute_index(msr.properties) is index, "The index is kept until the list changes"
+
+    msr.properties.clear()
+    assert tmpl not in attribute_index(msr.properties)
+    assert ("scope", "42") not in attribute_index(msr.properties)
+
+
+def test_material_spec_and_serde():
+    """Test the index on material specs and on deserialized objects."""
+    tmpl = _template()
+    spec = MaterialSpec("spec", properties=PropertyAndConditions(
+        property=Property("density", template=tmpl)))
+    assert spec.get_property("density") is spec.properties[0]
+    assert spec.get_property(tmpl) is spec.properties[0]
+
+    copy = GEMDJson().copy(spec)
+    assert copy.get_property("density") == spec.properties[0]
+    assert copy.get_property(copy.properties[0].template) is copy.properties[0]
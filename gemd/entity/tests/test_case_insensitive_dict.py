@@ -1,20 +1,24 @@
 """Tests of the case-insensitive dictionary class."""
 import pytest
 
-from gemd.entity.case_insensitive_dict import CaseInsensitiveDict
+from gemd.entity.case_insensitive_dict import CaseInsensitiveDict, CompactCaseInsensitiveDict
 from gemd.entity.object.process_run import ProcessRun
 from gemd.json import loads, dumps
 
 
-def test_case_sensitivity():
+DICT_CLASSES = [CaseInsensitiveDict, CompactCaseInsensitiveDict]
+
+
+@pytest.mark.parametrize("dict_class", DICT_CLASSES)
+def test_case_sensitivity(dict_class):
     """Test some basic setting and getting operations."""
     # If two keys are the same up to case, the dictionary is invalid.
     bad_data = {'A': 1, 'a': 2}
     with pytest.raises(ValueError):
-        CaseInsensitiveDict(**bad_data)
+        dict_class(**bad_data)
 
     data = {'key1': 'value1', 'key2': 2}
-    data_dict = CaseInsensitiveDict(**data)
+    data_dict = dict_class(**data)
     data_dict['kEY3'] = "three"  # A new key-value pair can be added.
     data_dict['key2'] = 22  # An existing can be overridden by the exact same key.
 
@@ -48,21 +52,23 @@ def test_serde():
     assert process_copy.uids['foo'] == process_copy.uids['Foo']
 
 
-def test_contains():
+@pytest.mark.parametrize("dict_class", DICT_CLASSES)
+def test_contains(dict_class):
     """Test checking whether or not a case insensitive dict contains a key."""
     data = {'Key': 'value'}
-    data_dict = CaseInsensitiveDict(**data)
+    data_dict = dict_class(**data)
     for k in ('key', 'Key', 'KEY'):
         assert k in data_dict
 
     assert 'not_a_key' not in data_dict
 
 
-def test_all_dict_methods():
+@pytest.mark.parametrize("dict_class", DICT_CLASSES)
+def test_all_dict_methods(dict_class):
     """Tests checking consistency of all standard dictionary methods."""
     # __init__
     data = {'K' + x: 'V' + x for x in ('1', '2', '3', '4', '5')}
-    ci_dict = CaseInsensitiveDict(**data)
+    ci_dict = dict_class(**data)
 
     assert sorted(list(ci_dict)) == sorted(list(data))
     assert len(ci_dict) == len(data)
@@ -95,7 +101,7 @@ def test_all_dict_methods():
     assert type(dup) == type(ci_dict)
 
     # fromkeys
-    key_copy = CaseInsensitiveDict.fromkeys(dup)
+    key_copy = dict_class.fromkeys(dup)
     assert set(dup) == set(key_copy)
     assert type(dup) == type(key_copy)
 
@@ -136,3 +142,36 @@ def test_all_dict_methods():
 
     # values
     assert 'V6' in ci_dict.values()
+
+
+def test_compact_dict():
+    """Test the behaviors specific to the compact dictionary used for uids."""
+    from copy import deepcopy
+    import json
+    import pickle
+
+    uids = CompactCaseInsensitiveDict(Auto='1', other='2')
+    assert uids.lowercase_dict == {'auto': 'Auto', 'other': 'other'}
+    assert json.dumps(uids, sort_keys=True) == json.dumps({'other': '2', 'Auto': '1'},
+                                                          sort_keys=True)
+    assert uids == {'Auto': '1', 'other': '2'}
+
+    for dup in (deepcopy(uids), pickle.loads(pickle.dumps(uids)), uids.copy()):
+        assert type(dup) is CompactCaseInsensitiveDict
+        assert dup['AUTO'] == '1'
+        with pytest.raises(ValueError):
+            dup['auto'] = '3'
+
+    assert uids.setdefault('OTHER', '3') == '2'
+    del uids['AUTO']
+    assert 'auto' not in uids
+    with pytest.raises(KeyError):
+        del uids['auto']
+    with pytest.raises(KeyError):
+        uids['auto']
+    uids['AUTO'] = '4'
+    assert uids.get('auto') == '4'
+    assert vars(uids) == {}, "The state is kept in a slot"
+
+    process = ProcessRun("A process", uids={'Foo': '17'})
+    assert isinstance(process.uids, CompactCaseInsensitiveDict)
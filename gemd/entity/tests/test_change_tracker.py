@@ -0,0 +1,167 @@
+"""Test the tracking of modified entities."""
+import asyncio
+import pickle
+import threading
+
+from gemd.entity.attribute.parameter import Parameter
+from gemd.entity.base_entity import BaseEntity
+from gemd.entity.change_tracker import ChangeTracker, paused
+from gemd.entity.object import ProcessRun, MaterialRun, MeasurementRun, IngredientRun
+
+
+def test_setters_and_lists():
+    """Test that setters and list mutations mark the entities they modify."""
+    old_process = ProcessRun("old process")
+    existing = MaterialRun("existing", process=old_process)
+    untracked = ProcessRun("untracked")
+
+    tracker = ChangeTracker()
+    with tracker:
+        assert tracker.active
+        new = MaterialRun("new")
+        assert tracker.modified == [new]
+        tracker.checkpoint()
+        assert tracker.modified == []
+
+        existing.name = "renamed"
+        existing.tags = ["a::tag"]
+        assert tracker.modified == [existing]
+        assert not tracker.is_modified(old_process)
+
+        # Setting an inverse link (output_material) does not mark the process
+        process = ProcessRun("process")
+        tracker.checkpoint()
+        new.process = process
+        assert tracker.modified == [new]
+
+        tracker.checkpoint()
+        ingredient = IngredientRun(material=existing)
+        ingredient.process = process  # appends to process.ingredients, which is an inverse link
+        assert tracker.modified == [ingredient]
+
+        # Lists assigned while tracking, and lists of tracked entities, report their changes
+        tracker.checkpoint()
+        process.parameters.append(Parameter("temperature"))
+        old_process.parameters.append(Parameter("pressure"))
+        untracked.parameters = []
+        untracked.parameters.append(Parameter("time"))
+        assert tracker.modified == [process, untracked]
+        tracker.track(existing)
+        old_process.parameters.pop()
+        assert tracker.modified == [process, untracked, old_process]
+
+    assert not tracker.active
+    tracker.checkpoint()
+    process.name = "untracked"
+    process.parameters.clear()
+    MeasurementRun("untracked", material=existing)
+    assert tracker.modified == []
+
+    # Owners are weak references, which are not pickled
+    assert old_process.parameters._owner() is old_process
+    copy = pickle.loads(pickle.dumps(old_process))
+    assert copy.name == "old process"
+    assert copy.parameters._owner is None
+
+
+def test_multiple_trackers():
+    """Test that trackers record changes independently."""
+    material = MaterialRun("material")
+    first, second = ChangeTracker(), ChangeTracker()
+    first.start()
+    second.start()
+    first.start()
+    material.name = "first"
+    first.stop()
+    material.notes = "second"
+    first.checkpoint()
+    assert first.modified == []
+    assert second.modified == [material]
+
+    second.checkpoint()
+    with paused():
+        assert not second.active
+        material.name = "paused"
+    assert second.active
+    assert second.modified == []
+    second.stop()
+
+
+def test_in_place_changes():
+    """Test that uids and validated lists changed in place mark their entity, but tags don't."""
+    material = MaterialRun("material", tags=["a::tag"])
+    process = ProcessRun("process", parameters=[Parameter("b"), Parameter("a")])
+    with ChangeTracker() as tracker:
+        material.add_uid("id", "material")
+        assert tracker.modified == [material]
+
+        tracker.checkpoint()
+        material.tags.append("another::tag")
+        assert tracker.modified == [], "Tags are a plain list, so reassign them instead"
+        material.tags = material.tags + ["third::tag"]
+        assert tracker.modified == [material]
+
+        tracker.checkpoint()
+        tracker.track(process)
+        process.parameters.sort(key=lambda x: x.name)
+        assert tracker.modified == [process]
+
+
+def test_only_intercepted_while_started():
+    """Test that assignments are only intercepted while a tracker is started somewhere."""
+    assert "__setattr__" not in vars(BaseEntity)
+    first, second = ChangeTracker(), ChangeTracker()
+    with first:
+        second.start()
+        assert "__setattr__" in vars(BaseEntity)
+        first.stop()
+        assert "__setattr__" in vars(BaseEntity)
+    second.stop()
+    assert "__setattr__" not in vars(BaseEntity)
+
+    # Stopping a tracker in a task that inherited it stops it everywhere
+    material = MaterialRun("material")
+    with ChangeTracker() as tracker:
+        async def stop():
+            tracker.stop()
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(stop())
+        finally:
+            loop.close()
+        assert not tracker.active
+        material.name = "renamed"
+        assert tracker.modified == []
+    assert "__setattr__" not in vars(BaseEntity)
+
+
+def test_threads_and_tasks():
+    """Test that a tracker only records changes made in its own thread and tasks."""
+    material = MaterialRun("material")
+
+    def rename(name):
+        material.name = name
+
+    with ChangeTracker() as tracker:
+        thread = threading.Thread(target=rename, args=("other thread", ))
+        thread.start()
+        thread.join()
+        assert tracker.modified == []
+
+        async def other_task():
+            with ChangeTracker() as inner:
+                rename("other task")
+                await asyncio.sleep(0)
+            return inner.modified
+
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(other_task()) == [material]
+        finally:
+            loop.close()
+        assert tracker.modified == [material], "Tasks created while tracking report to it"
+        assert tracker.active
+
+    assert not ChangeTracker().active
+    MaterialRun("untracked").add_uid("id", "untracked")
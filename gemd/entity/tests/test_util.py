@@ -77,6 +77,26 @@ def test_serialized_history():
     assert buy_cookie_dough_dict.get('spec') == buy_spec.as_dict()
 
 
+def test_history_matches_round_trip():
+    """The history should be what serializing each entity on its own would give."""
+    import json
+    from gemd.demo.cake import make_cake
+    from gemd.json import dumps, loads
+    from gemd.util import recursive_foreach, substitute_links
+
+    cake = make_cake(seed=1)
+    # Links to an entity with several uids, none of them "auto", use the first in sorted order
+    cake.process.add_uid("zeta", "z1")
+    cake.process.add_uid("Alpha", "a1")
+    history = complete_material_history(cake)
+
+    expected = []
+    recursive_foreach(cake, lambda x: expected.append(
+        json.loads(dumps(substitute_links(loads(dumps(x)))))["context"][0]))
+    assert history == expected
+    assert next(x for x in history if x["uids"] == cake.uids)["process"]["scope"] == "Alpha"
+
+
 def test_invalid_instance():
     """Calling make_instance on a non-spec should throw a TypeError."""
     not_specs = [MeasurementRun("meas"), Condition("cond"), UniformReal(0, 1, ''), 'foo', 10]
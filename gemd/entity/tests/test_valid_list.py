@@ -76,3 +76,82 @@ def test_invalid_content():
         ValidList(_list=tuple([1, 1]), content_type=1)
     with pytest.raises(TypeError):
         ValidList(_list=tuple([1, 1]), content_type=None)
+
+
+def test_remove_triggers():
+    """Test that remove triggers fire for every element that leaves the list."""
+    removed = []
+    vlst = ValidList([1, 2, 3, 4, 5, 6], content_type=int, remove_trigger=removed.append)
+    vlst[0] = 7
+    assert removed == [1]
+    del vlst[0]
+    assert removed == [1, 7]
+    vlst.remove(3)
+    assert removed == [1, 7, 3]
+    assert vlst.pop() == 6
+    assert removed == [1, 7, 3, 6]
+    del vlst[0:2]
+    assert removed == [1, 7, 3, 6, 2, 4]
+    vlst.clear()
+    assert removed == [1, 7, 3, 6, 2, 4, 5]
+    assert vlst == []
+
+    with pytest.raises(TypeError):
+        ValidList([], content_type=int, remove_trigger=1)
+
+    vlst += [1]
+    with pytest.raises(TypeError):
+        vlst += ['a']
+    assert vlst == [1]
+
+    # Repetition goes through the triggers, and reordering drops any cached data
+    added = []
+    vlst = ValidList([1, 2], content_type=int, trigger=added.append)
+    vlst *= 2
+    assert vlst == [1, 2, 1, 2]
+    assert added == [1, 2, 1, 2]
+    with pytest.raises(TypeError):
+        vlst *= 'a'
+    vlst._cache = "cached"
+    vlst.sort(reverse=True)
+    assert (vlst, vlst._cache) == ([2, 2, 1, 1], None)
+    vlst._cache = "cached"
+    vlst.reverse()
+    assert (vlst, vlst._cache) == ([1, 1, 2, 2], None)
+
+
+def test_bulk_validation():
+    """Test batch validation, trusted construction and construction from generators."""
+    vlst = ValidList((x for x in range(3)), content_type=int, trigger=lambda x: x * 2)
+    assert vlst == [0, 2, 4]
+
+    with pytest.raises(TypeError):
+        ValidList([1, 2, 'a', 3], content_type=int)
+    with pytest.raises(TypeError):
+        vlst.extend(x for x in [5, 'b'])
+    assert vlst == [0, 2, 4]
+
+    # trusted construction skips the type check, but not the trigger
+    trusted = ValidList(['a'], content_type=int, trigger=lambda x: x * 2, trusted=True)
+    assert trusted == ['aa']
+
+    # lists that were already validated against compatible types are not re-validated
+    rewrapped = ValidList(vlst, content_type=(int, str))
+    assert rewrapped == vlst
+    with pytest.raises(TypeError):
+        ValidList(ValidList(['a'], content_type=str), content_type=int)
+
+
+def test_pickle():
+    """Test that lists survive pickling with their content types and triggers intact."""
+    import pickle
+
+    vlst = ValidList([1, 2], content_type=int, remove_trigger=print)
+    copy = pickle.loads(pickle.dumps(vlst))
+    assert copy == [1, 2]
+    vlst._cache = "cached"
+    copy = pickle.loads(pickle.dumps(vlst))
+    assert copy._remove_trigger is print
+    assert copy._cache is None
+    with pytest.raises(TypeError):
+        copy.append('a')
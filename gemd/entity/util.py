@@ -98,23 +98,29 @@ def complete_material_history(mat):
     Get a list of every single object in the material history, all as dictionaries.
 
     This is useful for testing, if we want the context list that can be used to rehydrate
-    an entire material history.
+    an entire material history.  Entities without uids are assigned one, in the "auto" scope.
 
     :param mat: root material run
     :return: a list containing every object connected to mat, each a dictionary with all
         links substituted.
     """
     from gemd.entity.base_entity import BaseEntity
+    from gemd.entity.link_by_uid import LinkByUID
+    from gemd.json import GEMDEncoder
+    from gemd.util.impl import set_uuids, _substitute
     import json
-    from gemd.json import dumps, loads
-    from gemd.util.impl import substitute_links
 
-    result = []
+    set_uuids(mat, "auto")  # The default scope of GEMDJson
 
-    def body(obj: BaseEntity):
-        copy = substitute_links(loads(dumps(obj)))
-        result.append(json.loads(dumps(copy))["context"][0])
+    def make_link(entity: BaseEntity):
+        # Refer to the "auto" uid or, failing that, the first uid in sorted order
+        scope = "auto" if "auto" in entity.uids else min(entity.uids)
+        return LinkByUID(scope, entity.uids[scope])
 
-    recursive_foreach(mat, body, apply_first=False)
-
-    return result
+    entities = []
+    recursive_foreach(mat, entities.append, apply_first=False)
+    result = [_substitute(entity, sub=make_link,
+                          applies=lambda o, e=entity: o is not e and isinstance(o, BaseEntity))
+              for entity in entities]
+    # Turn the substituted entities into plain dicts, as they are when serialized
+    return json.loads(json.dumps(result, cls=GEMDEncoder, sort_keys=True))
@@ -1,4 +1,6 @@
 """A list that can validate its contents."""
+import copyreg
+import operator
 from collections.abc import Iterable
 
 
@@ -17,12 +19,23 @@ class ValidList(list):
         The function will get passed the value (or each individual value in a separate
         invocation for list operations) and, if it returns something other than None,
         it will use that returned value for the assignment.
+    remove_trigger: function
+        A function that gets invoked whenever an element is removed or overwritten.
+        The function will get passed the value (or each individual value in a separate
+        invocation for list operations); its return value is ignored.
+    trusted: bool
+        Skip validating the initial values, because the caller already guarantees their types.
+        Values copied from another ValidList whose content types are all allowed in this one
+        are always trusted.
 
     """
 
     _content_type = tuple([])
+    _owner = None  # A weak reference to the entity that holds the list, if it is tracked
+    _cache = None  # Derived from the contents, e.g. an AttributeIndex; dropped when they change
 
-    def __init__(self, _list, content_type=None, trigger=None):
+    def __init__(self, _list, content_type=None, trigger=None, *,
+                 remove_trigger=None, trusted=False):
         if content_type is None:
             content_type = tuple()
 
@@ -35,22 +48,42 @@ class ValidList(list):
         for elem in self._content_type:
             if not isinstance(elem, type):
                 raise TypeError('Content filters must be types')
-        for value in _list:
-            self._validate(value)
+
+        cache = list(_list)  # So that we don't edit a passed reference
+        # Another ValidList has already validated its contents against its own types
+        if isinstance(_list, ValidList) and \
+                all(issubclass(x, self._content_type) for x in _list._content_type):
+            trusted = True
+        if not trusted:
+            self._validate_all(cache)
 
         self._trigger = None
-        cache = list(_list)
         if trigger is not None:
             if not callable(trigger):
                 raise TypeError('Triggers must be callable')
             self._trigger = trigger
-            for i, value in enumerate(_list):
-                result = self._trigger(value)
-                if result is not None:
-                    cache[i] = result
+            self._apply_trigger(cache)
+
+        self._remove_trigger = None
+        if remove_trigger is not None:
+            if not callable(remove_trigger):
+                raise TypeError('Triggers must be callable')
+            self._remove_trigger = remove_trigger
 
         list.__init__(self, cache)
 
+    def __reduce_ex__(self, protocol):
+        # The contents were validated (and triggered) when they were added, so restore them
+        # directly rather than through extend, which would run before the state is restored.
+        # The owner is only a weak reference, and the cache can be rebuilt, so neither is kept.
+        attributes = {k: v for k, v in self.__dict__.items() if k not in ("_owner", "_cache")}
+        return copyreg.__newobj__, (type(self),), (attributes, list(self))
+
+    def __setstate__(self, state):
+        attributes, contents = state
+        self.__dict__.update(attributes)
+        list.extend(self, contents)
+
     def _validate(self, value):
         """
         Validate a value against the allowed types.
@@ -74,6 +107,43 @@ class ValidList(list):
             raise TypeError(
                 'Value is not of an accepted type: {} =/= {}'.format(value, self._content_type))
 
+    def _validate_all(self, values):
+        """
+        Validate a batch of values against the allowed types.
+
+        The type check is performed once per distinct class in `values`, rather than once
+        per value.
+
+        Parameters
+        ----------
+        values: list
+            The values to validate.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        TypeError
+            If any of `values` is not one of the allowed types.
+
+        """
+        accepted = set()
+        for value in values:
+            clazz = type(value)
+            if clazz not in accepted:
+                self._validate(value)
+                accepted.add(clazz)
+
+    def _apply_trigger(self, values):
+        """Invoke the trigger on each of `values` in place, keeping any replacement it returns."""
+        trigger = self._trigger
+        for i, value in enumerate(values):
+            result = trigger(value)
+            if result is not None:
+                values[i] = result
+
     def __setitem__(self, index, value):
         """
         Called to implement assignment to self[index].
@@ -94,11 +164,47 @@ class ValidList(list):
 
         """
         self._validate(value)
+        removed = self[index] if isinstance(index, slice) else [self[index]]
         if self._trigger is not None:
             result = self._trigger(value)
             if result is not None:
                 value = result
         super().__setitem__(index, value)
+        self._removed(removed)
+        self._changed()
+
+    def __delitem__(self, index):
+        """
+        Called to implement deletion of self[index].
+
+        Parameters
+        ----------
+        index: int or slice
+            The index (or slice) of the element(s) of the list to delete
+
+        Returns
+        -------
+        None
+
+        """
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        self._removed(removed)
+        self._changed()
+
+    def __iadd__(self, list_):
+        """Implement ``self += list_`` through :meth:`extend`, so that values are validated."""
+        self.extend(list_)
+        return self
+
+    def __imul__(self, n):
+        """Implement ``self *= n`` through :meth:`extend` and :meth:`clear`, so triggers run."""
+        n = operator.index(n)
+        if n <= 0:
+            self.clear()
+        else:
+            self.extend(list(self) * (n - 1))
+        return self
 
     def append(self, value):
         """
@@ -123,6 +229,7 @@ class ValidList(list):
             if result is not None:
                 value = result
         super().append(value)
+        self._changed()
 
     def extend(self, list_):
         """
@@ -141,20 +248,16 @@ class ValidList(list):
             `list_` is appended at the end of the list, if all its entries are valid.
 
         """
-        if isinstance(list_, Iterable):
-            for value in list_:
-                self._validate(value)
-        else:
+        if not isinstance(list_, Iterable):
             raise TypeError("'{}' object is not iterable".format(type(list_)))
 
         cache = list(list_)  # So that we don't edit a passed reference
+        self._validate_all(cache)
         if self._trigger is not None:
-            for i, value in enumerate(cache):
-                result = self._trigger(value)
-                if result is not None:
-                    cache[i] = result
+            self._apply_trigger(cache)
 
         super().extend(cache)
+        self._changed()
 
     def insert(self, i, value):
         """
@@ -182,3 +285,78 @@ class ValidList(list):
             if result is not None:
                 value = result
         super().insert(i, value)
+        self._changed()
+
+    def remove(self, value):
+        """
+        Remove the first item from the list that is equal to `value`.
+
+        Parameters
+        ----------
+        value: Any
+            The value to remove from the list.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If `value` is not present.
+
+        """
+        self.__delitem__(self.index(value))
+
+    def pop(self, index=-1):
+        """
+        Remove and return the item at `index` (default last).
+
+        Parameters
+        ----------
+        index: int
+            The index of the element to remove.
+
+        Returns
+        -------
+        Any
+            The removed element.
+
+        """
+        value = super().pop(index)
+        self._removed([value])
+        self._changed()
+        return value
+
+    def clear(self):
+        """Remove all items from the list."""
+        removed = list(self)
+        super().clear()
+        self._removed(removed)
+        self._changed()
+
+    def sort(self, *, key=None, reverse=False):
+        """Sort the list in place, as :meth:`list.sort`."""
+        super().sort(key=key, reverse=reverse)
+        self._changed()
+
+    def reverse(self):
+        """Reverse the list in place."""
+        super().reverse()
+        self._changed()
+
+    def _removed(self, values):
+        """Invoke the remove trigger on each of `values`, if there is one."""
+        if self._remove_trigger is not None:
+            for value in values:
+                self._remove_trigger(value)
+
+    def _changed(self):
+        """Drop the cache, and report a change to the entity that holds the list if tracked."""
+        if self._cache is not None:
+            self._cache = None
+        if self._owner is not None:
+            owner = self._owner()
+            if owner is not None:
+                from gemd.entity.change_tracker import mark_modified
+                mark_modified(owner)
@@ -23,10 +23,10 @@ class BaseEnumeration(Enum):
         """
         if name is None:
             return None
-        if any(name == e.value for e in cls):
-            return name
-        if any(name == e for e in cls):
+        if isinstance(name, cls):
             return name.value
+        if cls._lookup(name) is not None:
+            return name
         raise ValueError("'{}' is not a valid choice for enumeration {}".format(name, cls))
 
     @classmethod
@@ -39,8 +39,22 @@ class BaseEnumeration(Enum):
         """
         if name is None:
             return None
-        if any(name == e.value for e in cls):
-            return next(e for e in cls if e.value == name)
-        if any(name == e for e in cls):
+        if isinstance(name, cls):
             return name
+        member = cls._lookup(name)
+        if member is not None:
+            return member
         raise ValueError("'{}' is not a valid choice for enumeration {}".format(name, cls))
+
+    @classmethod
+    def _lookup(cls, value):
+        """
+        Find the member with a given value, or None.
+
+        This uses the value-to-member table that Enum builds when the class is created,
+        so it costs a single dictionary lookup.
+        """
+        try:
+            return cls._value2member_map_.get(value)
+        except TypeError:  # unhashable, so it can't be one of our (string) values
+            return None
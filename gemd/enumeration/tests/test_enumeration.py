@@ -47,3 +47,23 @@ def test_restrictions():
         class BadClass2(BaseEnumeration):
             FIRST = "one"
             SECOND = 2
+
+
+def test_lookup_edge_cases():
+    """Test that lookups reject values from other enums and unhashable values."""
+    class Color(BaseEnumeration):
+        RED = "red"
+
+    class Other(BaseEnumeration):
+        RED = "red"
+
+    with pytest.raises(ValueError):
+        Color.get_value(Other.RED)
+    with pytest.raises(ValueError):
+        Color.get_enum(Other.RED)
+    with pytest.raises(ValueError):
+        Color.get_value(["red"])
+    with pytest.raises(ValueError):
+        Color.get_enum({"red": "red"})
+    with pytest.raises(ValueError):
+        Color.get_value("RED")
@@ -1,5 +1,4 @@
 """An example ingest of a material run."""
-from gemd import units
 from gemd.entity.attribute.condition import Condition
 from gemd.entity.attribute.parameter import Parameter
 from gemd.entity.attribute.property import Property
@@ -9,9 +8,7 @@ from gemd.entity.object import MaterialRun, MeasurementRun
 from gemd.entity.template.condition_template import ConditionTemplate
 from gemd.entity.template.parameter_template import ParameterTemplate
 from gemd.entity.template.property_template import PropertyTemplate
-from gemd.entity.value.discrete_categorical import DiscreteCategorical
-from gemd.entity.value.nominal_real import NominalReal
-from gemd.entity.value.normal_real import NormalReal
+from gemd.ingest.value_parser import ValueParser
 
 known_properties = {
     "density": PropertyTemplate(
@@ -39,44 +36,19 @@ known_parameters = {
 }
 
 
-def _parse_value(val):
-    """Example field-parsing logic."""
-    # If the string is complicated, split it up and try to get uncertainty and/or units
-    if isinstance(val, str) and len(val.split()) > 1:
-        toks = val.split()
-        mean = float(toks[0])
-        std = -1
-        if toks[1] in {"+-", "+/-"}:
-            std = float(toks[2])
-
-        try:
-            unit = units.parse_units(toks[-1])
-        except (ValueError, units.UndefinedUnitError):
-            print("Couldn't find {}".format(toks[-1]))
-            unit = ''
-
-        if std >= 0:
-            return NormalReal(mean=mean, std=std, units=unit)
-        else:
-            return NominalReal(mean, units=unit)
-    # if it is just a number wrap it in a nominal value
-    elif isinstance(val, (float, int)):
-        return NominalReal(val, '')
-    # if it is a single string, its either a single number of a category
-    elif isinstance(val, str):
-        try:
-            num = float(val)
-            return NominalReal(num, '')
-        except ValueError:
-            return DiscreteCategorical(val)
-    else:
-        raise ValueError("Couldn't parse {}".format(val))
-
-
-def ingest_material_run(data, material_spec=None, process_run=None):
-    """Ingest material run with data, a material spec, and an originating process run."""
+def ingest_material_run(data, material_spec=None, process_run=None, *, parser=None):
+    """
+    Ingest material run with data, a material spec, and an originating process run.
+
+    Field values are parsed with `parser`, a :class:`ValueParser
+    <gemd.ingest.value_parser.ValueParser>`; pass one in to share its cache of units between
+    calls and to inspect the fields it could not fully parse in its `errors`.
+    """
+    if parser is None:
+        parser = ValueParser()
+
     if isinstance(data, list):
-        return [ingest_material_run(x, material_spec) for x in data]
+        return [ingest_material_run(x, material_spec, parser=parser) for x in data]
 
     if not isinstance(data, dict):
         raise ValueError("This ingester operates on dict, but got {}".format(type(data)))
@@ -98,7 +70,7 @@ def ingest_material_run(data, material_spec=None, process_run=None):
             prop = Property(
                 name=name,
                 template=known_properties[name],
-                value=_parse_value(experiment[name])
+                value=parser.parse(experiment[name])
             )
             measurement.properties.append(prop)
 
@@ -106,7 +78,7 @@ def ingest_material_run(data, material_spec=None, process_run=None):
             cond = Condition(
                 name=name,
                 template=known_conditions[name],
-                value=_parse_value(experiment[name])
+                value=parser.parse(experiment[name])
             )
             measurement.conditions.append(cond)
 
@@ -114,7 +86,7 @@ def ingest_material_run(data, material_spec=None, process_run=None):
             param = Parameter(
                 name=name,
                 template=known_parameters[name],
-                value=_parse_value(experiment[name])
+                value=parser.parse(experiment[name])
             )
             measurement.parameters.append(param)
 
@@ -3,23 +3,60 @@ from gemd.entity.attribute.condition import Condition
 from gemd.entity.attribute.property import Property
 from gemd.entity.object import MeasurementRun
 from gemd.entity.value.nominal_real import NominalReal
+from gemd.units import parse_units
 
 known_properties = ["vapor pressure"]
 known_conditions = ["temperature"]
 
 
-def ingest_table(material_run, table):
-    """Ingest a material run into an existing table."""
-    for _, row in table.iterrows():
-        exp = MeasurementRun("Material Run")
-        for prop_name in known_properties:
-            if prop_name in row:
-                exp.properties.append(Property(name=prop_name,
-                                               value=NominalReal(row[prop_name], '')))
-        for cond_name in known_conditions:
-            if cond_name in row:
-                exp.conditions.append(Condition(name=cond_name,
-                                                value=NominalReal(row[cond_name], '')))
-        exp.material = material_run
+def ingest_table(material_run, table, *, units=None, templates=None):
+    """
+    Ingest a table of measurements of a material run.
+
+    Each row of the table becomes a MeasurementRun of `material_run`, with a property or
+    condition for each of the known columns, except where the value is missing (None or NaN).
+    The table is processed column by column: the units and template of each column are
+    resolved once, and the values of a column are read in one pass, so the cost is that of
+    constructing the objects.
+
+    :param material_run: the MaterialRun that was measured
+    :param table: a pandas DataFrame, or a dict from column name to a sequence of values
+    :param units: optional dict from column name to the units of its values
+        (default: dimensionless)
+    :param templates: optional dict from column name to the attribute template of its values
+    :return: `material_run`, with a measurement for each row of the table
+    :raises ValueError: if the known columns are not all the same length
+    """
+    units = units or {}
+    templates = templates or {}
+    columns = []  # (attribute class, name, units, template, values)
+    for clazz, names in [(Property, known_properties), (Condition, known_conditions)]:
+        for name in names:
+            if name in table:
+                columns.append((clazz, name, parse_units(units.get(name, '')),
+                                templates.get(name), _values(table[name])))
+    if not columns:
+        return material_run
+    rows = len(columns[0][-1])
+    for _, name, _, _, values in columns:
+        if len(values) != rows:
+            raise ValueError("Column '{}' has {} values, but column '{}' has {}".format(
+                name, len(values), columns[0][1], rows))
+
+    for row in range(rows):
+        attributes = {Property: [], Condition: []}
+        for clazz, name, column_units, template, values in columns:
+            if values[row] is not None and values[row] == values[row]:  # not NaN
+                value = NominalReal(values[row], column_units)
+                attributes[clazz].append(clazz(name=name, template=template, value=value))
+        MeasurementRun("Material Run", material=material_run,
+                       properties=attributes[Property], conditions=attributes[Condition])
 
     return material_run
+
+
+def _values(column) -> list:
+    """Get the values of a column as a list of python objects, e.g. float rather than int64."""
+    if hasattr(column, "tolist"):  # a pandas Series or numpy array
+        return column.tolist()
+    return list(column)
@@ -1,8 +1,13 @@
 """Test an example table."""
+import numpy as np
 import pandas as pd
+import pytest
 
 from gemd.json import load, dump
+from gemd.entity.bounds import RealBounds
 from gemd.entity.object import MaterialRun
+from gemd.entity.template import PropertyTemplate
+from gemd.entity.value import NominalReal
 from gemd.ingest.table_example import ingest_table
 
 
@@ -31,3 +36,41 @@ def test_table():
         copy = load(f)
 
     assert isinstance(copy, MaterialRun)
+
+
+def test_columns():
+    """Ingest a dict of columns, with units and templates, and skip missing values."""
+    template = PropertyTemplate("vapor pressure", bounds=RealBounds(0, 10, "kPa"))
+    columns = {
+        "vapor pressure": np.array([2.0, 3.0, 4.0]),
+        "temperature": [300, None, 400],
+        "ignored": ["a", "b", "c"],
+    }
+    material = ingest_table(MaterialRun("name"), columns,
+                            units={"vapor pressure": "kPa", "temperature": "K"},
+                            templates={"vapor pressure": template})
+    assert len(material.measurements) == 3
+    first, second, _ = material.measurements
+    assert first.properties[0].value == NominalReal(2.0, "kPa")
+    assert type(first.properties[0].value.nominal) is float
+    assert first.properties[0].template is template
+    assert first.conditions[0].value == NominalReal(300, "K")
+    assert second.conditions == []
+
+    # The table is ingested the same way from a DataFrame
+    df = pd.DataFrame(columns)
+    from_df = ingest_table(MaterialRun("name"), df,
+                           units={"vapor pressure": "kPa", "temperature": "K"})
+    assert [m.properties[0].value for m in from_df.measurements] == \
+        [m.properties[0].value for m in material.measurements]
+    assert from_df.measurements[1].conditions == []  # NaN
+
+    assert ingest_table(MaterialRun("name"), {"ignored": [1]}).measurements == []
+
+
+def test_column_lengths():
+    """Columns of different lengths are rejected before anything is ingested."""
+    material = MaterialRun("name")
+    with pytest.raises(ValueError, match="temperature"):
+        ingest_table(material, {"vapor pressure": [2.0, 3.0], "temperature": [300]})
+    assert material.measurements == []
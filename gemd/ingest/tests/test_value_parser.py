@@ -0,0 +1,68 @@
+"""Test the parsing of field values."""
+import numpy as np
+import pytest
+
+from gemd.entity.value import DiscreteCategorical, NominalReal, NormalReal
+from gemd.ingest.material_run_example import ingest_material_run
+from gemd.ingest.value_parser import ValueParser, ParseError
+
+
+def test_parse():
+    """Test parsing single fields."""
+    parser = ValueParser()
+    assert parser.parse("1.0 +- 0.5 g/cm^3") == NormalReal(1.0, 0.5, "g/cm^3")
+    assert parser.parse("1.0 +/- 0.5 g / cm^3") == NormalReal(1.0, 0.5, "g/cm^3")
+    assert parser.parse("300 degF") == NominalReal(300, "degF")
+    assert parser.parse("1.0 +- 0.5") == NormalReal(1.0, 0.5, "")
+    assert parser.parse("3.5") == NominalReal(3.5, "")
+    assert parser.parse(2) == NominalReal(2, "")
+    assert parser.parse("low") == DiscreteCategorical("low")
+    assert parser.errors == []
+
+    with pytest.raises(ValueError):
+        parser.parse(None)
+    with pytest.raises(ValueError):
+        parser.parse("warm day")
+
+    # Unknown units are reported rather than printed, once per field
+    assert parser.parse("2.0 furlongs_per_fortnight") == NominalReal(2.0, "")
+    assert parser.parse("3.0 furlongs_per_fortnight") == NominalReal(3.0, "")
+    assert parser.errors == [
+        ParseError(None, "2.0 furlongs_per_fortnight",
+                   "unrecognized units: furlongs_per_fortnight"),
+        ParseError(None, "3.0 furlongs_per_fortnight",
+                   "unrecognized units: furlongs_per_fortnight")
+    ]
+    assert list(parser._units) == ["g/cm^3", "g / cm^3", "degF", "", "furlongs_per_fortnight"]
+
+
+def test_parse_column():
+    """Test parsing a column into arrays, converting to the units of the column."""
+    reported = []
+    parser = ValueParser(on_error=reported.append)
+    column = ["1.0 +- 0.1 m", "200 cm", 3, "4.0 +- 0.5 kg", "5 bogons", "six m", "7.0 +/- 1 mm"]
+    result = parser.parse_column(column)
+    assert result.units == "meter"
+    np.testing.assert_allclose(result.mean, [1.0, 2.0, np.nan, np.nan, np.nan, np.nan, 0.007])
+    np.testing.assert_allclose(result.std, [0.1, np.nan, np.nan, np.nan, np.nan, np.nan, 0.001])
+    assert [error.index for error in reported] == [4, 5, 2, 3]
+    assert parser.errors == []
+
+    # Offsets apply to the values, but not to the uncertainties
+    temperatures = parser.parse_column(["0 +- 1 degC", "32 degF"], units="K")
+    assert temperatures.units == "kelvin"
+    np.testing.assert_allclose(temperatures.mean, [273.15, 273.15])
+    np.testing.assert_allclose(temperatures.std, [1.0, np.nan])
+
+    assert parser.parse_column([]).units == "dimensionless"
+    with pytest.raises(ValueError):
+        parser.parse_column(["1 m"], units="bogons")
+
+
+def test_ingest_errors():
+    """Test that the problems in an ingest can be inspected afterwards."""
+    parser = ValueParser()
+    data = {"experiments": [{"temperature": "300 bogons", "density": "1.0 g/cm^3"}]}
+    material = ingest_material_run(data, parser=parser)
+    assert len(material.measurements) == 1
+    assert [error.value for error in parser.errors] == ["300 bogons"]
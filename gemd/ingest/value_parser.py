@@ -0,0 +1,205 @@
+"""Parse the values of lab data fields, such as "1.0 +- 0.5 g/cm^3"."""
+from collections import namedtuple
+from typing import Iterable, List, Optional, Tuple
+
+from gemd.entity.value.base_value import BaseValue
+from gemd.entity.value.discrete_categorical import DiscreteCategorical
+from gemd.entity.value.nominal_real import NominalReal
+from gemd.entity.value.normal_real import NormalReal
+from gemd.units import parse_units, convert_units, IncompatibleUnitsError, UndefinedUnitError
+
+_UNCERTAINTY = {"+-", "+/-", "±"}
+
+ParseError = namedtuple("ParseError", ["index", "value", "message"])
+ParseError.__doc__ = """
+A value that could not be parsed, or was only partly understood.
+
+Parameters
+----------
+index: int, optional
+    The position of the value in the column it was parsed from, or None.
+value: Any
+    The value.
+message: str
+    What went wrong.
+
+"""
+
+ParsedColumn = namedtuple("ParsedColumn", ["mean", "std", "units"])
+ParsedColumn.__doc__ = """
+A column of real values, parsed into arrays.
+
+Parameters
+----------
+mean: numpy.ndarray
+    The value of each entry, or NaN if it could not be parsed.
+std: numpy.ndarray
+    The uncertainty of each entry, or NaN if it has none.
+units: str
+    The units of the whole column.
+
+"""
+
+
+class ValueParser(object):
+    """
+    Parses field values into gemd values, a field or a whole column at a time.
+
+    A field is a number, a category, or a string of the form ``"mean [+- std] [units]"``
+    (the uncertainty may also be written ``+/-`` or ``±``).  The units of every field are
+    parsed once per distinct string, including units that are not recognized.  Values that
+    are only partly understood, such as numbers with unknown units, are reported in
+    :attr:`errors` rather than raising, so a long ingest can be inspected afterwards.
+
+    Parameters
+    ----------
+    on_error: Callable[[ParseError], None], optional
+        Called with each problem as it is found.  (Default: append it to :attr:`errors`)
+
+    """
+
+    def __init__(self, *, on_error=None):
+        self.errors = []  # type: List[ParseError]
+        self._on_error = on_error if on_error is not None else self.errors.append
+        self._units = {}  # unit string -> parsed units, or None if they are not recognized
+
+    def parse(self, val) -> BaseValue:
+        """
+        Parse a single field.
+
+        Numbers without units are dimensionless, and strings that are not numbers are
+        categories.  Numbers with units that are not recognized are kept as dimensionless,
+        and reported.
+
+        Parameters
+        ----------
+        val: str, int or float
+            The field.
+
+        Returns
+        -------
+        BaseValue
+            A NormalReal if the field has an uncertainty, a NominalReal if it is a number and a
+            DiscreteCategorical otherwise.
+
+        Raises
+        ------
+        ValueError
+            If the field is neither a number nor a string, or if a string with several parts
+            does not start with a number.
+
+        """
+        if isinstance(val, str):
+            toks = val.split()
+            if len(toks) == 1:
+                try:
+                    return NominalReal(float(val), '')
+                except ValueError:
+                    return DiscreteCategorical(val)
+            mean, std, unit_str = _split(toks)
+            unit = self._parse_units(unit_str, None, val)
+            if unit is None:
+                unit = ''
+            if std is not None:
+                return NormalReal(mean=mean, std=std, units=unit)
+            return NominalReal(mean, units=unit)
+        elif isinstance(val, (float, int)) and not isinstance(val, bool):
+            return NominalReal(val, '')
+        else:
+            raise ValueError("Couldn't parse {}".format(val))
+
+    def parse_column(self, values: Iterable, units: Optional[str] = None) -> ParsedColumn:
+        """
+        Parse a column of real values into arrays.
+
+        The entries of the column may be in different (compatible) units; they are all
+        converted to the units of the column.  Entries that cannot be parsed or converted are
+        NaN in the result, and are reported.
+
+        Parameters
+        ----------
+        values: Iterable[str, int or float]
+            The fields of the column.
+        units: str, optional
+            The units to convert the column to.  (Default: the units of its first entry with
+            recognized units, or dimensionless)
+
+        Returns
+        -------
+        ParsedColumn
+            Arrays of the means and standard deviations, and the units of the column.
+
+        """
+        import numpy as np
+
+        values = list(values)
+        mean = np.full(len(values), np.nan)
+        std = np.full(len(values), np.nan)
+        rows = {}  # parsed units -> the rows in those units
+        for i, val in enumerate(values):
+            if isinstance(val, (float, int)) and not isinstance(val, bool):
+                mean[i] = val
+                rows.setdefault(self._parse_units('', i, val), []).append(i)
+                continue
+            try:
+                val_mean, val_std, unit_str = _split(str(val).split())
+            except (ValueError, IndexError):
+                self._on_error(ParseError(i, val, "not a number"))
+                continue
+            unit = self._parse_units(unit_str, i, val)
+            if unit is not None:
+                mean[i] = val_mean
+                if val_std is not None:
+                    std[i] = val_std
+                rows.setdefault(unit, []).append(i)
+
+        if units is None:
+            units = next(iter(rows), self._parse_units('', None, None))
+        else:
+            try:
+                units = parse_units(units)
+            except (ValueError, AttributeError, TypeError):
+                raise ValueError("Unrecognized units for the column: {}".format(units))
+        for unit, index in rows.items():
+            if unit == units:
+                continue
+            index = np.array(index)
+            try:
+                zero, one = _conversion(unit, units)
+            except (IncompatibleUnitsError, UndefinedUnitError) as err:
+                for i in index:
+                    self._on_error(ParseError(int(i), values[i], str(err)))
+                mean[index] = np.nan
+                std[index] = np.nan
+                continue
+            # Offsets (e.g. degC to K) apply to the means, but not to the uncertainties
+            mean[index] = zero + mean[index] * (one - zero)
+            std[index] = std[index] * (one - zero)
+        return ParsedColumn(mean=mean, std=std, units=units)
+
+    def _parse_units(self, unit_str: str, index, val) -> Optional[str]:
+        """Parse units, reporting (and remembering) them if they are not recognized."""
+        try:
+            unit = self._units[unit_str]
+        except KeyError:
+            try:
+                unit = parse_units(unit_str)
+            except (ValueError, AttributeError, TypeError):  # UndefinedUnitError too
+                unit = None
+            self._units[unit_str] = unit
+        if unit is None:
+            self._on_error(ParseError(index, val, "unrecognized units: {}".format(unit_str)))
+        return unit
+
+
+def _conversion(start: str, final: str) -> Tuple[float, float]:
+    """Get the values of 0 and 1 in `start` units, converted to `final` units."""
+    return convert_units(0.0, start, final), convert_units(1.0, start, final)
+
+
+def _split(toks: List[str]):
+    """Split the parts of a field into its mean, uncertainty (or None) and unit string."""
+    mean = float(toks[0])
+    if len(toks) > 2 and toks[1] in _UNCERTAINTY:
+        return mean, float(toks[2]), " ".join(toks[3:])
+    return mean, None, " ".join(toks[1:])
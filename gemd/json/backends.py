@@ -0,0 +1,186 @@
+"""The json libraries that GEMDJson can encode and decode documents with."""
+import json
+from abc import ABC, abstractmethod
+from typing import Tuple
+
+from gemd.entity.dict_serializable import DictSerializable
+from gemd.json.gemd_encoder import GEMDEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class JSONBackend(ABC):
+    """
+    Encodes containers of gemd objects as json strings, and decodes json strings.
+
+    The output of a backend depends only on its input and keyword arguments, but different
+    backends may format the same document differently (e.g., spacing and the representation of
+    floats), so documents should be compared after loading them rather than as strings.
+    Every backend can load the documents written by every other.
+    """
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """The name that :func:`get_backend` finds the backend by."""
+
+    @abstractmethod
+    def dumps(self, obj, *, sort_keys=True, **kwargs) -> str:
+        """
+        Encode an object, in which gemd objects may be nested.
+
+        Parameters
+        ----------
+        obj:
+            The object to encode.
+        sort_keys: bool
+            Whether to sort the keys of every dict, for canonical output.  Otherwise, the keys
+            are written in the order of the dicts, and gemd objects in the order of
+            :meth:`~gemd.entity.dict_serializable.DictSerializable.as_dict`.
+        **kwargs: keyword args, optional
+            Options for the encoder, as for `json.dumps()`.
+
+        Returns
+        -------
+        str
+            The json string.
+
+        """
+
+    @abstractmethod
+    def loads(self, json_str, *, object_hook=None, **kwargs):
+        """
+        Decode a json string.
+
+        Parameters
+        ----------
+        json_str: str or bytes
+            The json string.
+        object_hook: Callable[[dict], Any], optional
+            Called with each decoded dict, innermost first and in document order, and
+            its return value is used in place of the dict, as for `json.loads()`.
+        **kwargs: keyword args, optional
+            Options for the decoder, as for `json.loads()`.
+
+        Returns
+        -------
+        Any
+            The decoded object.
+
+        """
+
+    @abstractmethod
+    def separators(self, **kwargs) -> Tuple[str, str]:
+        """Get the item and key separators that :meth:`dumps` writes with these options."""
+
+    def __repr__(self):
+        return "<{}>".format(type(self).__name__)
+
+
+class StandardBackend(JSONBackend):
+    """The builtin json module, with :class:`~gemd.json.gemd_encoder.GEMDEncoder`."""
+
+    name = "json"
+
+    def dumps(self, obj, *, sort_keys=True, **kwargs) -> str:
+        """Encode an object, in which gemd objects may be nested."""
+        return json.dumps(obj, cls=GEMDEncoder, sort_keys=sort_keys, **kwargs)
+
+    def loads(self, json_str, *, object_hook=None, **kwargs):
+        """Decode a json string, passing each dict to object_hook."""
+        return json.loads(json_str, object_hook=object_hook, **kwargs)
+
+    def separators(self, **kwargs) -> Tuple[str, str]:
+        """Get the item and key separators that :meth:`dumps` writes with these options."""
+        default = (", ", ": ") if kwargs.get("indent") is None else (",", ": ")
+        return tuple(kwargs.get("separators") or default)
+
+
+class OrjsonBackend(JSONBackend):
+    """
+    The `orjson <https://github.com/ijl/orjson>`_ library, if it is installed.
+
+    It writes compact documents, with no spaces after separators, and floats in their shortest
+    form.  The only options it accepts are ``indent=2``, and ``indent=None`` for none.  Not a
+    number and infinity are written as null, and integers must fit in 64 bits.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:  # pragma: no cover
+            raise ImportError("The orjson backend requires the orjson package")
+
+    def dumps(self, obj, *, sort_keys=True, indent=None, **kwargs) -> str:
+        """Encode an object, in which gemd objects may be nested."""
+        if kwargs:
+            raise TypeError("The orjson backend does not support the options {}".format(
+                sorted(kwargs)))
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        elif indent is not None:
+            raise ValueError("The orjson backend only supports an indent of 2")
+        return orjson.dumps(obj, default=_as_dict, option=option).decode("utf-8")
+
+    def loads(self, json_str, *, object_hook=None, **kwargs):
+        """Decode a json string, passing each dict to object_hook."""
+        if kwargs:
+            raise TypeError("The orjson backend does not support the options {}".format(
+                sorted(kwargs)))
+        obj = orjson.loads(json_str)
+        if object_hook is None:
+            return obj
+        return _apply_hook(obj, object_hook)
+
+    def separators(self, **kwargs) -> Tuple[str, str]:
+        """Get the item and key separators that :meth:`dumps` writes with these options."""
+        return ",", ":"
+
+
+BACKENDS = {backend.name: backend for backend in (StandardBackend, OrjsonBackend)}
+
+
+def get_backend(backend=None) -> JSONBackend:
+    """
+    Get a json backend by name.
+
+    The names are those of :data:`BACKENDS`, plus ``"auto"`` for the fastest backend that is
+    installed: orjson if it is, and otherwise the builtin json module.
+
+    :param backend: the name of the backend, or a JSONBackend, which is returned as it is.
+        Defaults to ``"json"``, the builtin json module.
+    :return: the backend
+    """
+    if isinstance(backend, JSONBackend):
+        return backend
+    if backend is None:
+        backend = StandardBackend.name
+    if backend == "auto":
+        backend = OrjsonBackend.name if orjson is not None else StandardBackend.name
+    if backend not in BACKENDS:
+        raise ValueError("Unknown json backend {!r}; expected one of {}".format(
+            backend, sorted(BACKENDS) + ["auto"]))
+    return BACKENDS[backend]()
+
+
+def _as_dict(obj):
+    """Convert a gemd object for orjson, which serializes enumerations natively."""
+    if isinstance(obj, DictSerializable):
+        return obj.as_dict()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(obj).__name__))
+
+
+def _apply_hook(obj, object_hook):
+    """Replace each dict in parsed json with the result of the hook, innermost first."""
+    if type(obj) is dict:
+        for key, value in obj.items():
+            if type(value) is dict or type(value) is list:
+                obj[key] = _apply_hook(value, object_hook)
+        return object_hook(obj)
+    if type(obj) is list:
+        return [_apply_hook(x, object_hook) for x in obj]
+    return obj
@@ -1,10 +1,17 @@
+import asyncio
+import copy
 import inspect
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 from gemd.entity.attribute.condition import Condition
 from gemd.entity.attribute.parameter import Parameter
 from gemd.entity.attribute.property import Property
 from gemd.entity.attribute.property_and_conditions import PropertyAndConditions
 from gemd.entity.base_entity import BaseEntity
+from gemd.entity.dict_serializable import DictSerializable, _init_arg_names
 from gemd.entity.bounds.categorical_bounds import CategoricalBounds
 from gemd.entity.bounds.composition_bounds import CompositionBounds
 from gemd.entity.bounds.integer_bounds import IntegerBounds
@@ -36,9 +43,15 @@ from gemd.entity.value.uniform_integer import UniformInteger
 from gemd.entity.value.uniform_real import UniformReal
 from gemd.entity.value.smiles_value import Smiles
 from gemd.entity.value.inchi_value import InChI
-from gemd.json import GEMDEncoder
-from gemd.util import flatten, substitute_links, set_uuids
-import json as json_builtin
+from gemd.enumeration.base_enumeration import BaseEnumeration
+from gemd.entity.template.attribute_template import AttributeTemplate
+from gemd.entity.template.base_template import BaseTemplate
+from gemd.json.backends import get_backend
+from gemd.entity.change_tracker import paused
+from gemd.util import flatten, substitute_links, substitute_objects, set_uuids, \
+    recursive_foreach, recursive_flatmap, writable_sort_order
+from gemd.util.impl import _substitute
+from gemd.util.instrumentation import _null_context, _phase, _size
 
 
 class GEMDJson(object):
@@ -49,6 +62,21 @@ class GEMDJson(object):
     :ref:`Serialization In Depth`
 
     scope: defines the scope to use for autogenerated UUIDs for objects without uids
+    template_index: an optional :class:`TemplateIndex <gemd.util.template_index.TemplateIndex>`
+    to add every deserialized object to
+    instrumentation: an optional :class:`Instrumentation
+    <gemd.util.instrumentation.Instrumentation>` to record the phases of :meth:`dumps`,
+    :meth:`loads`, :meth:`async_dump`, :meth:`async_load`, :meth:`dumps_changes`,
+    :meth:`dumps_batch`, :meth:`loads_batch` and :meth:`copy` in
+    backend: the :class:`JSONBackend <gemd.json.backends.JSONBackend>` to encode and decode
+    with, or its name (see :func:`get_backend <gemd.json.backends.get_backend>`); defaults
+    to the builtin json module
+    canonical: whether documents are written in canonical form, with the keys of every dict
+    sorted (the default).  Otherwise, the fields of each object are written in a fixed order
+    for its class (see :meth:`DictSerializable.as_dict
+    <gemd.entity.dict_serializable.DictSerializable.as_dict>`), and other dicts in their own
+    order, which is faster but may differ between equal objects.  Either can be overridden by
+    passing ``sort_keys`` to a method that writes documents.
     """
 
     _clazzes = [
@@ -67,18 +95,42 @@ class GEMDJson(object):
 
     _link_type = LinkByUID
 
-    def __init__(self, scope='auto'):
+    def __init__(self, scope='auto', *, template_index=None, instrumentation=None,
+                 backend=None, canonical=True):
         self._scope = scope
-        self._clazz_index = {}
-        # build index from the class's typ member to the class itself
-        for clazz in self._clazzes:
-            self._clazz_index[clazz.typ] = clazz
+        self._template_index = template_index
+        self._instrumentation = instrumentation
+        self._backend = get_backend(backend)
+        self._canonical = canonical
+        # The index from the class's typ member to the class itself, and the decoder of each
+        # type, are shared by every instance until classes are registered
+        self._clazz_index, self._decoders = _registry(self._clazzes, self._link_type)
 
     @property
     def scope(self):
         """Return the default scope value."""
         return self._scope
 
+    @property
+    def template_index(self):
+        """Return the index of template usage that deserialized objects are added to, if any."""
+        return self._template_index
+
+    @property
+    def instrumentation(self):
+        """Return the instrumentation that records the phases of serialization, if any."""
+        return self._instrumentation
+
+    @property
+    def backend(self):
+        """Return the json backend that documents are encoded and decoded with."""
+        return self._backend
+
+    @property
+    def canonical(self):
+        """Return whether documents are written with the keys of every dict sorted."""
+        return self._canonical
+
     def dumps(self, obj, **kwargs):
         """
         Serialize a gemd object, or container of them, into a json-formatting string.
@@ -96,13 +148,22 @@ class GEMDJson(object):
             A string version of the serialized objects.
 
         """
-        # create a top level list of [flattened_objects, link-i-fied return value]
-        res = {"object": obj}
+        instrumentation = self._instrumentation
+        with instrumentation or _null_context():
+            # create a top level list of [flattened_objects, link-i-fied return value]
+            res = {"object": obj}
 
-        additional = flatten(res, self.scope)
-        res = substitute_links(res)
-        res["context"] = additional
-        return json_builtin.dumps(res, cls=GEMDEncoder, sort_keys=True, **kwargs)
+            with _phase(instrumentation, "dumps.flatten"):
+                additional = flatten(res, self.scope)
+            with _phase(instrumentation, "dumps.substitute_links"):
+                res = substitute_links(res)
+            # The context comes first, so that it is indexed before the object's links
+            res = {"context": additional, "object": res["object"]}
+            with _phase(instrumentation, "dumps.encode"):
+                result = self._encode(res, kwargs)
+        if instrumentation is not None:
+            instrumentation.count("dumps.bytes", _size(result))
+        return result
 
     def loads(self, json_str, **kwargs):
         """
@@ -125,8 +186,12 @@ class GEMDJson(object):
         # Create an index to hold the objects by their uid reference
         # so we can replace links with pointers
         index = {}
-        raw = json_builtin.loads(
-            json_str, object_hook=lambda x: self._load_and_index(x, index, True), **kwargs)
+        instrumentation = self._instrumentation
+        if instrumentation is not None:
+            instrumentation.count("loads.bytes", _size(json_str))
+        with _phase(instrumentation, "loads.decode"):
+            raw = self._backend.loads(
+                json_str, object_hook=lambda x: self._load_and_index(x, index, True), **kwargs)
         # the return value is in the 2nd position.
         return raw["object"]
 
@@ -170,22 +235,533 @@ class GEMDJson(object):
         fp.write(self.dumps(obj, **kwargs))
         return
 
+    async def async_load(self, fp, *, chunk_size=2 ** 16, slice_size=1000, executor=None,
+                         **kwargs):
+        """
+        Load serialized string representation of an object from an async stream.
+
+        This is the asyncio counterpart of :meth:`load`.  `fp` is read `chunk_size` at a time,
+        and the document is decoded in an executor: first parsed into plain containers, then
+        built into gemd objects `slice_size` entities at a time.  Control returns to the
+        event loop between reads and between slices, so other tasks keep running while a large
+        document is loaded.
+
+        Parameters
+        ----------
+        fp: async stream
+            Stream to read, such as an :class:`asyncio.StreamReader`.  Its ``read(n)`` method may
+            be a coroutine or a regular method, and may return either str or bytes.
+        chunk_size: int
+            The maximum number of characters (or bytes) to read at a time.
+        slice_size: int
+            The number of entities to build in each call to the executor.
+        executor: concurrent.futures.Executor, optional
+            Executor to decode in; defaults to the event loop's default executor.
+        **kwargs: keyword args, optional
+            Optional keyword arguments to pass to `json.loads()`.
+
+        Returns
+        -------
+        DictSerializable or List[DictSerializable]
+            Deserialized object(s).
+
+        """
+        loop = asyncio.get_event_loop()
+        instrumentation = self._instrumentation
+        chunks = []
+        with _phase(instrumentation, "async_load.read"):
+            while True:
+                chunk = fp.read(chunk_size)
+                if inspect.isawaitable(chunk):
+                    chunk = await chunk
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        data = chunks[0][:0].join(chunks) if chunks else ""
+        if instrumentation is not None:
+            instrumentation.count("async_load.bytes", _size(data))
+
+        with _phase(instrumentation, "async_load.decode"):
+            raw = await loop.run_in_executor(
+                executor, partial(self._backend.loads, data, **kwargs))
+        with _phase(instrumentation, "async_load.build"):
+            if not isinstance(raw, dict):
+                return await loop.run_in_executor(executor, self._build, raw, {})
+
+            # Build the context first, so that links in the object can be substituted
+            index = {}
+            context = raw.get("context", [])
+            for start in range(0, len(context), slice_size):
+                context[start:start + slice_size] = await loop.run_in_executor(
+                    executor, self._build, context[start:start + slice_size], index)
+            return await loop.run_in_executor(executor, self._build, raw.get("object"), index)
+
+    async def async_dump(self, obj, fp, *, chunk_size=2 ** 16, slice_size=1000, executor=None,
+                         **kwargs):
+        """
+        Dump an object to an async stream, as a serialized string.
+
+        This is the asyncio counterpart of :meth:`dump`, and writes the same document.
+        The object's history is flattened in an executor and then encoded `slice_size`
+        entities at a time, also in the executor.  The output is written to `fp` in pieces of
+        about `chunk_size` characters, waiting for the stream to drain after each one.
+
+        Parameters
+        ----------
+        obj: DictSerializable or List[DictSerializable]
+            Object(s) to dump
+        fp: async stream
+            Stream to write to, such as an :class:`asyncio.StreamWriter` (which is written
+            bytes encoded as utf-8).  Its ``write`` method may be a coroutine or a regular
+            method, and its ``drain`` method, if any, is awaited after each write.
+        chunk_size: int
+            The approximate number of characters to write at a time.
+        slice_size: int
+            The number of entities to encode in each call to the executor.
+        executor: concurrent.futures.Executor, optional
+            Executor to encode in; defaults to the event loop's default executor.
+        **kwargs: keyword args, optional
+            Optional keyword arguments to pass to `json.dumps()`.
+
+        Returns
+        -------
+        None
+
+        """
+        loop = asyncio.get_event_loop()
+        instrumentation = self._instrumentation
+        encode = partial(self._backend.dumps, **self._options(kwargs))
+        encode_bytes = isinstance(fp, asyncio.StreamWriter)
+        buffer = []
+        buffered = 0
+
+        async def _write(text, flush=False):
+            nonlocal buffered
+            buffer.append(text)
+            buffered += len(text)
+            if buffered < chunk_size and not flush:
+                return
+            data = "".join(buffer)
+            buffer.clear()
+            buffered = 0
+            if instrumentation is not None:
+                instrumentation.count("async_dump.bytes", _size(data))
+            with _phase(instrumentation, "async_dump.write"):
+                result = fp.write(data.encode("utf-8") if encode_bytes else data)
+                if inspect.isawaitable(result):
+                    await result
+                if hasattr(fp, "drain"):
+                    await fp.drain()
+
+        res = {"object": obj}
+        with _phase(instrumentation, "async_dump.flatten"):
+            context = await loop.run_in_executor(executor, flatten, res, self.scope)
+        with _phase(instrumentation, "async_dump.substitute_links"):
+            res = await loop.run_in_executor(executor, substitute_links, res)
+        if kwargs.get("indent") is not None:
+            # Indentation depends on nesting, so the document is encoded as a whole
+            with _phase(instrumentation, "async_dump.encode"):
+                text = await loop.run_in_executor(
+                    executor, encode, {"context": context, "object": res["object"]})
+            for start in range(0, len(text), chunk_size):
+                await _write(text[start:start + chunk_size])
+            await _write("", flush=True)
+            return
+
+        # The context is written first, to match dumps
+        item_sep, key_sep = self._backend.separators(**kwargs)
+        await _write("{" + encode("context") + key_sep + "[")
+        for start in range(0, len(context), slice_size):
+            with _phase(instrumentation, "async_dump.encode"):
+                pieces = await loop.run_in_executor(
+                    executor, _encode_all, encode, context[start:start + slice_size])
+            await _write((item_sep if start else "") + item_sep.join(pieces))
+        with _phase(instrumentation, "async_dump.encode"):
+            text = await loop.run_in_executor(executor, encode, res["object"])
+        await _write("]" + item_sep + encode("object") + key_sep + text + "}", flush=True)
+
     def copy(self, obj):
         """
-        Copy an object by dumping and then loading it.
+        Copy an object, and every entity connected to it.
+
+        The copy is the same as dumping and then loading the object would give, but the graph
+        is copied directly, without encoding it.  Entities without uids are assigned one, and
+        every entity connected to `obj`, in either direction of a bidirectional link, is
+        copied.  The copies are constructed in the order :meth:`loads` would construct them,
+        so the lists of ingredients and measurements that the constructors fill in are in the
+        same order as well.  LinkByUIDs to entities in the graph become pointers to their
+        copies.  Objects that are referenced more than once are copied once, and immutable
+        values such as strings and enumerations are shared with the original.
+
+        For graphs of more than about 100,000 entities, most of the time is spent in the
+        cyclic garbage collector, which repeatedly scans the original and the growing copy;
+        wrap the call in :func:`gc_paused <gemd.util.impl.gc_paused>` to avoid that.
 
         Parameters
         ----------
-        obj: DictSerializable
-            Object to copy
+        obj: DictSerializable or List[DictSerializable]
+            Object(s) to copy
 
         Returns
         -------
-        DictSerializable
+        DictSerializable or List[DictSerializable]
             A copy of `obj`.
 
         """
-        return self.loads(self.dumps(obj))
+        instrumentation = self._instrumentation
+        entities = []
+        known_uids = set()
+        index = {}
+
+        def _gather(entity):
+            if len(entity.uids) == 0:
+                entity.add_uid(self.scope, str(uuid.uuid4()))
+            # Entities that share a uid with an earlier one are dropped, as in flatten
+            uids = list(entity.uids.items())
+            if not any(uid in known_uids for uid in uids):
+                entities.append(entity)
+            for scope, uid in uids:
+                known_uids.add((scope, uid))
+                index.setdefault((scope.lower(), uid), entity)
+            return []
+
+        recursive_flatmap(obj, _gather, unidirectional=False)
+        canonical = {id(entity) for entity in entities}
+        memo = {}  # id(original) -> copy
+        kinds = {}  # class -> how its instances are copied
+        leaves = set()  # the classes whose instances are used as they are, checked inline
+
+        def _copy(thing):
+            clazz = type(thing)
+            kind = kinds.get(clazz)
+            if kind is None:
+                kind = kinds[clazz] = _copy_kind(clazz, self._link_type)
+                if kind == "leaf":
+                    leaves.add(clazz)
+            if kind == "leaf":
+                return thing  # Immutable, or copied by the setter it is passed to
+            if kind == "list":
+                return [x if type(x) in leaves else _copy(x) for x in thing]
+            if kind == "dict":
+                return {_copy(k): v if type(v) in leaves else _copy(v) for k, v in thing.items()}
+            if kind == "enumeration":
+                return thing.value  # As it is serialized
+            if id(thing) in memo:
+                return memo[id(thing)]
+
+            if kind == "link":
+                target = index.get((thing.scope.lower(), thing.id))
+                new = self._link_type.from_dict(thing.as_dict()) if target is None \
+                    else _copy(target)
+            elif kind == "entity" and id(thing) not in canonical:
+                scope, uid = next(iter(thing.uids.items()))
+                new = _copy(index[(scope.lower(), uid)])
+            elif thing.typ in self._decoders:
+                attributes = {k: v if type(v) in leaves else _copy(v)
+                              for k, v in thing.as_dict().items()}
+                new = self._decoders[attributes.pop("type")][0](attributes)
+                if self._template_index is not None:
+                    self._template_index.add(new)
+            else:
+                raise TypeError("Unexpected base object type: {}".format(thing.typ))
+            memo[id(thing)] = new
+            return new
+
+        orders = {typ: writable_sort_order(typ) for typ in {x.typ for x in entities}}
+        with _phase(instrumentation, "copy"):
+            # Dependencies sort first, so each entity's forward links are already copied
+            for entity in sorted(entities, key=lambda x: orders[x.typ]):
+                _copy(entity)
+            result = _copy(obj)
+        if instrumentation is not None:
+            instrumentation.count_entities("copy", entities)
+        return result
+
+    def dumps_changes(self, tracker, *, checkpoint=True, **kwargs):
+        """
+        Serialize only the entities that a change tracker recorded as modified.
+
+        The result is in the format produced by :meth:`dumps`.  Its context holds the modified
+        entities, with LinkByUID in place of pointers to any other entity, and its object is
+        a list of links to them.  Only the modified entities are visited, so the cost does not
+        depend on the size of the graphs they belong to.
+
+        Entities without uids are assigned one.  An entity without uids that is linked from a
+        modified entity has never been serialized, so it is included as well.
+
+        Parameters
+        ----------
+        tracker: ChangeTracker
+            The tracker that recorded the changes.
+        checkpoint: bool
+            Whether to checkpoint the tracker afterwards, so that the next call only includes
+            later changes.  (Default: True)
+        **kwargs: keyword args, optional
+            Optional keyword arguments to pass to `json.dumps()`.
+
+        Returns
+        -------
+        str
+            A string version of the modified entities.
+
+        """
+        instrumentation = self._instrumentation
+        entities = tracker.modified
+        included = {id(x) for x in entities}
+
+        def _make_link(entity):
+            if len(entity.uids) == 0:
+                entity.add_uid(self.scope, str(uuid.uuid4()))
+                if id(entity) not in included:
+                    included.add(id(entity))
+                    entities.append(entity)
+            return self._link_type.from_entity(entity)
+
+        for entity in entities:
+            if len(entity.uids) == 0:
+                entity.add_uid(self.scope, str(uuid.uuid4()))
+        with paused(), _phase(instrumentation, "dumps_changes.substitute_links"):
+            # The substituted copies are not changes
+            context = []
+            for entity in entities:  # entities may grow as new entities are linked
+                context.append(_substitute(
+                    entity, sub=_make_link,
+                    applies=lambda o, e=entity: o is not e and isinstance(o, BaseEntity)))
+        res = {"context": sorted(context, key=writable_sort_order),
+               "object": [self._link_type.from_entity(x) for x in entities]}
+        with _phase(instrumentation, "dumps_changes.encode"):
+            result = self._encode(res, kwargs)
+        if instrumentation is not None:
+            instrumentation.count_entities("dumps_changes", entities)
+            instrumentation.count("dumps_changes.bytes", _size(result))
+        if checkpoint:
+            tracker.checkpoint()
+        return result
+
+    def dump_changes(self, tracker, fp, *, checkpoint=True, **kwargs):
+        """
+        Dump the entities that a change tracker recorded as modified to a file.
+
+        Parameters
+        ----------
+        tracker: ChangeTracker
+            The tracker that recorded the changes.
+        fp: file
+            File to write to.
+        checkpoint: bool
+            Whether to checkpoint the tracker afterwards.  (Default: True)
+        **kwargs: keyword args, optional
+            Optional keyword arguments to pass to `json.dumps()`.
+
+        Returns
+        -------
+        None
+
+        """
+        fp.write(self.dumps_changes(tracker, checkpoint=checkpoint, **kwargs))
+
+    def dumps_batch(self, objs, *, workers=None, **kwargs):
+        """
+        Serialize a list of independent objects in parallel, one string per object.
+
+        Each object's history is flattened, link-substituted and encoded in a separate
+        process.  The templates used by the objects are serialized only once, into a first,
+        shared document, and are left out of the contexts of the per-object documents (which
+        refer to them by LinkByUID).  Entities other than templates that are shared between
+        objects appear in the context of each object that uses them.
+
+        Unique identifiers are assigned to `objs` before they are sent to the workers, so the
+        documents are consistent with each other and with the objects passed in.  On platforms
+        that start worker processes by spawning, this must be called from code guarded by
+        ``if __name__ == "__main__"``.
+
+        Parameters
+        ----------
+        objs: List[DictSerializable]
+            The objects to serialize.
+        workers: int, optional
+            The number of worker processes; defaults to the number of CPUs.
+            With a single worker the objects are serialized in this process.
+        **kwargs: keyword args, optional
+            Optional keyword arguments to pass to `json.dumps()`.
+
+        Returns
+        -------
+        List[str]
+            The shared template document, followed by one document per object in `objs`,
+            in order.  Each is in the format produced by :meth:`dumps`.
+
+        """
+        return list(self._iter_batch(objs, workers, kwargs))
+
+    def dump_batch(self, objs, fp, *, workers=None, **kwargs):
+        """
+        Serialize a list of independent objects in parallel into an ordered stream.
+
+        The documents produced by :meth:`dumps_batch` are written to `fp` one per line, as soon
+        as each is ready and in the same order.  To write them to separate files instead, use
+        :meth:`dumps_batch`.
+
+        Parameters
+        ----------
+        objs: List[DictSerializable]
+            The objects to serialize.
+        fp: file
+            File to write to.
+        workers: int, optional
+            The number of worker processes; defaults to the number of CPUs.
+        **kwargs: keyword args, optional
+            Optional keyword arguments to pass to `json.dumps()`.  `indent` is not supported,
+            because each document must fit on one line.
+
+        Returns
+        -------
+        None
+
+        """
+        if kwargs.get("indent") is not None:
+            raise ValueError("dump_batch writes one document per line, so indent is not allowed")
+        for doc in self._iter_batch(objs, workers, kwargs):
+            fp.write(doc)
+            fp.write("\n")
+
+    def _iter_batch(self, objs, workers, kwargs):
+        """Yield the shared template document, then each object's document in order."""
+        templates = []
+        template_uids = set()
+
+        def _prepare(entity):
+            if len(entity.uids) == 0:
+                entity.add_uid(self.scope, str(uuid.uuid4()))
+            if isinstance(entity, (BaseTemplate, AttributeTemplate)):
+                uids = [(scope.lower(), uid) for scope, uid in entity.uids.items()]
+                # Equivalent copies of a template share a uid; keep only the first
+                if not any(uid in template_uids for uid in uids):
+                    templates.append(entity)
+                template_uids.update(uids)
+        instrumentation = self._instrumentation
+        with _phase(instrumentation, "dumps_batch.prepare"):
+            recursive_foreach(objs, _prepare)
+
+        yield self.dumps(templates, **kwargs)
+
+        # The workers are sent a copy without the instrumentation, which may not be picklable;
+        # the documents are timed and counted here as they come back
+        worker_json = copy.copy(self)
+        worker_json._instrumentation = None
+        worker_json._template_index = None
+        tasks = [(worker_json, obj, kwargs) for obj in objs]
+        if workers == 1:
+            yield from self._collect_batch(map(_dumps_history, tasks))
+            return
+        chunksize = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from self._collect_batch(
+                executor.map(_dumps_history, tasks, chunksize=chunksize))
+
+    def _collect_batch(self, docs):
+        """Yield the documents from the workers, recording the time spent waiting for each."""
+        instrumentation = self._instrumentation
+        docs = iter(docs)
+        while True:
+            with _phase(instrumentation, "dumps_batch.encode"):
+                doc = next(docs, None)
+            if doc is None:
+                return
+            if instrumentation is not None:
+                instrumentation.count("dumps_batch.bytes", _size(doc))
+            yield doc
+
+    def loads_batch(self, json_strs, *, workers=None, **kwargs):
+        """
+        Deserialize a list of documents in parallel, linking objects across documents.
+
+        This is the counterpart of :meth:`dumps_batch`, and also accepts any list of documents
+        in the format produced by :meth:`dumps`, such as the shards of a large export.
+        Each document is parsed in a separate process into a flat list of entities.  The
+        entities from all documents are then merged into one uid index and the links between
+        them are resolved in a single pass, so that the result is linked the same way as if
+        all of the documents had been loaded together.
+
+        Parameters
+        ----------
+        json_strs: List[str]
+            The documents to deserialize.
+        workers: int, optional
+            The number of worker processes; defaults to the number of CPUs.
+            With a single worker the documents are parsed in this process.
+        **kwargs: keyword args, optional
+            Optional keyword arguments to pass to `json.loads()`.
+
+        Returns
+        -------
+        List[DictSerializable or List[DictSerializable]]
+            The deserialized object(s) of each document, in order.
+
+        """
+        # Each document is indexed separately, and the indices are combined as they come back,
+        # so the workers are not sent this index
+        shard_json = copy.copy(self)
+        shard_json._instrumentation = None  # It may not be picklable; the shards are timed here
+        # Only the entities that survive deduplication are added to the template index, once
+        # they are linked, so the shards do not index anything
+        shard_json._template_index = None
+        tasks = [(shard_json, json_str, kwargs) for json_str in json_strs]
+        instrumentation = self._instrumentation
+        with _phase(instrumentation, "loads_batch.decode"):
+            if workers == 1:
+                shards = list(map(_loads_shard, tasks))
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    shards = list(executor.map(_loads_shard, tasks))
+        if instrumentation is not None:
+            instrumentation.count("loads_batch.bytes", sum(_size(x) for x in json_strs))
+
+        with instrumentation or _null_context(), _phase(instrumentation, "loads_batch.link"):
+            index = {}
+            for _, context in shards:
+                for entity in context:
+                    for scope, uid in entity.uids.items():
+                        index[(scope.lower(), uid)] = entity
+
+            # Entities that lost to a duplicate with the same uid are dropped, rather than linked
+            canonical = {id(entity): entity for entity in index.values()}
+            kept = []
+            for _, context in shards:
+                for entity in context:
+                    if canonical.pop(id(entity), None) is not None:
+                        substitute_objects(entity, index, inplace=True)
+                        kept.append(entity)
+            result = [substitute_objects(obj, index, inplace=True) for obj, _ in shards]
+
+        if self._template_index is not None:
+            with _phase(instrumentation, "loads_batch.index"):
+                for entity in kept:
+                    _index_templates(self._template_index, entity)
+                # Any entities in the objects are among those kept
+                _index_templates(self._template_index, result, entities=False)
+        return result
+
+    def load_batch(self, fp, *, workers=None, **kwargs):
+        """
+        Deserialize the ordered stream of documents written by :meth:`dump_batch`.
+
+        Parameters
+        ----------
+        fp: file
+            File to read, with one document per line.
+        workers: int, optional
+            The number of worker processes; defaults to the number of CPUs.
+        **kwargs: keyword args, optional
+            Optional keyword arguments to pass to `json.loads()`.
+
+        Returns
+        -------
+        List[DictSerializable or List[DictSerializable]]
+            The deserialized object(s) of each document, in order.
+
+        """
+        return self.loads_batch([line for line in fp if line.strip()], workers=workers, **kwargs)
 
     def raw_dumps(self, obj, **kwargs):
         """
@@ -204,7 +780,7 @@ class GEMDJson(object):
             A serialized string of `obj`, which could be nested
 
         """
-        return json_builtin.dumps(obj, cls=GEMDEncoder, sort_keys=True, **kwargs)
+        return self._encode(obj, kwargs)
 
     def thin_dumps(self, obj, **kwargs):
         """
@@ -225,7 +801,7 @@ class GEMDJson(object):
         """
         set_uuids(obj, self.scope)
         res = substitute_links(obj)
-        return json_builtin.dumps(res, cls=GEMDEncoder, sort_keys=True, **kwargs)
+        return self._encode(res, kwargs)
 
     def raw_loads(self, json_str, **kwargs):
         """
@@ -247,7 +823,7 @@ class GEMDJson(object):
         # Create an index to hold the objects by their uid reference
         # so we can replace links with pointers
         index = {}
-        return json_builtin.loads(
+        return self._backend.loads(
             json_str, object_hook=lambda x: self._load_and_index(x, index), **kwargs)
 
     def register_classes(self, classes):
@@ -273,7 +849,35 @@ class GEMDJson(object):
             raise ValueError(
                 "The values must be classes, but got {} as values".format(non_class_values))
 
-        self._clazz_index.update(classes)
+        # Copy the shared registry, rather than changing it for every instance
+        self._clazz_index = dict(self._clazz_index, **classes)
+        self._decoders = dict(self._decoders)
+        self._decoders.update(_compile_decoders(classes))
+
+    def _options(self, kwargs):
+        """Get the options to encode with: kwargs, sorting keys unless they say otherwise."""
+        return dict(kwargs, sort_keys=kwargs.get("sort_keys", self._canonical))
+
+    def _encode(self, obj, kwargs):
+        """Encode an object with the backend and the options in kwargs."""
+        return self._backend.dumps(obj, **self._options(kwargs))
+
+    def _build(self, obj, object_index, substitute=True):
+        """
+        Build gemd objects from parsed json, as if :meth:`_load_and_index` were the object hook.
+
+        :param obj: the output of `json.loads()`, with no object hook
+        :param object_index: to add objects to and to substitute LinkByUIDs from
+        :param substitute: whether to substitute LinkByUIDs when they are found in the index
+        :return: obj, with every recognized dict replaced by the deserialized object
+        """
+        if isinstance(obj, dict):
+            return self._load_and_index(
+                {k: self._build(v, object_index, substitute) for k, v in obj.items()},
+                object_index, substitute)
+        if isinstance(obj, list):
+            return [self._build(x, object_index, substitute) for x in obj]
+        return obj
 
     def _load_and_index(self, d, object_index, substitute=False):
         """
@@ -286,22 +890,139 @@ class GEMDJson(object):
         :param substitute: whether to substitute LinkByUIDs when they are found in the index
         :return: the deserialized object, or the input dict if it wasn't recognized
         """
-        if "type" not in d:
-            return d
-        typ = d.pop("type")
-
-        if typ in self._clazz_index:
-            clz = self._clazz_index[typ]
-            obj = clz.from_dict(d)
-        elif typ == self._link_type.typ:
-            obj = self._link_type.from_dict(d)
-            if substitute and (obj.scope.lower(), obj.id) in object_index:
-                return object_index[(obj.scope.lower(), obj.id)]
-            return obj
-        else:
+        typ = d.get("type")
+        decoder = self._decoders.get(typ)
+        if decoder is None:
+            if "type" not in d:
+                return d
             raise TypeError("Unexpected base object type: {}".format(typ))
+        del d["type"]
+        construct, kind = decoder
+        obj = construct(d)
 
-        if isinstance(obj, BaseEntity):
+        if kind is _LINK:
+            if not substitute:
+                return obj
+            found = object_index.get((obj.scope.lower(), obj.id), obj)
+            if self._instrumentation is not None:
+                self._instrumentation.count(
+                    "loads.links.misses" if found is obj else "loads.links.hits")
+            return found
+        if kind is _ENTITY:
             for (scope, uid) in obj.uids.items():
                 object_index[(scope.lower(), uid)] = obj
+            if self._instrumentation is not None:
+                self._instrumentation.count("loads.entities." + typ)
+        if self._template_index is not None:
+            self._template_index.add(obj)
         return obj
+
+
+def _dumps_history(task):
+    """
+    Serialize an object's history, leaving templates out of the context.
+
+    This is the unit of work for :meth:`GEMDJson.dumps_batch`, so it is a module-level function
+    that can be sent to worker processes.
+    """
+    encoder, obj, kwargs = task
+    res = {"object": obj}
+    additional = [x for x in flatten(res, encoder.scope)
+                  if not isinstance(x, (BaseTemplate, AttributeTemplate))]
+    res = substitute_links(res)
+    return encoder._encode({"context": additional, "object": res["object"]}, kwargs)
+
+
+_OBJECT, _ENTITY, _LINK = "object", "entity", "link"  # How a decoded object is indexed
+_registries = {}  # (classes, link type) -> (class index, decoders), shared by GEMDJson instances
+
+
+def _registry(clazzes, link_type):
+    """Get the class index and decoders for a list of classes, building them the first time."""
+    key = (tuple(clazzes), link_type)
+    if key not in _registries:
+        clazz_index = {clazz.typ: clazz for clazz in clazzes}
+        construct, _ = _compile_decoders({link_type.typ: link_type})[link_type.typ]
+        decoders = {link_type.typ: (construct, _LINK)}
+        decoders.update(_compile_decoders(clazz_index))
+        _registries[key] = (clazz_index, decoders)
+    return _registries[key]
+
+
+def _compile_decoders(clazz_index):
+    """
+    Build the decoder of each type: a function from the fields to the object, and its kind.
+
+    Unless a class overrides from_dict, the fields are passed straight to the constructor
+    when they are all arguments of it.  Otherwise, from_dict drops (and logs) the others.
+    """
+    decoders = {}
+    for typ, clazz in clazz_index.items():
+        construct = clazz.from_dict
+        if getattr(construct, "__func__", None) is DictSerializable.from_dict.__func__:
+            construct = partial(_construct, clazz, _init_arg_names(clazz))
+        decoders[typ] = (construct, _ENTITY if issubclass(clazz, BaseEntity) else _OBJECT)
+    return decoders
+
+
+def _construct(clazz, arg_names, fields):
+    """Construct an object from its fields; the decoder of most types."""
+    if arg_names.issuperset(fields):
+        return clazz(**fields)
+    return clazz.from_dict(fields)
+
+
+def _copy_kind(clazz, link_type):
+    """Classify a class by how GEMDJson.copy copies its instances."""
+    if issubclass(clazz, (list, tuple)):
+        return "list"
+    if issubclass(clazz, dict):
+        return "dict"
+    if issubclass(clazz, BaseEnumeration):
+        return "enumeration"
+    if issubclass(clazz, link_type):
+        return "link"
+    if issubclass(clazz, BaseEntity):
+        return "entity"
+    if issubclass(clazz, DictSerializable):
+        return "object"
+    return "leaf"
+
+
+def _encode_all(encode, objs):
+    """Encode each of a list of objects separately; the unit of work for async_dump."""
+    return [encode(obj) for obj in objs]
+
+
+def _loads_shard(task):
+    """
+    Parse a document into its object and context without resolving any links.
+
+    This is the unit of work for :meth:`GEMDJson.loads_batch`, so it is a module-level function
+    that can be sent to worker processes.
+    """
+    encoder, json_str, kwargs = task
+    raw = encoder.raw_loads(json_str, **kwargs)
+    return raw["object"], raw["context"]
+
+
+def _index_templates(template_index, obj, entities=True):
+    """
+    Add an object and the objects nested in it to a template index, innermost first.
+
+    Nested entities are not added, since they are indexed in their own right.
+
+    :param template_index: the TemplateIndex to add to
+    :param obj: the object, or a container of objects
+    :param entities: whether to add obj itself if it is an entity
+    """
+    if isinstance(obj, (list, tuple)):
+        for x in obj:
+            _index_templates(template_index, x, entities=False)
+    elif isinstance(obj, dict):
+        for x in obj.values():
+            _index_templates(template_index, x, entities=False)
+    elif isinstance(obj, DictSerializable) and (entities or not isinstance(obj, BaseEntity)):
+        for x in obj.as_dict().values():
+            _index_templates(template_index, x, entities=False)
+        template_index.add(obj)
@@ -0,0 +1,111 @@
+"""Test encoding and decoding with each json backend."""
+import asyncio
+import json
+
+import pytest
+
+from gemd.demo.cake import make_cake
+from gemd.entity.value.nominal_real import NominalReal
+from gemd.json import GEMDJson
+from gemd.json.backends import get_backend, JSONBackend, OrjsonBackend, StandardBackend
+
+
+class _Stream(object):
+    """A stream to write to with async_dump."""
+
+    def __init__(self):
+        self.text = ""
+
+    def write(self, text):
+        self.text += text
+
+
+def _async_dumps(encoder, obj, **kwargs):
+    """Write a document with async_dump, in slices of 10 entities."""
+    out = _Stream()
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(encoder.async_dump(obj, out, slice_size=10, **kwargs))
+    finally:
+        loop.close()
+    return out.text
+
+
+def test_get_backend():
+    """Test that backends are found by name, and that instances are used as they are."""
+    assert isinstance(get_backend(), StandardBackend)
+    assert isinstance(get_backend("json"), StandardBackend)
+    backend = StandardBackend()
+    assert get_backend(backend) is backend
+    assert GEMDJson(backend=backend).backend is backend
+    assert isinstance(GEMDJson().backend, StandardBackend)
+    assert isinstance(get_backend("auto"), JSONBackend)
+    assert repr(backend) == "<StandardBackend>"
+    with pytest.raises(ValueError):
+        get_backend("simdjson")
+    with pytest.raises(TypeError):
+        JSONBackend()
+    assert JSONBackend.__abstractmethods__ == {"name", "dumps", "loads", "separators"}
+
+
+def test_orjson():
+    """Test that the orjson backend reads and writes equivalent documents."""
+    pytest.importorskip("orjson")
+    cake = make_cake(seed=42)
+    standard = GEMDJson(backend="json")
+    fast = GEMDJson(backend="orjson")
+    assert isinstance(fast.backend, OrjsonBackend)
+    assert isinstance(get_backend("auto"), OrjsonBackend)
+
+    text = fast.dumps(cake)
+    assert text == fast.dumps(cake), "The output should be deterministic"
+    assert json.loads(text) == json.loads(standard.dumps(cake))
+    assert ", " not in fast.raw_dumps([1, 2])
+    assert fast.dumps(fast.loads(text)) == text
+    assert standard.dumps(fast.loads(standard.dumps(cake))) == standard.dumps(cake)
+    assert fast.dumps(standard.loads(text)) == text
+    assert json.loads(fast.dumps(cake, indent=2)) == json.loads(text)
+    link, = fast.raw_loads(b'[{"id": "b", "scope": "a", "type": "link_by_uid"}]')
+    assert link.id == "b"
+    assert fast.backend.loads('{"a": [1]}') == {"a": [1]}
+
+    for kwargs in ({}, {"indent": 2}):
+        assert _async_dumps(fast, cake, **kwargs) == fast.dumps(cake, **kwargs)
+
+    with pytest.raises(ValueError):
+        fast.dumps(cake, indent=4)
+    with pytest.raises(TypeError):
+        fast.dumps(cake, separators=(",", ":"))
+    with pytest.raises(TypeError):
+        fast.loads(text, parse_float=str)
+    with pytest.raises(TypeError):
+        fast.raw_dumps({1, 2})
+
+
+def test_non_canonical():
+    """Test that non-canonical documents have fields in class order and load the same."""
+    cake = make_cake(seed=42)
+    canonical = GEMDJson()
+    assert canonical.canonical
+    for backend in ("json", "orjson"):
+        if backend == "orjson":
+            pytest.importorskip("orjson")
+        fast = GEMDJson(backend=backend, canonical=False)
+        assert not fast.canonical
+        text = fast.dumps(cake)
+        assert text == fast.dumps(cake), "The output should be deterministic"
+        assert text.index('"context"') < text.index('"object"'), "Context should be first"
+        copy = fast.loads(text)
+        assert canonical.dumps(copy) == canonical.dumps(cake)
+        assert fast.dumps(copy) == text, "Fields should be in the same order for equal objects"
+        assert fast.dumps(cake, sort_keys=True) == \
+            GEMDJson(backend=backend).dumps(cake)
+
+        value = json.loads(fast.raw_dumps(NominalReal(2.5, "cm")))
+        assert list(value) == ["nominal", "units", "type"], "Constructor order, then type"
+        assert _async_dumps(fast, cake) == text
+        thin = json.loads(fast.thin_dumps(cake))
+        assert list(thin)[:3] == ["name", "spec", "process"]
+
+    assert canonical.raw_dumps(NominalReal(2.5, "cm"), sort_keys=False) == \
+        '{"nominal": 2.5, "units": "centimeter", "type": "nominal_real"}'
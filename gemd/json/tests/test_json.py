@@ -5,6 +5,7 @@ from copy import deepcopy
 import pytest
 
 from gemd.json import dumps, loads, GEMDJson
+from gemd.json.gemd_encoder import GEMDEncoder
 from gemd.entity.attribute.property import Property
 from gemd.entity.bounds.real_bounds import RealBounds
 from gemd.entity.dict_serializable import DictSerializable
@@ -21,7 +22,7 @@ from gemd.entity.value.nominal_integer import NominalInteger
 from gemd.entity.value.nominal_real import NominalReal
 from gemd.entity.value.normal_real import NormalReal
 from gemd.enumeration.origin import Origin
-from gemd.util import substitute_objects, substitute_links
+from gemd.util import Instrumentation, substitute_objects, substitute_links
 
 
 def test_serialize():
@@ -100,6 +101,10 @@ def test_enumeration_serde():
     copy_condition = GEMDJson().copy(condition)
     assert copy_condition.notes == Origin.get_value(condition.notes)
 
+    # Enumerations are encoded as their values, however they are dumped
+    assert json.dumps(Origin.UNKNOWN, cls=GEMDEncoder) == '"unknown"'
+    assert json.loads(GEMDJson().dumps([Origin.MEASURED]))["object"] == ["measured"]
+
 
 def test_attribute_serde():
     """An attribute with a link to an attribute template should be copy-able."""
@@ -181,6 +186,12 @@ def test_unexpected_deserialization():
         dumps(ProcessRun("A process", notes=DummyClass("something")))
 
 
+def test_unregistered_type():
+    """Loading a document with a type that is not registered should throw a TypeError."""
+    with pytest.raises(TypeError):
+        loads(json.dumps({"context": [], "object": {"type": "dummy_class", "foo": "bar"}}))
+
+
 def test_register_classes_override():
     """Test that register_classes overrides existing entries in the class index."""
     class MyProcessSpec(ProcessSpec):
@@ -198,6 +209,78 @@ def test_register_classes_override():
         "Custom GEMDJson didn't deserialize as MyProcessSpec"
 
 
+def test_shared_registry():
+    """Instances should share their decoders until classes are registered with one of them."""
+    class MyLink(LinkByUID):
+        pass
+
+    first, second, custom = GEMDJson(), GEMDJson(), GEMDJson()
+    assert first._decoders is second._decoders
+    custom.register_classes({LinkByUID.typ: MyLink})
+    assert custom._decoders is not first._decoders
+    assert first._clazz_index == second._clazz_index
+
+    # The registered class replaces the link handling, so links are no longer substituted
+    material = MaterialRun("material", process=ProcessRun("process", uids={"id": "p"}))
+    assert isinstance(custom.loads(first.dumps(material)), MyLink)
+    assert first.loads(first.dumps(material)).process.output_material is not None
+
+    # Classes that override from_dict are decoded with it
+    assert first._decoders[IngredientRun.typ][0] == IngredientRun.from_dict
+
+
+def test_copy_matches_round_trip():
+    """Copying should give the same graph as dumping and loading, without sharing entities."""
+    from gemd.demo.cake import make_cake
+    from gemd.util import Instrumentation, TemplateIndex
+
+    cakes = [make_cake(seed=seed) for seed in range(3)]
+    spec = cakes[0].spec
+    # A link to an entity in the graph, and an entity that duplicates another's uid
+    MeasurementRun("linked", spec=LinkByUID.from_entity(cakes[0].measurements[0].spec),
+                   material=cakes[0])
+    MeasurementRun("duplicate", material=cakes[1], uids={"id": "dup"})
+    duplicate = MeasurementRun("duplicate", material=cakes[2], uids={"id": "dup"})
+    shared = NominalReal(2, "")
+    process = ProcessRun("shared", conditions=[Condition("a", value=shared),
+                                               Condition("b", value=shared)])
+
+    instrumentation = Instrumentation()
+    encoder = GEMDJson(template_index=TemplateIndex(), instrumentation=instrumentation)
+    copied = encoder.copy([cakes, process, duplicate])
+    expected = GEMDJson().loads(GEMDJson().dumps([cakes, process, duplicate]))
+    assert encoder.dumps(copied) == encoder.dumps(expected)
+    assert instrumentation.calls["copy"] == 1
+    assert instrumentation.counts["copy.entities.material_run"] > 0
+    assert encoder.template_index.objects(spec.template) != []
+
+    def backlinks(material):
+        return [(x.name, sorted(x.uids.items())) for x in material.measurements] + \
+            [(x.name, sorted(x.uids.items())) for x in material.process.ingredients]
+
+    copied_cakes, copied_process, copied_duplicate = copied
+    for copy_, original in zip(copied_cakes, expected[0]):
+        assert copy_ is not original and copy_.spec is not spec
+        assert copy_.process.output_material is copy_
+        assert backlinks(copy_) == backlinks(original)
+    linked = next(x for x in copied_cakes[0].measurements if x.name == "linked")
+    assert linked.spec is copied_cakes[0].measurements[0].spec
+    assert copied_duplicate.material is copied_cakes[1], \
+        "The duplicate should become the copy of the first entity with its uid"
+    values = [x.value for x in copied_process.conditions]
+    assert values[0] is values[1] and values[0] is not shared and values[0] == shared
+
+    class DummyClass(DictSerializable):
+        typ = 'dummy_class'
+
+        def __init__(self, foo):
+            self.foo = foo
+
+    assert encoder.copy(LinkByUID("missing", "1")) == LinkByUID("missing", "1")
+    with pytest.raises(TypeError):
+        encoder.copy(ProcessRun("A process", notes=DummyClass("something")))
+
+
 def test_register_argument_validation():
     """Test that register_classes argument is type checked."""
     orig = GEMDJson()
@@ -665,3 +748,213 @@ def test_deeply_nested_rehydration():
     copied = loads(dumps(material_history))
     assert isinstance(copied.process.ingredients[1].spec, IngredientSpec)
     assert isinstance(copied.measurements[0], MeasurementRun)
+
+
+def test_dumps_batch():
+    """Test that independent histories can be serialized in parallel with shared templates."""
+    from io import StringIO
+    from gemd.demo.cake import make_cake
+    from gemd.entity.template.base_template import BaseTemplate
+
+    cakes = [make_cake(seed=1), make_cake(seed=2)]
+    encoder = GEMDJson()
+    serial = encoder.dumps_batch(cakes, workers=1)
+    assert encoder.dumps_batch(cakes, workers=2) == serial
+    assert len(serial) == 3
+
+    shared = json.loads(serial[0])
+    assert all("template" in x["type"] for x in shared["context"])
+    assert len(shared["object"]) == len(shared["context"])
+    for cake, doc in zip(cakes, serial[1:]):
+        loaded = encoder.loads(doc)
+        assert loaded.uids == cake.uids
+        assert isinstance(loaded.template, LinkByUID)
+        assert not any("template" in x["type"] for x in json.loads(doc)["context"])
+        # Apart from the templates, each document holds the whole history
+        history = json.loads(encoder.dumps(cake))["context"]
+        assert len(json.loads(doc)["context"]) == \
+            len([x for x in history if "template" not in x["type"]])
+        assert isinstance(cake.template, BaseTemplate)  # the originals are left alone
+
+    # An instrumentation with a callback cannot be sent to the workers, so it stays here
+    instrumentation = Instrumentation(callback=lambda *x: None)
+    fresh = MaterialRun("no uids yet")
+    instrumented = GEMDJson(instrumentation=instrumentation)
+    docs = instrumented.dumps_batch(cakes + [fresh], workers=2)
+    assert docs[:3] == serial
+    assert fresh.uids, "Entities without uids are given one before they are sent to the workers"
+    assert instrumented.loads(docs[3]).uids == fresh.uids
+    assert instrumentation.calls["dumps_batch.prepare"] == 1
+    assert instrumentation.calls["dumps_batch.encode"] >= 3
+    assert instrumentation.counts["dumps_batch.bytes"] == sum(len(x) for x in docs[1:])
+
+    stream = StringIO()
+    encoder.dump_batch(cakes, stream, workers=1)
+    assert stream.getvalue().splitlines() == serial
+    with pytest.raises(ValueError):
+        encoder.dump_batch(cakes, StringIO(), indent=2)
+
+
+def test_loads_batch():
+    """Test that documents loaded in parallel are linked across documents."""
+    from io import StringIO
+    from gemd.demo.cake import make_cake
+
+    cakes = [make_cake(seed=1), make_cake(seed=2)]
+    encoder = GEMDJson()
+    docs = encoder.dumps_batch(cakes, workers=1)
+    templates, first, second = encoder.loads_batch(docs, workers=1)
+    assert dumps(first) == dumps(loads(dumps(cakes[0])))
+    assert dumps(second) == dumps(cakes[1])
+    assert first.template is second.template
+    assert first.template in templates
+    assert first.process.output_material is first
+    assert all(msr.material is first for msr in first.measurements)
+
+    stream = StringIO()
+    encoder.dump_batch(cakes, stream, workers=1)
+    stream.seek(0)
+    _, parallel, _ = encoder.load_batch(stream, workers=2)
+    assert dumps(parallel) == dumps(first)
+
+    # Links that cross shards are resolved, and duplicated entities are merged
+    material = MaterialRun("material", uids={"id": "mat"})
+    measurement = MeasurementRun("measurement", uids={"id": "msr"}, material=material)
+    shards = [dumps(material), dumps(measurement)]
+    linked_material, linked_measurement = encoder.loads_batch(shards, workers=1)
+    assert linked_measurement.material is linked_material
+    assert linked_material.measurements == [linked_measurement]
+
+
+def test_async_load_and_dump():
+    """Test that the async variants read and write the same documents as load and dump."""
+    import asyncio
+    import socket
+    from gemd.demo.cake import make_cake
+
+    cake = make_cake(seed=3)
+    encoder = GEMDJson()
+    expected = encoder.dumps(cake)
+
+    class TextStream(object):
+        """An aiofiles-like stream with coroutine read and write methods."""
+
+        def __init__(self, text=""):
+            self.text = text
+            self.writes = 0
+
+        async def read(self, n):
+            chunk, self.text = self.text[:n], self.text[n:]
+            return chunk
+
+        async def write(self, text):
+            self.writes += 1
+            self.text += text
+
+    async def ticker(ticks, done):
+        while not done.is_set():
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def round_trip():
+        ticks = []
+        done = asyncio.Event()
+        tick_task = asyncio.ensure_future(ticker(ticks, done))
+
+        out = TextStream()
+        await encoder.async_dump(cake, out, chunk_size=1024, slice_size=10)
+        assert out.text == expected
+        assert out.writes > 1
+        indented = TextStream()
+        await encoder.async_dump(cake, indented, chunk_size=1024, indent=2)
+        assert indented.text == encoder.dumps(cake, indent=2)
+
+        copy = await encoder.async_load(TextStream(expected), chunk_size=1024, slice_size=10)
+        assert encoder.dumps(copy) == expected
+        assert copy.process.output_material is copy
+
+        # Through a real socket, with asyncio streams
+        left, right = socket.socketpair()
+        reader, left_writer = await asyncio.open_connection(sock=left)
+        right_reader, writer = await asyncio.open_connection(sock=right)
+
+        async def send():
+            await encoder.async_dump(cake, writer, chunk_size=1024)
+            writer.close()
+
+        _, copy = await asyncio.gather(send(), encoder.async_load(reader, chunk_size=1024))
+        assert encoder.dumps(copy) == expected
+        left_writer.close()
+
+        assert await encoder.async_load(TextStream('[{"key": "value"}]')) == [{"key": "value"}]
+
+        done.set()
+        await tick_task
+        # Other tasks ran while the documents were being processed
+        assert len(ticks) > 10
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(round_trip())
+    finally:
+        loop.close()
+
+
+def test_dumps_changes():
+    """Test that only the entities modified since the last checkpoint are serialized."""
+    from gemd.entity.change_tracker import ChangeTracker, paused
+    from gemd.demo.cake import make_cake
+
+    cake = make_cake(seed=4)
+    encoder = GEMDJson()
+    encoder.dumps(cake)
+    tracker = ChangeTracker()
+    with tracker:
+        tracker.track(cake)
+        cake.name = "Renamed cake"
+        cake.process.source = None
+        cake.spec.process.notes = "New notes"
+        measurement = MeasurementRun("New measurement", material=cake)
+        assert len(measurement.uids) == 0
+
+        delta = json.loads(encoder.dumps_changes(tracker))
+        assert [(x["type"], x["name"]) for x in delta["context"]] == [
+            ("process_spec", "Icing Cake"),
+            ("process_run", "Icing Cake"),
+            ("material_run", "Renamed cake"),
+            ("measurement_run", "New measurement"),
+        ]
+        assert [LinkByUID.from_dict(x) for x in delta["object"]] == [
+            LinkByUID.from_entity(x) for x in [cake, cake.process, cake.spec.process, measurement]
+        ]
+        assert delta["context"][2]["process"]["type"] == LinkByUID.typ
+        assert tracker.modified == []
+
+        # The delta loads on its own, with links to entities that were not modified
+        assert encoder.loads(encoder.dumps_changes(tracker)) == []
+        cake.spec.file_links[0].url = "Untracked change"
+        cake.spec.name = "Tracked change"
+        with paused():  # Loaded entities would otherwise be recorded as new
+            loaded = encoder.loads(encoder.dumps_changes(tracker, checkpoint=False))
+        assert [x.name for x in loaded] == ["Tracked change"]
+        assert loaded[0].file_links[0].url == "Untracked change"
+        assert isinstance(loaded[0].process, LinkByUID)
+        assert tracker.modified == [cake.spec]
+
+        # A linked entity that was never serialized is included, even if it was not modified
+        tracker.checkpoint()
+        with paused():
+            spec = MeasurementSpec("New spec")
+        measurement.spec = spec
+        delta = json.loads(encoder.dumps_changes(tracker))
+        assert [x["name"] for x in delta["context"]] == ["New spec", "New measurement"]
+        assert [x["id"] for x in delta["object"]] == [measurement.uids["auto"], spec.uids["auto"]]
+
+        # dump_changes writes the same document to a file
+        from io import StringIO
+        measurement.name = "Renamed measurement"
+        expected = encoder.dumps_changes(tracker, checkpoint=False)
+        stream = StringIO()
+        encoder.dump_changes(tracker, stream)
+        assert stream.getvalue() == expected
+        assert tracker.modified == []
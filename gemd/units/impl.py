@@ -1,6 +1,7 @@
 """Implementation of units."""
 import pint
 import pkg_resources
+from functools import lru_cache
 from typing import Union
 from pint import UnitRegistry
 from pint.unit import _Unit
@@ -37,13 +38,19 @@ def parse_units(units: Union[str, _Unit, None]) -> Union[str, _Unit, None]:
     elif units == '':
         return 'dimensionless'
     elif isinstance(units, str):
-        return str(_ureg(units).units)
+        return _parse_units_str(units)
     elif isinstance(units, _Unit):
         return units
     else:
         raise UndefinedUnitError("Units must be given as a recognized unit string or Units object")
 
 
+@lru_cache(maxsize=1024)
+def _parse_units_str(units: str) -> str:
+    """Parse a unit string; the result is cached, since the same units are parsed repeatedly."""
+    return str(_ureg(units).units)
+
+
 def convert_units(value: float, starting_unit: str, final_unit: str) -> float:
     """
     Convert the value from the starting_unit to the final_unit.
@@ -80,3 +87,4 @@ def change_definitions_file(filename: str = None):
     if filename is None:
         filename = DEFAULT_FILE
     _ureg = UnitRegistry(filename=filename)
+    _parse_units_str.cache_clear()
@@ -1,3 +1,10 @@
 # flake8: noqa
 from .impl import set_uuids, substitute_links, substitute_objects, flatten, recursive_foreach, \
-    recursive_flatmap, writable_sort_order
+    recursive_flatmap, writable_sort_order, gc_paused
+from .diff import diff, GraphDiff, EntityDiff
+from .merge import merge, MergeResult
+from .history_index import HistoryIndex
+from .tag_index import TagIndex
+from .template_index import TemplateIndex
+from .instrumentation import Instrumentation, current_instrumentation
+from .memory import memory_profile, MemoryProfile
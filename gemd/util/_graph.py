@@ -0,0 +1,132 @@
+"""Traversal and comparison of graphs of entities, for the diff, merge and index utilities."""
+from typing import Any, Dict, Hashable, Iterator, List, Tuple
+
+from gemd.entity.base_entity import BaseEntity
+from gemd.entity.dict_serializable import DictSerializable
+from gemd.entity.link_by_uid import LinkByUID
+
+
+def uid_keys(entity: BaseEntity) -> List[Tuple[str, str]]:
+    """Get the (lowercase scope, id) keys of an entity."""
+    return [(scope.lower(), uid) for scope, uid in entity.uids.items()]
+
+
+_SCALAR, _SEQUENCE, _MAPPING, _ENTITY, _SERIALIZABLE, _LINK = range(6)
+
+
+def _kind(clazz: type) -> int:
+    """Classify a type for traversal."""
+    if issubclass(clazz, (list, tuple)):
+        return _SEQUENCE
+    if issubclass(clazz, dict):
+        return _MAPPING
+    if issubclass(clazz, BaseEntity):
+        return _ENTITY
+    if issubclass(clazz, LinkByUID):
+        return _LINK
+    if issubclass(clazz, DictSerializable):
+        return _SERIALIZABLE
+    return _SCALAR
+
+
+def walk(obj, fields: Dict[type, Tuple[str, ...]] = None) -> Iterator[BaseEntity]:
+    """
+    Yield each entity reachable from obj once, through links in either direction.
+
+    :param obj: the object to search
+    :param fields: the names of the only fields to follow out of entities of some types (and
+        their subclasses), for searches that only need some of the links.  Every field of
+        other objects is followed.
+    """
+    seen = set()
+    kinds = {}  # type -> whether it is a container, an entity or some other DictSerializable
+    names = {}  # type of entity -> the fields to follow, or None for all of them
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        clazz = type(current)
+        kind = kinds.get(clazz)
+        if kind is None:
+            kind = kinds[clazz] = _kind(clazz)
+            names[clazz] = next((v for k, v in (fields or {}).items() if issubclass(clazz, k)),
+                                None)
+        if kind == _SCALAR or id(current) in seen:
+            continue
+        seen.add(id(current))
+        if kind == _SEQUENCE:
+            stack.extend(reversed(current))
+        elif kind == _MAPPING:
+            stack.extend(current.values())
+            stack.extend(current.keys())
+        else:
+            if kind == _ENTITY:
+                yield current
+            followed = names[clazz]
+            if followed is None:
+                stack.extend(vars(current).values())
+            else:
+                stack.extend(getattr(current, name) for name in followed)
+
+
+def field_changes(old_fields: Dict[str, Any], old_structures: Dict[str, Hashable],
+                  new_fields: Dict[str, Any], new_structures: Dict[str, Hashable]
+                  ) -> Dict[str, Tuple[Any, Any]]:
+    """
+    Find the fields that differ between two versions of an entity.
+
+    :param old_fields: the fields of the old version, as from `as_dict`
+    :param old_structures: the structure of each field of the old version
+    :param new_fields: the fields of the new version, as from `as_dict`
+    :param new_structures: the structure of each field of the new version
+    :return: the fields whose structures differ, mapped to their (old, new) values
+    """
+    changes = {}
+    for name in sorted(set(old_fields) | set(new_fields)):
+        if old_structures.get(name) != new_structures.get(name):
+            changes[name] = (old_fields.get(name), new_fields.get(name))
+    return changes
+
+
+class Structure(object):
+    """Turn the fields of entities into hashable structures, with links as reference keys."""
+
+    def __init__(self, refs: Dict[int, Any], index: Dict[Tuple[str, str], BaseEntity]):
+        self._refs = refs
+        self._index = index
+        self._kinds = {}  # type -> how its instances are frozen
+
+    def fields(self, entity: BaseEntity) -> Tuple[Dict[str, Any], Dict[str, Hashable], int]:
+        """
+        Get the fields of an entity, their structures and a hash of them all.
+
+        :param entity: the entity
+        :return: its fields, as from `as_dict`, the structure of each field, and a hash of
+            the structures
+        """
+        fields = entity.as_dict()
+        structures = {name: self.freeze(value) for name, value in fields.items()}
+        return fields, structures, hash(tuple(sorted(structures.items())))
+
+    def freeze(self, value) -> Hashable:
+        """Get a hashable structure that is equal for equal values."""
+        clazz = type(value)
+        kind = self._kinds.get(clazz)
+        if kind is None:
+            kind = self._kinds[clazz] = _kind(clazz)
+        if kind == _SCALAR:
+            return value
+        if kind == _SEQUENCE:
+            return _SEQUENCE, tuple(self.freeze(x) for x in value)
+        if kind == _MAPPING:
+            return _MAPPING, tuple(sorted((k, self.freeze(v)) for k, v in value.items()))
+        if kind == _ENTITY:
+            ref = self._refs.get(id(value))
+            if ref is None:
+                # Duplicates of an entity are represented by the entity that was indexed
+                ref = self._refs[id(self._index[uid_keys(value)[0]])]
+            return _ENTITY, ref
+        if kind == _LINK:
+            key = (value.scope.lower(), value.id)
+            target = self._index.get(key)
+            return _ENTITY, key if target is None else self._refs[id(target)]
+        return _SERIALIZABLE, self.freeze(value.as_dict())
@@ -0,0 +1,148 @@
+"""Compare two versions of a collection of gemd entities."""
+from typing import Any, Dict, List, Tuple
+
+from gemd.entity.base_entity import BaseEntity
+from gemd.util._graph import Structure, field_changes, uid_keys, walk
+
+
+class EntityDiff(object):
+    """
+    The differences between two versions of an entity.
+
+    Parameters
+    ----------
+    old: BaseEntity
+        The entity in the old version.
+    new: BaseEntity
+        The entity with a matching uid in the new version.
+    fields: Dict[str, Tuple[Any, Any]]
+        The serialized names of the fields that differ, mapped to their (old, new) values.
+        A field that is only present in one version has the value None in the other.
+
+    """
+
+    def __init__(self, old: BaseEntity, new: BaseEntity, fields: Dict[str, Tuple[Any, Any]]):
+        self.old = old
+        self.new = new
+        self.fields = fields
+
+    def __repr__(self):
+        return "<EntityDiff {} '{}': {}>".format(
+            type(self.new).__name__, getattr(self.new, "name", None), sorted(self.fields))
+
+
+class GraphDiff(object):
+    """
+    The differences between two versions of a collection of entities.
+
+    Parameters
+    ----------
+    added: List[BaseEntity]
+        Entities in the new version that match no entity in the old version.
+    removed: List[BaseEntity]
+        Entities in the old version that match no entity in the new version.
+    modified: List[EntityDiff]
+        Matching entities whose contents differ.
+
+    """
+
+    def __init__(self, added: List[BaseEntity], removed: List[BaseEntity],
+                 modified: List[EntityDiff]):
+        self.added = added
+        self.removed = removed
+        self.modified = modified
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.modified)
+
+    def __repr__(self):
+        return "<GraphDiff: {} added, {} removed, {} modified>".format(
+            len(self.added), len(self.removed), len(self.modified))
+
+
+def diff(old, new) -> GraphDiff:
+    """
+    Compare two versions of a collection of entities.
+
+    Each of `old` and `new` may be a graph of entities (e.g., a terminal material and its
+    history), a flattened list of entities connected by LinkByUID (such as the context of a
+    serialized object) or any container of them.  Every entity reachable from them is
+    compared, and entities are matched between the versions if they share any uid.
+
+    Links to other entities are compared by the identity of the entity they point to rather
+    than by its contents, whether they are pointers or LinkByUIDs, so a change to one entity
+    is reported only for that entity.  The fields of each entity are turned into a hashable
+    structure, with links replaced by reference keys.  Entities whose structures hash and
+    compare equal are skipped, and the others are compared field by field.  Equal values of
+    different types that json does not distinguish, such as a list and a tuple, are equal.
+
+    :param old: the old version of the entities
+    :param new: the new version of the entities
+    :return: the entities that were added, removed or modified between old and new
+    """
+    old_entities, old_index = _collect(old)
+    new_entities, new_index = _collect(new)
+
+    # Matching entities share a reference key, so that the links to them compare equal
+    old_refs, new_refs = {}, {}
+    matches = []
+    for old_entity in old_entities:
+        new_entity = None
+        for key in uid_keys(old_entity):
+            new_entity = new_index.get(key)
+            if new_entity is not None:
+                break
+        if new_entity is None or id(new_entity) in new_refs:
+            old_refs[id(old_entity)] = _unmatched_ref(old_entity)
+            continue
+        old_refs[id(old_entity)] = new_refs[id(new_entity)] = len(matches)
+        matches.append((old_entity, new_entity))
+    for new_entity in new_entities:
+        if id(new_entity) not in new_refs:
+            new_refs[id(new_entity)] = _unmatched_ref(new_entity)
+
+    old_structure = Structure(old_refs, old_index)
+    new_structure = Structure(new_refs, new_index)
+    modified = []
+    for old_entity, new_entity in matches:
+        old_fields, old_structures, old_hash = old_structure.fields(old_entity)
+        new_fields, new_structures, new_hash = new_structure.fields(new_entity)
+        if old_hash == new_hash and old_structures == new_structures:
+            continue
+        changes = field_changes(old_fields, old_structures, new_fields, new_structures)
+        if changes:
+            modified.append(EntityDiff(old_entity, new_entity, changes))
+
+    return GraphDiff(added=[x for x in new_entities if isinstance(new_refs[id(x)], tuple)],
+                     removed=[x for x in old_entities if isinstance(old_refs[id(x)], tuple)],
+                     modified=modified)
+
+
+def _unmatched_ref(entity: BaseEntity) -> Tuple:
+    """Get a reference key for an entity that is only in one version."""
+    return tuple(sorted(uid_keys(entity)))
+
+
+def _collect(obj) -> Tuple[List[BaseEntity], Dict[Tuple[str, str], BaseEntity]]:
+    """
+    Find the distinct entities reachable from obj, through links in either direction.
+
+    :param obj: the object to search
+    :return: the entities, in the order they were found, and an index of them by uid.
+        An entity that shares a uid with an entity that was found before it is a duplicate,
+        and is left out of the list.
+    """
+    entities = []
+    index = {}
+    for entity in walk(obj):
+        keys = uid_keys(entity)
+        if not keys:
+            raise ValueError("Cannot match entities without uids: {}".format(
+                entity._name_repr(entity)))
+        canonical = next((index[key] for key in keys if key in index), None)
+        if canonical is None:
+            canonical = entity
+            entities.append(entity)
+        for key in keys:
+            index.setdefault(key, canonical)
+    return entities, index
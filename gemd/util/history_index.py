@@ -0,0 +1,200 @@
+"""An index of the lineage relationships between the objects in material histories."""
+from array import array
+from collections import deque
+from typing import List, Optional, Tuple, Type, Union
+
+from gemd.entity.base_entity import BaseEntity
+from gemd.entity.link_by_uid import LinkByUID
+from gemd.util._graph import uid_keys, walk
+
+
+class HistoryIndex(object):
+    """
+    An index of which objects are upstream and downstream of each other.
+
+    The index covers the runs (and, optionally, the specs) reachable from the object it is
+    built from, which may be a graph, a flattened list of entities connected by LinkByUID
+    (such as a context) or any container of them.  Material flows from a material to the
+    ingredients that use it, from an ingredient to the process it is added to, from a process
+    to its output material and from a material to its measurements, so e.g. the ingredients
+    of a process are its parents and the measurements of a material are its children.
+
+    The graph is built once, into arrays of parent and child node numbers, so queries do not
+    touch the entities.  A query without a type filter takes time proportional to the number
+    of objects it returns; with a type filter, to the number of objects it passes through.
+    The index is not updated when the entities change.
+
+    Parameters
+    ----------
+    obj: Any
+        The graph(s) or context(s) of entities to index.
+    specs: bool
+        Whether to also index the spec graph.  Specs and runs are not linked to each other.
+        (Default: False)
+
+    """
+
+    def __init__(self, obj, *, specs: bool = False):
+        from gemd.entity.object import MaterialRun, IngredientRun, MeasurementRun, ProcessRun, \
+            MaterialSpec, IngredientSpec, MeasurementSpec, ProcessSpec
+
+        # The fields of each type that link to a parent (True) or to a child (False)
+        links = {
+            MaterialRun: [("process", True)],
+            IngredientRun: [("material", True), ("process", False)],
+            MeasurementRun: [("material", True)],
+            ProcessRun: [],
+        }
+        if specs:
+            links.update({
+                MaterialSpec: [("process", True)],
+                IngredientSpec: [("material", True), ("process", False)],
+                MeasurementSpec: [],
+                ProcessSpec: [],
+            })
+
+        # The fields that lead from each type to the others, in either direction
+        fields = {
+            MaterialRun: ("process", "measurements"),
+            IngredientRun: ("material", "process"),
+            MeasurementRun: ("material",),
+            ProcessRun: ("ingredients", "output_material"),
+        }
+        if specs:
+            fields = {clazz: names + ("spec",) for clazz, names in fields.items()}
+            fields.update({
+                MaterialSpec: ("process",),
+                IngredientSpec: ("material", "process"),
+                MeasurementSpec: (),
+                ProcessSpec: ("ingredients", "output_material"),
+            })
+        fields[BaseEntity] = ()  # Nothing else leads back to the indexed types
+
+        indexed = tuple(links)
+        types = {}  # type -> the indexed type it is, or None
+        self._entities = []
+        self._nodes = {}  # id(entity) -> node number
+        self._uids = {}  # (lowercase scope, id) -> node number
+        for entity in walk(obj, fields):
+            clazz = type(entity)
+            if clazz not in types:
+                types[clazz] = next((x for x in indexed if issubclass(clazz, x)), None)
+            if types[clazz] is not None:
+                self._nodes[id(entity)] = len(self._entities)
+                for key in uid_keys(entity):
+                    self._uids.setdefault(key, len(self._entities))
+                self._entities.append(entity)
+
+        parents, children = [], []  # (node, parent) and (node, child) pairs
+        for node, entity in enumerate(self._entities):
+            for field, is_parent in links[types[type(entity)]]:
+                other = self._find(getattr(entity, field))
+                if other is not None:
+                    parents.append((node, other) if is_parent else (other, node))
+                    children.append((other, node) if is_parent else (node, other))
+        self._parents = _adjacency(len(self._entities), parents)
+        self._children = _adjacency(len(self._entities), children)
+
+    def __len__(self):
+        return len(self._entities)
+
+    def __contains__(self, entity) -> bool:
+        return self._find(entity) is not None
+
+    def ancestors(self, entity: Union[BaseEntity, LinkByUID], *, depth: Optional[int] = None,
+                  types: Union[Type, Tuple[Type, ...]] = None) -> List[BaseEntity]:
+        """
+        Get the objects upstream of an object.
+
+        Parameters
+        ----------
+        entity: BaseEntity or LinkByUID
+            The object to start from, which must be in the index.
+        depth: int, optional
+            The maximum number of links to follow; e.g. 1 for just the parents.
+            (Default: no limit)
+        types: Type or Tuple[Type], optional
+            Only return objects of these types.  Objects of other types are still traversed.
+
+        Returns
+        -------
+        List[BaseEntity]
+            The upstream objects, nearest first.
+
+        """
+        return self._traverse(self._parents, entity, depth, types)
+
+    def descendants(self, entity: Union[BaseEntity, LinkByUID], *, depth: Optional[int] = None,
+                    types: Union[Type, Tuple[Type, ...]] = None) -> List[BaseEntity]:
+        """
+        Get the objects downstream of an object.
+
+        Parameters
+        ----------
+        entity: BaseEntity or LinkByUID
+            The object to start from, which must be in the index.
+        depth: int, optional
+            The maximum number of links to follow; e.g. 1 for just the children.
+            (Default: no limit)
+        types: Type or Tuple[Type], optional
+            Only return objects of these types.  Objects of other types are still traversed.
+
+        Returns
+        -------
+        List[BaseEntity]
+            The downstream objects, nearest first.
+
+        """
+        return self._traverse(self._children, entity, depth, types)
+
+    def _find(self, entity) -> Optional[int]:
+        """Get the node number of an entity or LinkByUID, or None if it is not indexed."""
+        if isinstance(entity, LinkByUID):
+            return self._uids.get((entity.scope.lower(), entity.id))
+        return self._nodes.get(id(entity))
+
+    def _traverse(self, adjacency, entity, depth, types) -> List[BaseEntity]:
+        """Breadth-first search from an entity, following one direction of the links."""
+        start = self._find(entity)
+        if start is None:
+            raise ValueError("{} is not in the index".format(entity))
+        offsets, targets = adjacency
+        entities = self._entities
+        result = []
+        seen = {start}
+        frontier = deque([(start, 0)])
+        while frontier:
+            node, distance = frontier.popleft()
+            if depth is not None and distance >= depth:
+                continue
+            for i in range(offsets[node], offsets[node + 1]):
+                other = targets[i]
+                if other in seen:
+                    continue
+                seen.add(other)
+                if types is None or isinstance(entities[other], types):
+                    result.append(entities[other])
+                frontier.append((other, distance + 1))
+        return result
+
+
+def _adjacency(size: int, edges: List[Tuple[int, int]]) -> Tuple[array, array]:
+    """
+    Build compressed adjacency arrays from a list of edges.
+
+    :param size: the number of nodes
+    :param edges: the (source, target) pairs
+    :return: the offsets and targets arrays; the targets of node n are
+        targets[offsets[n]:offsets[n + 1]]
+    """
+    offsets = array("l", [0] * (size + 1))
+    for source, _ in edges:
+        offsets[source + 1] += 1
+    for n in range(size):
+        offsets[n + 1] += offsets[n]
+    targets = array("l", [0] * len(edges))
+    position = array("l", offsets[:size])
+    for source, target in edges:
+        targets[position[source]] = target
+        position[source] += 1
+    return offsets, targets
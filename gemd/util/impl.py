@@ -1,10 +1,15 @@
 """Utility functions."""
+import gc
+import threading
 import uuid
-from typing import Dict, Callable, Union
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Callable, Set, Union
 
 from gemd.entity.base_entity import BaseEntity
 from gemd.entity.dict_serializable import DictSerializable
 from gemd.entity.link_by_uid import LinkByUID
+from gemd.util.instrumentation import current_instrumentation, _phase
 from toolz import concatv
 
 
@@ -55,9 +60,12 @@ def _substitute(thing,
         new = {_substitute(k, sub, applies, visited): _substitute(v, sub, applies, visited)
                for k, v in thing.items()}
     elif isinstance(thing, DictSerializable):
+        if thing.typ not in _registered_types():
+            raise TypeError("Unexpected base object type: {}".format(thing.typ))
         new_attrs = {_substitute(k, sub, applies, visited): _substitute(v, sub, applies, visited)
                      for k, v in thing.as_dict().items()}
-        new = thing.build(new_attrs)
+        # The attributes are already objects, so they can be passed to the constructor
+        new = type(thing).from_dict(new_attrs)
     else:
         new = thing
 
@@ -70,7 +78,14 @@ def _substitute(thing,
     return new
 
 
-def substitute_links(obj, native_uid=None):
+@lru_cache(maxsize=None)
+def _registered_types():
+    """Get the type strings that GEMDJson can deserialize, so that copies can be loaded."""
+    from gemd.json import GEMDJson
+    return frozenset(GEMDJson()._decoders)
+
+
+def substitute_links(obj, native_uid=None, *, inplace=False):
     """
     Recursively replace pointers to BaseEntity with LinkByUID objects.
 
@@ -78,6 +93,10 @@ def substitute_links(obj, native_uid=None):
     It is the inverse of substitute_objects.
     :param obj: target of the operation
     :param native_uid: preferred uid to use for creating LinkByUID objects (Default: None)
+    :param inplace: modify obj rather than returning a substituted copy, assigning the links
+        through the setters that held the pointers, so the entities that obj pointed to no
+        longer point back to it (Default: False)
+    :return: the substituted copy of obj or, if inplace, obj itself
     """
     def make_link(entity: BaseEntity):
         if len(entity.uids) == 0:
@@ -87,11 +106,64 @@ def substitute_links(obj, native_uid=None):
         else:
             return LinkByUID.from_entity(entity)
 
+    if inplace:
+        return _substitute_inplace(obj, sub=make_link,
+                                   applies=lambda o: o is not obj and isinstance(o, BaseEntity))
     return _substitute(obj, sub=make_link,
                        applies=lambda o: o is not obj and isinstance(o, BaseEntity))
 
 
-def substitute_objects(obj, index):
+def _substitute_inplace(thing,
+                        sub: Callable[[object], object],
+                        applies: Callable[[object], bool],
+                        visited: Set[int] = None) -> object:
+    """
+    Generic recursive substitute function that modifies thing rather than copying it.
+
+    Lists and dicts are updated in place and DictSerializable fields are re-assigned through
+    their setters, so that bidirectional links are maintained.  Replacement values are not
+    traversed.  Tuples cannot be modified, so a tuple containing a substitution is replaced by
+    a new tuple.
+    :param thing: The object to traverse with substitution.
+    :param sub: Function which provides substitute for value.
+    :param applies: Function which defines the domain for the sub function to be invoked.
+    :return: thing, or its replacement if thing itself was substituted
+    """
+    if applies(thing):
+        return sub(thing)
+    if visited is None:
+        visited = set()
+    if id(thing) in visited:
+        return thing
+    visited.add(id(thing))
+
+    if isinstance(thing, list):
+        for i, x in enumerate(thing):
+            new = _substitute_inplace(x, sub, applies, visited)
+            if new is not x:
+                thing[i] = new
+    elif isinstance(thing, tuple):
+        new = tuple(_substitute_inplace(x, sub, applies, visited) for x in thing)
+        if any(x is not y for x, y in zip(new, thing)):
+            return new
+    elif isinstance(thing, dict):
+        for k, v in list(thing.items()):
+            new_k = _substitute_inplace(k, sub, applies, visited)
+            new_v = _substitute_inplace(v, sub, applies, visited)
+            if new_k is not k:
+                del thing[k]
+                thing[new_k] = new_v
+            elif new_v is not v:
+                thing[k] = new_v
+    elif isinstance(thing, DictSerializable):
+        for k, v in thing.as_dict().items():
+            new = _substitute_inplace(v, sub, applies, visited)
+            if new is not v:
+                setattr(thing, k, new)
+    return thing
+
+
+def substitute_objects(obj, index, *, inplace=False):
     """
     Recursively replace LinkByUID objects with pointers to the objects with that UID in the index.
 
@@ -99,10 +171,27 @@ def substitute_objects(obj, index):
     It is the inverse of substitute_links.
     :param obj: target of the operation
     :param index: containing the objects that the uids point to
+    :param inplace: modify obj rather than returning a substituted copy, assigning the objects
+        through the setters that hold the links (Default: False)
+    :return: the substituted copy of obj or, if inplace, obj itself (or the indexed object,
+        if obj is a LinkByUID)
     """
-    return _substitute(obj,
-                       sub=lambda l: index.get((l.scope.lower(), l.id), l),
-                       applies=lambda o: isinstance(o, LinkByUID))
+    instrumentation = current_instrumentation()
+
+    def sub(link):
+        return index.get((link.scope.lower(), link.id), link)
+
+    if instrumentation is not None:
+        def sub(link, _lookup=sub):
+            found = _lookup(link)
+            instrumentation.count("substitute_objects.links.{}".format(
+                "misses" if found is link else "hits"))
+            return found
+
+    with _phase(instrumentation, "substitute_objects"):
+        if inplace:
+            return _substitute_inplace(obj, sub=sub, applies=lambda o: isinstance(o, LinkByUID))
+        return _substitute(obj, sub=sub, applies=lambda o: isinstance(o, LinkByUID))
 
 
 def flatten(obj, scope):
@@ -123,8 +212,11 @@ def flatten(obj, scope):
     :param scope: the scope of the autogenerated ids
     :return: a list of BaseEntity with LinkByUIDs to any BaseEntity members
     """
+    instrumentation = current_instrumentation()
+
     # The ids should be set in the actual object so they are consistent
-    set_uuids(obj, scope)
+    with _phase(instrumentation, "flatten.set_uuids"):
+        set_uuids(obj, scope)
 
     # list of uids that we've seen, to avoid returning duplicates
     known_uids = set()
@@ -145,8 +237,14 @@ def flatten(obj, scope):
 
         return to_return
 
-    res = recursive_flatmap(obj, _flatten, unidirectional=False)
-    return sorted([substitute_links(x) for x in res], key=lambda x: writable_sort_order(x))
+    with _phase(instrumentation, "flatten.walk"):
+        res = recursive_flatmap(obj, _flatten, unidirectional=False)
+    if instrumentation is not None:
+        instrumentation.count_entities("flatten", res)
+    with _phase(instrumentation, "flatten.substitute_links"):
+        res = [substitute_links(x) for x in res]
+    with _phase(instrumentation, "flatten.sort"):
+        return sorted(res, key=lambda x: writable_sort_order(x))
 
 
 def recursive_foreach(obj, func, apply_first=False, seen=None):
@@ -194,6 +292,9 @@ def recursive_flatmap(obj, func, seen=None, unidirectional=True):
     """
     Recursively apply and accumulate a list-valued function to BaseEntity members.
 
+    The members are visited depth first, in the order of the containers and of the sorted
+    fields of each object, and the function is applied to each BaseEntity before its members.
+
     :param obj: target of the operation
     :param func: function to apply; must be list-valued
     :param seen: set of seen objects (default=None).  DON'T PASS THIS
@@ -204,29 +305,51 @@ def recursive_flatmap(obj, func, seen=None, unidirectional=True):
 
     if seen is None:
         seen = set({})
-    if obj.__hash__ is not None:
-        if obj in seen:
-            return res
-        else:
-            seen.add(obj)
-    if isinstance(obj, BaseEntity):
-        res.extend(func(obj))
-
-    if isinstance(obj, (list, tuple)):
-        for i, x in enumerate(obj):
-            res.extend(recursive_flatmap(x, func, seen, unidirectional))
-    elif isinstance(obj, dict):
-        for x in concatv(obj.keys(), obj.values()):
-            res.extend(recursive_flatmap(x, func, seen, unidirectional))
-    elif isinstance(obj, DictSerializable):
-        for k, x in sorted(obj.__dict__.items()):
-            if unidirectional and isinstance(obj, BaseEntity) and k in obj.skip:
+    kinds = {}  # type -> how its instances are traversed
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        clazz = type(current)
+        kind = kinds.get(clazz)
+        if kind is None:
+            kind = kinds[clazz] = _flatmap_kind(clazz)
+        if kind == _LEAF:
+            continue  # Nothing to apply the function to, or to recurse into
+        if clazz.__hash__ is not None:
+            if current in seen:
                 continue
-            res.extend(recursive_flatmap(x, func, seen, unidirectional))
+            seen.add(current)
+        # The members are pushed in reverse, so that they are popped in order
+        if kind == _SEQUENCE:
+            stack.extend(reversed(current))
+        elif kind == _MAPPING:
+            stack.extend(reversed(list(concatv(current.keys(), current.values()))))
+        else:
+            if kind == _ENTITY:
+                res.extend(func(current))
+            skip = current.skip if unidirectional and kind == _ENTITY else ()
+            stack.extend(x for k, x in sorted(current.__dict__.items(), reverse=True)
+                         if k not in skip)
 
     return res
 
 
+_LEAF, _SEQUENCE, _MAPPING, _ENTITY, _SERIALIZABLE = range(5)
+
+
+def _flatmap_kind(clazz: type) -> int:
+    """Classify a type by how recursive_flatmap traverses its instances."""
+    if issubclass(clazz, (list, tuple)):
+        return _SEQUENCE
+    if issubclass(clazz, dict):
+        return _MAPPING
+    if issubclass(clazz, BaseEntity):
+        return _ENTITY
+    if issubclass(clazz, DictSerializable):
+        return _SERIALIZABLE
+    return _LEAF
+
+
 def writable_sort_order(key: Union[BaseEntity, str]) -> int:
     """Sort order for flattening such that the objects can be read back and re-nested."""
     from gemd.entity.object import MeasurementSpec, ProcessSpec, MaterialSpec, IngredientSpec, \
@@ -255,3 +378,39 @@ def writable_sort_order(key: Union[BaseEntity, str]) -> int:
         return 5
 
     raise ValueError("Unrecognized type string: {}".format(typ))
+
+
+@contextmanager
+def gc_paused():
+    """
+    Disable the cyclic garbage collector while in the context, if it was enabled.
+
+    Collections are triggered by the number of allocations and take time proportional to the
+    number of live objects, so they make building a large graph of objects, all of which are
+    kept, quadratic.  Wrapping a large :meth:`GEMDJson.loads
+    <gemd.json.gemd_json.GEMDJson.loads>`, :meth:`~gemd.json.gemd_json.GEMDJson.copy` or
+    :func:`~gemd.util.diff.diff` in this context can make it several times faster.
+
+    The collector is process-wide, so nothing in gemd pauses it on its own: cyclic garbage
+    made by any thread is not collected until the context exits, and it is up to the caller
+    to decide when that is acceptable.  The contexts are counted, so the state the collector
+    was in when the first one was entered is restored when the last one, in any thread, exits.
+    """
+    global _gc_pauses, _gc_was_enabled
+    with _gc_lock:
+        if _gc_pauses == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_was_enabled:
+                gc.enable()
+
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0  # The number of gc_paused contexts that have been entered and not exited
+_gc_was_enabled = False  # Whether the collector was enabled when the first was entered
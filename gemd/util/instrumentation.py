@@ -0,0 +1,123 @@
+"""Opt-in timing and counting of the phases of serialization and graph walks."""
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from gemd.entity.context_var import ContextVar
+
+# The instrumentation that the gemd.util walkers report to in this thread or task; the last
+# is current
+_active = ContextVar("gemd_instrumentation", default=())
+
+
+class Instrumentation(object):
+    """
+    Records the wall time of the phases of an operation and counts of what it processed.
+
+    Pass one to :class:`GEMDJson <gemd.json.gemd_json.GEMDJson>` to instrument its dumps and
+    loads, or use it as a context manager to instrument the :mod:`gemd.util` walkers called
+    within it (GEMDJson does this for the walkers it calls).  Phases are named by the operation
+    and the step, e.g. ``"dumps.encode"`` or ``"flatten.sort"``, and nest: the time of
+    ``"dumps.flatten"`` includes that of the ``"flatten.*"`` phases.  Counters include
+    entities by type (e.g. ``"loads.entities.material_run"``), bytes produced or consumed
+    (``"dumps.bytes"``) and links that were and were not resolved (``"loads.links.hits"`` and
+    ``"loads.links.misses"``; see :meth:`hit_rate`).
+
+    Using it as a context manager only affects the current thread, or asyncio task, so
+    concurrent operations can be instrumented separately.  When no instrumentation is in use,
+    the only cost is a check per walk or per deserialized object.
+
+    Parameters
+    ----------
+    callback: Callable[[str, str, float], None], optional
+        Called with ``("phase", name, seconds)`` at the end of each phase and with
+        ``("count", name, increment)`` for each counter update, e.g. to forward them to a
+        metrics system.
+
+    """
+
+    def __init__(self, callback: Optional[Callable[[str, str, float], None]] = None):
+        self.times = {}  # type: Dict[str, float]
+        self.calls = {}  # type: Dict[str, int]
+        self.counts = {}  # type: Dict[str, int]
+        self._callback = callback
+
+    def __enter__(self):
+        _active.set(_active.get() + (self, ))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        active = list(_active.get())
+        active.remove(self)
+        _active.set(tuple(active))
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a phase, adding to the time of earlier phases with the same name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.times[name] = self.times.get(name, 0.0) + elapsed
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if self._callback is not None:
+                self._callback("phase", name, elapsed)
+
+    def count(self, name: str, increment: int = 1) -> None:
+        """Add to a counter."""
+        self.counts[name] = self.counts.get(name, 0) + increment
+        if self._callback is not None:
+            self._callback("count", name, increment)
+
+    def count_entities(self, prefix: str, entities) -> None:
+        """Count entities by type, as ``"<prefix>.entities.<typ>"``."""
+        counts = {}
+        for entity in entities:
+            counts[entity.typ] = counts.get(entity.typ, 0) + 1
+        for typ, count in sorted(counts.items()):
+            self.count("{}.entities.{}".format(prefix, typ), count)
+
+    def hit_rate(self, prefix: str) -> Optional[float]:
+        """
+        Get the fraction of links that were resolved, e.g. for ``"loads.links"``.
+
+        Returns None if no links were counted.
+        """
+        hits = self.counts.get(prefix + ".hits", 0)
+        total = hits + self.counts.get(prefix + ".misses", 0)
+        return hits / total if total else None
+
+    def report(self) -> Dict[str, Dict]:
+        """Get the times, numbers of calls and counts recorded so far, as plain dicts."""
+        return {"times": dict(self.times), "calls": dict(self.calls), "counts": dict(self.counts)}
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        self.times.clear()
+        self.calls.clear()
+        self.counts.clear()
+
+
+def current_instrumentation() -> Optional[Instrumentation]:
+    """Get the instrumentation that the walkers should report to, if any."""
+    active = _active.get()
+    return active[-1] if active else None
+
+
+@contextmanager
+def _null_context():
+    """A context that does nothing, in place of an instrumentation or phase."""
+    yield
+
+
+def _phase(instrumentation: Optional[Instrumentation], name: str):
+    """Time a phase with the instrumentation, if there is any."""
+    if instrumentation is None:
+        return _null_context()
+    return instrumentation.phase(name)
+
+
+def _size(text) -> int:
+    """Get the size in bytes of a str, as utf-8, or of bytes."""
+    return len(text.encode("utf-8")) if isinstance(text, str) else len(text)
@@ -0,0 +1,200 @@
+"""Measure where the memory of a graph of gemd objects goes."""
+import sys
+from enum import Enum
+from functools import lru_cache
+from types import ModuleType
+from typing import Any, Dict, Hashable, Tuple
+
+from gemd.entity.dict_serializable import DictSerializable
+
+CATEGORIES = ("entities", "attributes", "values", "bounds", "valid_lists",
+              "case_insensitive_dicts", "strings", "other")
+
+_CONTAINERS = ("valid_lists", "case_insensitive_dicts")  # Their state counts towards them
+_UNIT_FIELDS = ("_units", "_default_units")
+
+
+class MemoryProfile(object):
+    """
+    Where the memory of a graph of gemd objects goes, as measured by :func:`memory_profile`.
+
+    All sizes are in bytes, as reported by :func:`sys.getsizeof`, and every object is counted
+    once however many times it is referenced.  :meth:`as_dict` gives the whole profile as
+    plain, json-serializable containers.
+
+    Parameters
+    ----------
+    total: Dict[str, int]
+        The ``count`` of objects in the graph and their ``bytes``.
+    categories: Dict[str, Dict[str, int]]
+        The count and bytes of the objects in each of :data:`CATEGORIES`.  An instance's
+        ``__dict__`` and the internal state of a ValidList or CaseInsensitiveDict count
+        towards the object itself.
+    classes: Dict[str, Dict[str, int]]
+        The count and deep bytes of the instances of each gemd class, by class name.  The deep
+        size of an object includes everything it references that is not a gemd object and that
+        was not already reached through another gemd object.  Objects reached without passing
+        through a gemd object are listed under their own class.
+    duplicates: Dict[str, Dict[str, int]]
+        For each kind of object that could be shared: the number of distinct ``objects``, the
+        number of ``distinct`` contents among them, and the bytes that would be ``saved`` if the
+        objects with the same content were replaced by one shared instance.  The kinds are the
+        class names of values and bounds, ``"units"`` for unit strings and ``"strings"`` for
+        all strings.
+
+    """
+
+    def __init__(self, *, total, categories, classes, duplicates):
+        self.total = total
+        self.categories = categories
+        self.classes = classes
+        self.duplicates = duplicates
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the profile as nested dicts, e.g. to be written as json."""
+        return {"total": dict(self.total),
+                "categories": {k: dict(v) for k, v in self.categories.items()},
+                "classes": {k: dict(v) for k, v in self.classes.items()},
+                "duplicates": {k: dict(v) for k, v in self.duplicates.items()}}
+
+    def __repr__(self):
+        return "<MemoryProfile: {count} objects, {bytes} bytes>".format(**self.total)
+
+
+def memory_profile(obj) -> MemoryProfile:
+    """
+    Count the objects in a graph and their sizes, and find objects with duplicate content.
+
+    The graph is everything that can be reached from `obj` through containers and instance
+    attributes.  Classes, functions, modules and enum members are shared by every graph, so
+    they are neither counted nor followed.
+
+    :param obj: a gemd object, or a container of them, such as the output of GEMDJson.loads
+    :return: the profile of the graph
+    """
+    categorize = _categorizer()
+    categories = {name: {"count": 0, "bytes": 0} for name in CATEGORIES}
+    classes = {}  # class name -> count and deep bytes
+    sizes = {}  # id -> the deep bytes of a gemd object, or the bytes of a string
+    contents = {}  # kind -> content -> the ids of the distinct objects with that content
+    seen = set()
+
+    # Each entry is (object, the gemd object that owns it, the category to count it under)
+    stack = [(obj, None, None)]
+    while stack:
+        thing, owner, category = stack.pop()
+        if _is_shared(thing) or id(thing) in seen:
+            continue
+        seen.add(id(thing))
+
+        if isinstance(thing, DictSerializable):
+            owner = thing
+            category = None  # Even if it is reached through the internal state of a container
+            classes.setdefault(type(thing).__name__, {"count": 0, "bytes": 0})["count"] += 1
+        inherited = category
+        if category is None:
+            category = categorize(type(thing))
+        internal = inherited or (category if category in _CONTAINERS else None)
+
+        size = sys.getsizeof(thing)
+        children = []
+        state = getattr(thing, "__dict__", None)
+        if isinstance(state, dict):
+            seen.add(id(state))
+            size += sys.getsizeof(state)
+            for key, value in state.items():
+                children.append((value, internal))
+                if key in _UNIT_FIELDS and isinstance(value, str):
+                    contents.setdefault("units", {}).setdefault(value, set()).add(id(value))
+        children.extend((getattr(thing, slot, None), internal) for slot in _slots(type(thing)))
+        if isinstance(thing, dict):
+            for key, value in thing.items():
+                children.extend([(key, inherited), (value, inherited)])
+        elif isinstance(thing, (list, tuple, set, frozenset)):
+            children.extend((value, inherited) for value in thing)
+        elif isinstance(thing, str):
+            sizes[id(thing)] = size
+            contents.setdefault("strings", {}).setdefault(thing, set()).add(id(thing))
+
+        categories[category]["count"] += 1
+        categories[category]["bytes"] += size
+        if owner is None:
+            usage = classes.setdefault(type(thing).__name__, {"count": 0, "bytes": 0})
+            usage["count"] += 1
+            usage["bytes"] += size
+        else:
+            classes[type(owner).__name__]["bytes"] += size
+            sizes[id(owner)] = sizes.get(id(owner), 0) + size
+            if owner is thing and category in ("values", "bounds"):
+                contents.setdefault(type(thing).__name__, {}).setdefault(
+                    _freeze(thing.as_dict()), set()).add(id(thing))
+        stack.extend((child, owner, child_category)
+                     for child, child_category in reversed(children))
+
+    return MemoryProfile(
+        total={"count": sum(x["count"] for x in categories.values()),
+               "bytes": sum(x["bytes"] for x in categories.values())},
+        categories=categories,
+        classes=dict(sorted(classes.items())),
+        duplicates={kind: _duplicates(groups, sizes) for kind, groups in sorted(contents.items())}
+    )
+
+
+def _categorizer():
+    """Get a function from a class to its category, which remembers its answers."""
+    from gemd.entity.attribute.base_attribute import BaseAttribute
+    from gemd.entity.attribute.property_and_conditions import PropertyAndConditions
+    from gemd.entity.base_entity import BaseEntity
+    from gemd.entity.bounds.base_bounds import BaseBounds
+    from gemd.entity.case_insensitive_dict import CaseInsensitiveDict
+    from gemd.entity.valid_list import ValidList
+    from gemd.entity.value.base_value import BaseValue
+
+    bases = [(BaseEntity, "entities"), ((BaseAttribute, PropertyAndConditions), "attributes"),
+             (BaseValue, "values"), (BaseBounds, "bounds"), (ValidList, "valid_lists"),
+             (CaseInsensitiveDict, "case_insensitive_dicts"), (str, "strings")]
+    known = {}
+
+    def categorize(clazz: type) -> str:
+        if clazz not in known:
+            known[clazz] = next((name for base, name in bases if issubclass(clazz, base)),
+                                "other")
+        return known[clazz]
+    return categorize
+
+
+def _is_shared(thing) -> bool:
+    """Whether an object is shared by every graph, so it is neither counted nor followed."""
+    return thing is None or isinstance(thing, (bool, type, ModuleType, Enum)) or \
+        (callable(thing) and not isinstance(thing, DictSerializable))
+
+
+@lru_cache(maxsize=None)
+def _slots(clazz: type) -> Tuple[str, ...]:
+    """Get the names of the slots of a class and its bases."""
+    slots = []
+    for base in clazz.__mro__:
+        declared = base.__dict__.get("__slots__", ())
+        if isinstance(declared, str):
+            declared = (declared, )
+        slots.extend(x for x in declared if x not in ("__dict__", "__weakref__"))
+    return tuple(slots)
+
+
+def _freeze(thing) -> Hashable:
+    """Turn the dict of a value or bounds into something hashable with the same content."""
+    if isinstance(thing, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in thing.items()))
+    if isinstance(thing, (list, tuple)):
+        return tuple(_freeze(x) for x in thing)
+    return thing
+
+
+def _duplicates(groups: Dict[Hashable, set], sizes: Dict[int, int]) -> Dict[str, int]:
+    """Summarize groups of objects with the same content, keeping the largest of each."""
+    saved = 0
+    for ids in groups.values():
+        group_sizes = [sizes.get(x, 0) for x in ids]
+        saved += sum(group_sizes) - max(group_sizes)
+    return {"objects": sum(len(ids) for ids in groups.values()), "distinct": len(groups),
+            "saved": saved}
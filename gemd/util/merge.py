@@ -0,0 +1,168 @@
+"""Unify the entities of several graphs or contexts that share uids."""
+from typing import List, Tuple
+
+from gemd.entity.base_entity import BaseEntity
+from gemd.entity.link_by_uid import LinkByUID
+from gemd.util._graph import Structure, field_changes, uid_keys, walk
+from gemd.util.diff import EntityDiff
+from gemd.util.impl import _substitute_inplace
+
+
+class MergeResult(object):
+    """
+    The result of merging several graphs or contexts.
+
+    Parameters
+    ----------
+    objects: List
+        The merged inputs, in order, with every entity replaced by its canonical instance.
+    entities: List[BaseEntity]
+        The canonical entities, in the order they were first found.
+    conflicts: List[EntityDiff]
+        The duplicates whose contents differ from their canonical entity: `old` is the
+        canonical entity and `new` is the duplicate, each with the fields that differ.
+
+    """
+
+    def __init__(self, objects: List, entities: List[BaseEntity], conflicts: List[EntityDiff]):
+        self.objects = objects
+        self.entities = entities
+        self.conflicts = conflicts
+
+    def __repr__(self):
+        return "<MergeResult: {} entities, {} conflicts>".format(
+            len(self.entities), len(self.conflicts))
+
+
+def merge(*objs) -> MergeResult:
+    """
+    Merge graphs or contexts so that each entity has a single, canonical instance.
+
+    Each argument may be a graph of entities (e.g., a terminal material and its history), a
+    flattened list of entities connected by LinkByUID (such as the context of a document
+    loaded with `raw_loads`) or any container of them.  Entities that share any uid are
+    unified: the first one found is canonical, and every pointer to a duplicate, as well as
+    every LinkByUID to any of their uids, is replaced by a pointer to the canonical entity.
+    A duplicate's uids in scopes that the canonical entity does not have are added to it.
+
+    The canonical entities and the inputs are modified in place, through the setters that
+    maintain bidirectional links; duplicates are left as they were, and should be discarded.
+    Inputs are processed one at a time, so the memory used beyond the inputs themselves is
+    proportional to the number of unique entities.  Entities without uids are never merged.
+
+    :param objs: the graphs or contexts to merge
+    :return: the merged inputs, the canonical entities and the conflicts between duplicates
+    """
+    index = {}  # (lowercase scope, id) -> canonical entity
+    refs = {}  # id(entity) -> reference key for comparisons, shared by duplicates
+    entities = []
+    conflicts = []
+    pending = []  # canonical entities with links that could not be resolved yet
+    merged = set()  # id(duplicate), for duplicates that are reachable from several inputs
+    structure = Structure(refs, index)
+
+    def _canonical(o):
+        if isinstance(o, LinkByUID):
+            return index.get((o.scope.lower(), o.id), o)
+        return next((index[key] for key in uid_keys(o) if key in index), o)
+
+    def _is_reference(o):
+        return isinstance(o, (BaseEntity, LinkByUID))
+
+    for obj in objs:
+        new, duplicates = [], []
+        for entity in walk(obj):
+            keys = uid_keys(entity)
+            found = next((index[key] for key in keys if key in index), None)
+            if found is entity or id(entity) in merged:  # already merged from another input
+                continue
+            if found is None:
+                refs[id(entity)] = len(entities)
+                entities.append(entity)
+                new.append(entity)
+                found = entity
+            else:
+                refs[id(entity)] = refs[id(found)]
+                duplicates.append((entity, found))
+            for key in keys:
+                # A uid whose scope the canonical entity has with another id is a conflict
+                if key not in index and found.uids.get(key[0], key[1]) == key[1]:
+                    index[key] = found
+
+        for duplicate, canonical in duplicates:
+            changes = field_changes(*_content(structure, canonical),
+                                    *_content(structure, duplicate))
+            if any(canonical.uids.get(scope, uid) != uid for scope, uid in duplicate.uids.items()):
+                changes["uids"] = (canonical.uids, duplicate.uids)
+            if changes:
+                conflicts.append(EntityDiff(canonical, duplicate, changes))
+
+        for entity in new:
+            if _link(entity, _canonical):
+                pending.append(entity)
+        for duplicate, canonical in duplicates:
+            _drop_inverse_links(duplicate, canonical)
+            for scope, uid in duplicate.uids.items():
+                if scope not in canonical.uids:
+                    canonical.add_uid(scope, uid)
+            del refs[id(duplicate)]
+            merged.add(id(duplicate))
+
+    # Links to entities in later inputs can only be resolved at the end
+    for entity in pending:
+        _link(entity, _canonical)
+    objects = [_substitute_inplace(obj, sub=_canonical, applies=_is_reference) for obj in objs]
+    return MergeResult(objects=objects, entities=entities, conflicts=conflicts)
+
+
+def _content(structure: Structure, entity: BaseEntity) -> Tuple[dict, dict]:
+    """Get the fields of an entity to compare, which are all but its uids, and their structures."""
+    fields, structures, _ = structure.fields(entity)
+    del fields["uids"], structures["uids"]
+    return fields, structures
+
+
+def _link(entity: BaseEntity, canonical) -> bool:
+    """
+    Point the links in an entity to canonical entities.
+
+    :param entity: the entity to update in place
+    :param canonical: function from an entity or LinkByUID to what should replace it
+    :return: whether any LinkByUID could not be resolved
+    """
+    unresolved = False
+
+    def _sub(o):
+        nonlocal unresolved
+        result = canonical(o)
+        unresolved = unresolved or isinstance(result, LinkByUID)
+        return result
+
+    _substitute_inplace(entity, sub=_sub,
+                        applies=lambda o: o is not entity and isinstance(o, (BaseEntity,
+                                                                             LinkByUID)))
+    return unresolved
+
+
+def _drop_inverse_links(duplicate: BaseEntity, canonical: BaseEntity) -> None:
+    """
+    Replace a duplicate in the inverse links (e.g. ProcessRun.ingredients) it is in.
+
+    The canonical entity takes the duplicate's place if it links to the same entity, and
+    otherwise the duplicate is removed.
+    """
+    for value in vars(duplicate).values():
+        if not isinstance(value, BaseEntity):
+            continue
+        linked = any(x is value for x in vars(canonical).values())
+        for name in value.skip:
+            inverse = getattr(value, name)
+            if inverse is duplicate:
+                setattr(value, name, canonical if linked else None)
+            elif isinstance(inverse, list):
+                for i in reversed(range(len(inverse))):
+                    if inverse[i] is duplicate:
+                        if linked and not any(x is canonical for x in inverse):
+                            inverse[i] = canonical
+                        else:
+                            del inverse[i]
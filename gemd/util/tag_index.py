@@ -0,0 +1,133 @@
+"""An inverted index of entities by tag and by name."""
+from typing import Dict, Iterable, Set, Tuple
+
+from gemd.entity.base_entity import BaseEntity
+from gemd.util._graph import walk
+
+_SEPARATOR = "::"
+
+
+class TagIndex(object):
+    """
+    An inverted index from tags and names to the entities that have them.
+
+    `Tags <https://citrineinformatics.github.io/gemd-documentation/specification/tags/>`_
+    are hierarchical, with levels separated by "::", so each entity is indexed under every
+    leading part of each of its tags: an entity tagged "dessert::baked::cake" is found by
+    "dessert", "dessert::baked" and "dessert::baked::cake".  Queries return new sets, which
+    can be combined with the set operators, e.g. ``index.tagged("a") & index.named("b")``
+    or ``index.tagged_any("a", "b") - index.tagged("c")``.  A query takes time proportional
+    to the size of its result.
+
+    The index can be built from a graph or a flattened context, and kept up to date with
+    :meth:`add`, :meth:`remove` and :meth:`update`.  It does not notice changes to the
+    entities by itself; e.g. pass the entities recorded by a
+    :class:`ChangeTracker <gemd.entity.change_tracker.ChangeTracker>` to :meth:`update`.
+
+    Parameters
+    ----------
+    obj: Any, optional
+        Graph(s) or context(s) whose entities to index.
+
+    """
+
+    def __init__(self, obj=None):
+        self._by_tag = {}  # tag or leading part of a tag -> entities
+        self._by_exact_tag = {}  # tag -> entities
+        self._by_name = {}  # name -> entities
+        self._indexed = {}  # id(entity) -> (entity, name, tags) as indexed
+        if obj is not None:
+            for entity in walk(obj):
+                self.add(entity)
+
+    def __len__(self):
+        return len(self._indexed)
+
+    def __contains__(self, entity) -> bool:
+        return id(entity) in self._indexed
+
+    def add(self, entity: BaseEntity) -> None:
+        """Add an entity to the index.  An entity that is already indexed is re-indexed."""
+        if id(entity) in self._indexed:
+            self.remove(entity)
+        name = getattr(entity, "name", None)
+        tags = tuple(entity.tags)
+        self._indexed[id(entity)] = (entity, name, tags)
+        self._by_name.setdefault(name, set()).add(entity)
+        for tag in tags:
+            self._by_exact_tag.setdefault(tag, set()).add(entity)
+            for prefix in _prefixes(tag):
+                self._by_tag.setdefault(prefix, set()).add(entity)
+
+    def remove(self, entity: BaseEntity) -> None:
+        """Remove an entity from the index, using the name and tags it was indexed with."""
+        _, name, tags = self._indexed.pop(id(entity))
+        _discard(self._by_name, name, entity)
+        for tag in tags:
+            _discard(self._by_exact_tag, tag, entity)
+            for prefix in _prefixes(tag):
+                _discard(self._by_tag, prefix, entity)
+
+    def update(self, *entities: BaseEntity) -> None:
+        """Re-index entities whose tags or names may have changed, adding any that are new."""
+        for entity in entities:
+            self.add(entity)
+
+    def tagged(self, tag: str, *, exact: bool = False) -> Set[BaseEntity]:
+        """
+        Get the entities with a tag.
+
+        Parameters
+        ----------
+        tag: str
+            The tag, or a leading part of it (a whole number of levels).
+        exact: bool
+            Only match entities with exactly this tag, not with tags beneath it.
+            (Default: False)
+
+        Returns
+        -------
+        Set[BaseEntity]
+            The matching entities.
+
+        """
+        index = self._by_exact_tag if exact else self._by_tag
+        return set(index.get(tag, ()))
+
+    def tagged_all(self, *tags: str, exact: bool = False) -> Set[BaseEntity]:
+        """Get the entities that match every one of a set of tags, as in :meth:`tagged`."""
+        index = self._by_exact_tag if exact else self._by_tag
+        matches = sorted((index.get(tag, set()) for tag in tags), key=len)
+        if not matches:
+            return set()
+        # Intersecting from the smallest set keeps the cost proportional to the result
+        return matches[0].intersection(*matches[1:])
+
+    def tagged_any(self, *tags: str, exact: bool = False) -> Set[BaseEntity]:
+        """Get the entities that match at least one of a set of tags, as in :meth:`tagged`."""
+        index = self._by_exact_tag if exact else self._by_tag
+        return set().union(*(index.get(tag, ()) for tag in tags))
+
+    def named(self, *names: str) -> Set[BaseEntity]:
+        """Get the entities with any of a set of names."""
+        return set().union(*(self._by_name.get(name, ()) for name in names))
+
+    @property
+    def tags(self) -> Iterable[str]:
+        """Get the tags of the indexed entities."""
+        return self._by_exact_tag.keys()
+
+
+def _prefixes(tag: str) -> Tuple[str, ...]:
+    """Get the leading parts of a hierarchical tag, including the whole tag."""
+    parts = tag.split(_SEPARATOR)
+    return tuple(_SEPARATOR.join(parts[:i]) for i in range(1, len(parts) + 1))
+
+
+def _discard(index: Dict, key, entity) -> None:
+    """Remove an entity from `index[key]`, dropping the key once it is empty."""
+    entities = index.get(key)
+    if entities is not None:
+        entities.discard(entity)
+        if not entities:
+            del index[key]
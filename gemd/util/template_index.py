@@ -0,0 +1,195 @@
+"""An index from templates to the attributes and objects that use them."""
+from typing import Dict, List, Tuple
+
+from gemd.entity.base_entity import BaseEntity
+from gemd.entity.link_by_uid import LinkByUID
+from gemd.util._graph import uid_keys
+
+
+class TemplateIndex(object):
+    """
+    An index from each template to the attributes and objects that reference it.
+
+    The index is filled one object at a time with :meth:`add`, which is cheap enough to call
+    on every object as it is deserialized: pass one to
+    :class:`GEMDJson <gemd.json.gemd_json.GEMDJson>` and it indexes everything it loads.
+    Templates are matched by uid, so it does not matter whether the references are pointers
+    or LinkByUID, or in which order the objects are added.
+
+    A query looks up each uid of the template (or the uids that the template was loaded
+    with, for a LinkByUID) and then takes time proportional to the number of results.
+
+    """
+
+    def __init__(self):
+        self._attributes = {}  # template key -> attributes that reference it
+        self._specs = {}  # object template key -> specs that reference it
+        self._runs = {}  # spec key -> runs of that spec
+        self._containers = {}  # attribute template key -> object templates that include it
+        self._aliases = {}  # template key -> every key of that template, once it is loaded
+        self._handlers = {}  # type -> method to index it with
+
+    def add(self, obj) -> None:
+        """
+        Index a deserialized object, if it references a template.
+
+        Attributes are indexed by their templates, specs by their templates, runs by their
+        specs and object templates by the attribute templates they include.  Anything else is
+        ignored.
+
+        Parameters
+        ----------
+        obj: Any
+            The object to index.
+
+        """
+        handler = self._handlers.get(type(obj))
+        if handler is None:
+            handler = self._handlers[type(obj)] = self._handler(type(obj))
+        handler(obj)
+
+    def attributes(self, template) -> List:
+        """
+        Get the properties, conditions and parameters that reference a template.
+
+        Parameters
+        ----------
+        template: AttributeTemplate, LinkByUID or Tuple[str, str]
+            The template, or a reference to it.
+
+        Returns
+        -------
+        List[BaseAttribute]
+            The attributes, in the order they were indexed.
+
+        """
+        return _lookup(self._attributes, self._keys(template))
+
+    def object_templates(self, template) -> List[BaseEntity]:
+        """
+        Get the object templates that include an attribute template.
+
+        Parameters
+        ----------
+        template: AttributeTemplate, LinkByUID or Tuple[str, str]
+            The attribute template, or a reference to it.
+
+        Returns
+        -------
+        List[BaseTemplate]
+            The object templates, in the order they were indexed.
+
+        """
+        return _lookup(self._containers, self._keys(template))
+
+    def objects(self, template) -> List[BaseEntity]:
+        """
+        Get the specs and runs whose template chain leads to a template.
+
+        For an object template, these are the specs that use it and the runs of those specs.
+        For an attribute template, they are the specs and runs of every object template that
+        includes it.
+
+        Parameters
+        ----------
+        template: BaseTemplate, AttributeTemplate, LinkByUID or Tuple[str, str]
+            The template, or a reference to it.
+
+        Returns
+        -------
+        List[BaseEntity]
+            The specs, then the runs.
+
+        """
+        keys = self._keys(template)
+        object_templates = _lookup(self._containers, keys)
+        for object_template in object_templates:
+            keys.extend(uid_keys(object_template))
+        specs = _lookup(self._specs, keys)
+        runs = _lookup(self._runs, [key for spec in specs for key in uid_keys(spec)])
+        return specs + runs
+
+    def update(self, other: "TemplateIndex") -> None:
+        """Add the contents of another index to this one."""
+        for mine, theirs in [(self._attributes, other._attributes), (self._specs, other._specs),
+                             (self._runs, other._runs),
+                             (self._containers, other._containers)]:
+            for key, values in theirs.items():
+                mine.setdefault(key, []).extend(values)
+        self._aliases.update(other._aliases)
+
+    def _keys(self, reference) -> List[Tuple[str, str]]:
+        """Get all of the known keys for a template or a reference to it."""
+        if isinstance(reference, BaseEntity):
+            return uid_keys(reference)
+        if isinstance(reference, LinkByUID):
+            key = (reference.scope.lower(), reference.id)
+        else:
+            scope, id_ = reference
+            key = (scope.lower(), id_)
+        return list(self._aliases.get(key, [key]))
+
+    def _handler(self, clazz: type):
+        """Choose the method that indexes objects of a type."""
+        from gemd.entity.attribute.base_attribute import BaseAttribute
+        from gemd.entity.object.has_template import HasTemplate
+        from gemd.entity.template.attribute_template import AttributeTemplate
+        from gemd.entity.template.base_template import BaseTemplate
+
+        if issubclass(clazz, BaseAttribute):
+            return self._add_attribute
+        if issubclass(clazz, (AttributeTemplate, BaseTemplate)):
+            return self._add_template
+        if issubclass(clazz, HasTemplate):
+            return self._add_spec
+        if issubclass(clazz, BaseEntity) and hasattr(clazz, "spec") and \
+                hasattr(clazz, "template"):
+            return self._add_run
+        return _ignore
+
+    def _add_attribute(self, attribute) -> None:
+        _register(self._attributes, _reference_keys(attribute.template), attribute)
+
+    def _add_template(self, template: BaseEntity) -> None:
+        keys = uid_keys(template)
+        for key in keys:
+            self._aliases[key] = keys
+        for name in ("properties", "conditions", "parameters"):
+            for attribute_template, _ in getattr(template, name, ()):
+                _register(self._containers, _reference_keys(attribute_template), template)
+
+    def _add_spec(self, spec: BaseEntity) -> None:
+        _register(self._specs, _reference_keys(spec.template), spec)
+
+    def _add_run(self, run: BaseEntity) -> None:
+        _register(self._runs, _reference_keys(run.spec), run)
+
+
+def _reference_keys(reference) -> List[Tuple[str, str]]:
+    """Get the keys that a pointer or LinkByUID refers to, if any."""
+    if isinstance(reference, LinkByUID):
+        return [(reference.scope.lower(), reference.id)]
+    if isinstance(reference, BaseEntity):
+        return uid_keys(reference)
+    return []
+
+
+def _register(index: Dict, keys: List[Tuple[str, str]], value) -> None:
+    """Add a value to the index under each key."""
+    for key in keys:
+        index.setdefault(key, []).append(value)
+
+
+def _lookup(index: Dict, keys: List[Tuple[str, str]]) -> List:
+    """Get the distinct values under any of the keys, in order."""
+    if len(keys) == 1:
+        return list(index.get(keys[0], ()))
+    found = {}
+    for key in keys:
+        for value in index.get(key, ()):
+            found.setdefault(id(value), value)
+    return list(found.values())
+
+
+def _ignore(obj) -> None:
+    """Index nothing."""
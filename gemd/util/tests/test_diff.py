@@ -0,0 +1,106 @@
+"""Test the comparison of two versions of a collection of entities."""
+import pytest
+
+from gemd.demo.cake import make_cake
+from gemd.entity.link_by_uid import LinkByUID
+from gemd.entity.object import ProcessRun, MaterialRun, MeasurementRun
+from gemd.json import GEMDJson
+from gemd.util import diff
+
+
+def test_identical_versions():
+    """Test that equivalent graphs and contexts have no differences."""
+    encoder = GEMDJson()
+    cake = make_cake(seed=7)
+    copy = encoder.copy(cake)
+    assert not diff(cake, copy)
+
+    # A flattened context, with LinkByUIDs instead of pointers, is equivalent to the graph
+    context = encoder.raw_loads(encoder.dumps(cake))["context"]
+    assert any(isinstance(x.process, LinkByUID) for x in context if isinstance(x, MaterialRun))
+    result = diff(context, copy)
+    assert not result
+    assert (result.added, result.removed, result.modified) == ([], [], [])
+
+
+def test_field_level_changes():
+    """Test that added, removed and modified entities are reported."""
+    process = ProcessRun("process", uids={"id": "process"})
+    material = MaterialRun("material", process=process, uids={"id": "material"})
+    old_measurement = MeasurementRun("old", material=material, uids={"id": "old"})
+    old = GEMDJson().copy(material)
+    old_measurement.material = None
+    new_measurement = MeasurementRun("new", material=material, uids={"id": "new"})
+    material.name = "renamed"
+    material.tags = ["a::tag"]
+    other = ProcessRun("other", uids={"ID": "other"})
+    process.notes = "notes"
+
+    result = diff(old, material)
+    assert result.added == [new_measurement]
+    assert [x.name for x in result.removed] == ["old"]
+    assert {x.new.uids["id"]: sorted(x.fields) for x in result.modified} == {
+        "material": ["name", "tags"],
+        "process": ["notes"],
+    }
+    change = next(x for x in result.modified if x.new is material)
+    assert change.old.name == "material"
+    assert change.fields["name"] == ("material", "renamed")
+    assert "1 added, 1 removed, 2 modified" in repr(result)
+
+    # Changing a link is a change to the linking entity, not to the entity it points to
+    old = GEMDJson().copy(material)
+    material.process = other
+    result = diff(old, [material, other])
+    assert [x.uids["id"] for x in result.added] == ["other"]
+    assert [x.uids["id"] for x in result.removed] == ["process"]
+    assert [(x.new.name, list(x.fields)) for x in result.modified] == [("renamed", ["process"])]
+
+
+def test_matching():
+    """Test that entities are matched by any uid, and that uids are required."""
+    old = MaterialRun("material", uids={"Scope": "1", "other": "2"})
+    new = MaterialRun("material", uids={"scope": "1", "another": "3"})
+    result = diff(old, new)
+    assert [list(x.fields) for x in result.modified] == [["uids"]]
+
+    # A LinkByUID to an entity that is in neither version is compared by its uid
+    old = MaterialRun("material", process=LinkByUID("id", "a"), uids={"id": "material"})
+    new = MaterialRun("material", process=LinkByUID("ID", "a"), uids={"id": "material"})
+    assert not diff(old, new)
+    new.process = LinkByUID("id", "b")
+    assert [list(x.fields) for x in diff(old, new).modified] == [["process"]]
+
+    with pytest.raises(ValueError):
+        diff(old, MaterialRun("no uids"))
+
+
+def test_enumerated_fields_and_duplicates():
+    """Test that enumerated fields are compared, and duplicates as their first instance."""
+    old = MaterialRun("material", sample_type="experimental", uids={"id": "material"})
+    new = MaterialRun("material", sample_type="virtual", uids={"id": "material"})
+    change, = diff(old, new).modified
+    assert change.fields == {"sample_type": ("experimental", "virtual")}
+    assert repr(change) == "<EntityDiff MaterialRun 'material': ['sample_type']>"
+
+    # The material links to a second instance of the process, which is a duplicate
+    process = ProcessRun("process", uids={"id": "process"})
+    duplicate = ProcessRun("process", uids={"id": "process"})
+    old = [process, MaterialRun("material", process=duplicate, uids={"id": "material"})]
+    new = MaterialRun("material", process=ProcessRun("process", uids={"id": "process"}),
+                      uids={"id": "material"})
+    assert not diff(old, new)
+    new.process.name = "renamed"
+    assert [list(x.fields) for x in diff(old, new).modified] == [["name"]]
+
+
+def test_hash_collisions(monkeypatch):
+    """Test that entities whose structures hash the same are still compared."""
+    from gemd.util._graph import Structure
+
+    fields = Structure.fields
+    monkeypatch.setattr(Structure, "fields", lambda self, x: fields(self, x)[:2] + (0,))
+    old = ProcessRun("mix", uids={"id": "1"})
+    new = ProcessRun("stir", uids={"id": "1"})
+    assert [x.fields for x in diff(old, new).modified] == [{"name": ("mix", "stir")}]
+    assert not diff(old, ProcessRun("mix", uids={"id": "1"}))
@@ -0,0 +1,63 @@
+"""Test pausing the garbage collector."""
+import gc
+import threading
+
+from gemd.util import gc_paused
+
+
+def testgc_paused():
+    """Test that the collector is paused in the context, and restored afterwards."""
+    assert gc.isenabled()
+    with gc_paused():
+        assert not gc.isenabled()
+        with gc_paused():
+            assert not gc.isenabled()
+        assert not gc.isenabled()
+    assert gc.isenabled()
+
+
+def testgc_paused_across_threads():
+    """Test that the collector stays paused until the last context in any thread exits."""
+    entered, release = threading.Event(), threading.Event()
+
+    def pause():
+        with gc_paused():
+            entered.set()
+            release.wait()
+
+    thread = threading.Thread(target=pause)
+    with gc_paused():
+        thread.start()
+        entered.wait()
+    assert not gc.isenabled(), "The other thread's context is still open"
+    release.set()
+    thread.join()
+    assert gc.isenabled()
+
+    # A collector that was disabled beforehand stays disabled
+    gc.disable()
+    try:
+        with gc_paused():
+            pass
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+
+
+def test_not_paused_by_the_library():
+    """Test that loading and copying leave the collector alone unless the caller pauses it."""
+    from gemd.entity.object import MaterialRun, ProcessRun
+    from gemd.json import GEMDJson
+    from gemd.util import Instrumentation
+
+    states = []
+    encoder = GEMDJson(instrumentation=Instrumentation(
+        callback=lambda *x: states.append(gc.isenabled())))
+    material = MaterialRun("material", process=ProcessRun("process"))
+    encoder.copy(encoder.loads(encoder.dumps(material)))
+    assert states and all(states)
+
+    states.clear()
+    with gc_paused():
+        encoder.loads(encoder.dumps(material))
+    assert states and not any(states)
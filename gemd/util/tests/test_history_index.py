@@ -0,0 +1,63 @@
+"""Test queries of the lineage of objects in material histories."""
+import pytest
+
+from gemd.demo.cake import make_cake
+from gemd.entity.link_by_uid import LinkByUID
+from gemd.entity.object import ProcessRun, MaterialRun, IngredientRun, MeasurementRun, \
+    ProcessSpec, MaterialSpec, IngredientSpec
+from gemd.json import GEMDJson
+from gemd.util import HistoryIndex
+
+
+def _history():
+    """A two-step history: raw material -> ingredient -> process -> product -> measurement."""
+    raw_process = ProcessRun("buying", uids={"id": "buying"})
+    raw = MaterialRun("raw", process=raw_process, uids={"id": "raw"})
+    process = ProcessRun("mixing", uids={"id": "mixing"})
+    ingredient = IngredientRun(material=raw, process=process, uids={"id": "ingredient"})
+    product = MaterialRun("product", process=process, uids={"id": "product"})
+    measurement = MeasurementRun("measurement", material=product, uids={"id": "measurement"})
+    return raw_process, raw, process, ingredient, product, measurement
+
+
+def test_queries():
+    """Test ancestor and descendant queries, with depth limits and type filters."""
+    raw_process, raw, process, ingredient, product, measurement = _history()
+    index = HistoryIndex(product)
+    assert len(index) == 6
+    assert measurement in index
+    assert MaterialRun("not indexed") not in index
+
+    assert index.ancestors(product) == [process, ingredient, raw, raw_process]
+    assert index.ancestors(product, depth=2) == [process, ingredient]
+    assert index.ancestors(measurement, types=MaterialRun) == [product, raw]
+    assert index.ancestors(raw_process) == []
+    assert index.descendants(raw_process) == [raw, ingredient, process, product, measurement]
+    assert index.descendants(raw, depth=1) == [ingredient]
+    assert index.descendants(process, types=(MeasurementRun, IngredientRun)) == [measurement]
+    assert index.ancestors(LinkByUID("ID", "mixing"), depth=1) == [ingredient]
+
+    with pytest.raises(ValueError):
+        index.ancestors(MaterialRun("not indexed"))
+
+
+def test_contexts_and_specs():
+    """Test that a context indexes the same way as a graph, and that specs are optional."""
+    cake = make_cake(seed=3)
+    graph = HistoryIndex(cake)
+    context = GEMDJson().raw_loads(GEMDJson().dumps(cake))["context"]
+    flat = HistoryIndex(context)
+    assert len(flat) == len(graph)
+    assert not any(isinstance(x, (ProcessSpec, MaterialSpec)) for x in graph.ancestors(cake))
+
+    link = LinkByUID.from_entity(cake)
+    assert [LinkByUID.from_entity(x) for x in flat.ancestors(link)] == \
+        [LinkByUID.from_entity(x) for x in graph.ancestors(cake)]
+    assert [x.name for x in flat.descendants(LinkByUID.from_entity(cake.process), depth=2)] == \
+        [cake.name] + [x.name for x in cake.measurements]
+
+    specs = HistoryIndex(cake, specs=True)
+    assert cake.spec not in graph
+    upstream = specs.ancestors(cake.spec, types=IngredientSpec)
+    ingredients = graph.ancestors(cake, types=IngredientRun)
+    assert {x.name for x in upstream} == {x.name for x in ingredients}
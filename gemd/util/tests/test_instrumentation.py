@@ -0,0 +1,154 @@
+"""Test the instrumentation of serialization and graph walks."""
+import asyncio
+import io
+import threading
+
+from gemd.entity.change_tracker import ChangeTracker
+from gemd.entity.link_by_uid import LinkByUID
+from gemd.entity.object import MaterialRun, ProcessRun
+from gemd.json import GEMDJson
+from gemd.util import Instrumentation, current_instrumentation, flatten, substitute_objects
+
+
+def _history():
+    """A material run and the process that made it, with uids."""
+    process = ProcessRun("mix", uids={"id": "process"})
+    return MaterialRun("batter", process=process, uids={"id": "material"})
+
+
+def test_dumps_and_loads():
+    """Test that GEMDJson records its phases, entities, bytes and links."""
+    events = []
+    instrumentation = Instrumentation(callback=lambda *x: events.append(x))
+    encoder = GEMDJson(instrumentation=instrumentation)
+    assert encoder.instrumentation is instrumentation
+
+    text = encoder.dumps(_history())
+    times = instrumentation.times
+    for phase in ("dumps.flatten", "dumps.substitute_links", "dumps.encode",
+                  "flatten.set_uuids", "flatten.walk", "flatten.substitute_links",
+                  "flatten.sort"):
+        assert instrumentation.calls[phase] == 1
+        assert times[phase] >= 0
+    assert times["dumps.flatten"] >= times["flatten.walk"]
+    assert instrumentation.counts["flatten.entities.material_run"] == 1
+    assert instrumentation.counts["flatten.entities.process_run"] == 1
+    assert instrumentation.counts["dumps.bytes"] == len(text.encode("utf-8"))
+    assert current_instrumentation() is None, "dumps should only activate it while it runs"
+    assert ("count", "dumps.bytes", len(text)) in events
+    assert [e for e in events if e[:2] == ("phase", "dumps.encode")]
+
+    instrumentation.reset()
+    assert instrumentation.report() == {"times": {}, "calls": {}, "counts": {}}
+    assert instrumentation.hit_rate("loads.links") is None
+
+    loaded = encoder.loads(text)
+    assert loaded.process.output_material is loaded
+    report = instrumentation.report()
+    assert report["calls"] == {"loads.decode": 1}
+    assert report["counts"]["loads.bytes"] == len(text)
+    assert report["counts"]["loads.entities.material_run"] == 1
+    # The material links to its process, and the object is a link to the material
+    assert report["counts"]["loads.links.hits"] == 2
+    assert instrumentation.hit_rate("loads.links") == 1.0
+
+    # Links that are not in the document are misses
+    instrumentation.reset()
+    encoder.loads('{"context": [], "object": {"id": "x", "scope": "id", "type": "link_by_uid"}}')
+    assert instrumentation.hit_rate("loads.links") == 0.0
+    assert instrumentation.counts["loads.bytes"] > 0
+
+    instrumentation.reset()
+    encoder.loads(text.encode("utf-8"))
+    assert instrumentation.counts["loads.bytes"] == len(text)
+
+
+def test_loads_batch():
+    """Test that loads_batch records its phases and how links were resolved."""
+    instrumentation = Instrumentation(callback=lambda *x: None)
+    encoder = GEMDJson(instrumentation=instrumentation)
+    docs = [GEMDJson().dumps(_history()), GEMDJson().dumps(LinkByUID("id", "missing"))]
+    encoder.loads_batch(docs, workers=1)
+    assert instrumentation.calls["loads_batch.decode"] == 1
+    assert instrumentation.calls["loads_batch.link"] == 1
+    assert instrumentation.counts["loads_batch.bytes"] == sum(len(x) for x in docs)
+    assert instrumentation.counts["substitute_objects.links.hits"] >= 2
+    assert instrumentation.counts["substitute_objects.links.misses"] == 1
+    assert "loads.decode" not in instrumentation.calls, "Shards are not instrumented"
+
+
+def test_walkers():
+    """Test that the walkers only report to an active instrumentation, innermost first."""
+    outer, inner = Instrumentation(), Instrumentation()
+    flatten(_history(), "test")
+    with outer:
+        assert current_instrumentation() is outer
+        with inner:
+            assert current_instrumentation() is inner
+            flatten(_history(), "test")
+        substitute_objects([LinkByUID("id", "x")], {}, inplace=True)
+    assert current_instrumentation() is None
+    assert inner.counts == {"flatten.entities.material_run": 1,
+                            "flatten.entities.process_run": 1}
+    assert outer.report()["calls"] == {"substitute_objects": 1}
+    assert outer.hit_rate("substitute_objects.links") == 0.0
+
+
+def test_threads_and_tasks():
+    """Test that an active instrumentation only applies to its own thread and tasks."""
+    instrumentation = Instrumentation()
+    found = []
+
+    with instrumentation:
+        thread = threading.Thread(target=lambda: found.append(current_instrumentation()))
+        thread.start()
+        thread.join()
+
+        async def other_task():
+            with Instrumentation() as inner:
+                await asyncio.sleep(0)
+                return current_instrumentation() is inner
+
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(other_task())
+        finally:
+            loop.close()
+        assert current_instrumentation() is instrumentation
+    assert found == [None]
+
+
+def test_async_and_changes():
+    """Test that async_dump, async_load and dumps_changes record their phases."""
+    instrumentation = Instrumentation()
+    encoder = GEMDJson(instrumentation=instrumentation)
+    material = _history()
+    text = GEMDJson().dumps(material)
+
+    async def round_trip():
+        out = io.StringIO()
+        await encoder.async_dump(material, out, chunk_size=16, slice_size=1)
+        return await encoder.async_load(io.StringIO(out.getvalue()), chunk_size=16)
+
+    loop = asyncio.new_event_loop()
+    try:
+        copy = loop.run_until_complete(round_trip())
+    finally:
+        loop.close()
+    assert copy.process.output_material is copy
+    calls, counts = instrumentation.calls, instrumentation.counts
+    for phase in ("async_dump.flatten", "async_dump.substitute_links",
+                  "async_load.read", "async_load.decode", "async_load.build"):
+        assert calls[phase] == 1
+    assert calls["async_dump.encode"] == 3, "Two slices of the context, and the object"
+    assert calls["async_dump.write"] > 1
+    assert counts["async_dump.bytes"] == counts["async_load.bytes"] == len(text)
+
+    instrumentation.reset()
+    with ChangeTracker() as tracker:
+        material.name = "renamed"
+        text = encoder.dumps_changes(tracker)
+    assert instrumentation.calls == {"dumps_changes.substitute_links": 1,
+                                     "dumps_changes.encode": 1}
+    assert instrumentation.counts == {"dumps_changes.entities.material_run": 1,
+                                      "dumps_changes.bytes": len(text)}
@@ -0,0 +1,63 @@
+"""Test the memory profile of a graph."""
+import json
+import sys
+
+from gemd.demo.cake import make_cake
+from gemd.entity.bounds import RealBounds
+from gemd.entity.template import PropertyTemplate
+from gemd.entity.value import NominalReal
+from gemd.json import GEMDJson
+from gemd.util import memory_profile, MemoryProfile
+from gemd.util.memory import CATEGORIES
+
+
+class _Slotted(object):
+    """An object with a single slot, declared as a string."""
+
+    __slots__ = "value"
+
+    def __init__(self, value):
+        self.value = value
+
+
+def test_cake():
+    """Test that the profile of a loaded cake accounts for every byte once."""
+    cake = GEMDJson().loads(GEMDJson().dumps(make_cake(seed=0)))
+    profile = memory_profile(cake)
+    assert isinstance(profile, MemoryProfile)
+    assert "objects" in repr(profile)
+
+    report = json.loads(json.dumps(profile.as_dict()))
+    assert set(report["categories"]) == set(CATEGORIES)
+    for category in ("entities", "attributes", "values", "bounds", "valid_lists",
+                     "case_insensitive_dicts", "strings"):
+        assert report["categories"][category]["count"] > 0, category
+    assert report["total"]["bytes"] == sum(x["bytes"] for x in report["categories"].values())
+    assert report["total"]["bytes"] == sum(x["bytes"] for x in report["classes"].values())
+    assert report["classes"]["MaterialRun"]["count"] > 0
+    # The profile is of the cake's graph, not of everything reachable from the classes
+    assert report["total"]["bytes"] == memory_profile([cake]).total["bytes"] - \
+        sys.getsizeof([cake])
+
+
+def test_duplicates():
+    """Test that objects with the same content are found, and shared objects are not."""
+    shared = NominalReal(1.0, "")
+    template = PropertyTemplate("t", bounds=RealBounds(0, 1, "m"))
+    graph = [NominalReal(2.5, "m"), NominalReal(2.5, "m"), shared, shared,
+             template, PropertyTemplate("u", bounds=RealBounds(0, 1, "m")),
+             _Slotted("".join(["ab", "cd"])), "".join(["a", "bcd"])]
+    profile = memory_profile(graph)
+
+    reals = profile.duplicates["NominalReal"]
+    assert reals["objects"] == 3
+    assert reals["distinct"] == 2
+    # The units string is shared, so only the second object and its __dict__ would be saved
+    assert reals["saved"] == sys.getsizeof(graph[1]) + sys.getsizeof(vars(graph[1]))
+    assert profile.duplicates["RealBounds"]["distinct"] == 1
+    assert profile.duplicates["RealBounds"]["saved"] > 0
+    assert profile.duplicates["units"]["objects"] >= 1
+    # The strings built at runtime are distinct objects with the same content
+    assert profile.duplicates["strings"]["saved"] >= sys.getsizeof("abcd")
+    assert profile.classes["_Slotted"]["count"] == 1
+    assert profile.classes["list"]["count"] == 1
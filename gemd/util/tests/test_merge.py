@@ -0,0 +1,91 @@
+"""Test merging graphs and contexts that share entities."""
+from gemd.demo.cake import make_cake
+from gemd.entity.link_by_uid import LinkByUID
+from gemd.entity.object import ProcessRun, MaterialRun, IngredientRun, MeasurementRun
+from gemd.json import GEMDJson
+from gemd.util import merge, diff
+from gemd.util._graph import walk
+
+
+def test_merge_graphs():
+    """Test that separately loaded copies of the same entities are unified."""
+    encoder = GEMDJson()
+    first, second = make_cake(seed=1), make_cake(seed=2)
+    total = len(list(walk([encoder.copy(first), encoder.copy(second)])))
+    graphs = [encoder.copy(first), encoder.copy(second), encoder.copy(first)]
+
+    result = merge(*graphs)
+    assert not result.conflicts
+    assert len(result.entities) < total
+    assert len(list(walk(result.objects))) == len(result.entities)
+    cake, other, again = result.objects
+    assert again is cake
+    assert cake.template is other.template
+    assert cake.spec is other.spec
+    assert not diff(first, cake)
+
+    for entity in result.entities:
+        if isinstance(entity, MaterialRun) and entity.process is not None:
+            assert entity.process.output_material is entity
+        if isinstance(entity, IngredientRun):
+            assert sum(x is entity for x in entity.process.ingredients) == 1
+
+
+def test_merge_contexts():
+    """Test that links between contexts are resolved, in either order."""
+    encoder = GEMDJson()
+    process = ProcessRun("process", uids={"id": "process"})
+    material = MaterialRun("material", process=process, uids={"id": "material"})
+    contexts = [encoder.raw_loads(encoder.dumps(x))["context"] for x in [material, process]]
+    assert isinstance(contexts[0][1].process, LinkByUID)
+
+    result = merge([contexts[0][1]], [contexts[1][0]])
+    merged_material, = result.objects[0]
+    merged_process, = result.objects[1]
+    assert merged_material.process is merged_process
+    assert merged_process.output_material is merged_material
+    assert result.entities == [merged_material, merged_process]
+
+
+def test_conflicts():
+    """Test that duplicates that disagree are reported, and their uids are merged."""
+    process = ProcessRun("process", uids={"id": "process"})
+    material = MaterialRun("material", process=process, uids={"id": "material"})
+    duplicate = MaterialRun("renamed", uids={"ID": "material", "other": "1"})
+    conflicting = MaterialRun("material", process=process, uids={"id": "material", "x": "y"})
+    material.add_uid("x", "z")
+
+    result = merge(material, [duplicate, conflicting])
+    assert result.objects == [material, [material, material]]
+    assert material.uids == {"id": "material", "x": "z", "other": "1"}
+    # conflicting is found first, as the output material of material's process
+    assert [(x.old, x.new, sorted(x.fields)) for x in result.conflicts] == [
+        (material, conflicting, ["uids"]),
+        (material, duplicate, ["name", "process"]),
+    ]
+    assert process.output_material is material
+    # Links to the uid of a duplicate that conflicts with the canonical entity are left alone
+    link = LinkByUID("x", "y")
+    assert merge(material, link).objects[1] is link
+    assert merge(material, LinkByUID("OTHER", "1")).objects[1] is material
+
+
+def test_inverse_links():
+    """Test that the canonical entity takes a duplicate's place in inverse links."""
+    material = MaterialRun("material", uids={"id": "material"})
+    canonical = MeasurementRun("measurement", material=material, uids={"id": "measurement"})
+    material.measurements.remove(canonical)  # As if it had been lost, e.g. by a bad merge
+    duplicate = MeasurementRun("measurement", material=material, uids={"id": "measurement"})
+    assert material.measurements == [duplicate]
+
+    result = merge(canonical)
+    assert material.measurements == [canonical]
+    assert material.measurements[0] is canonical
+    assert repr(result) == "<MergeResult: 2 entities, 0 conflicts>"
+
+    # A duplicate that the canonical entity does not share a link with is dropped
+    other = MaterialRun("other", uids={"id": "other"})
+    stray = MeasurementRun("measurement", material=other, uids={"id": "measurement"})
+    merge(canonical, other)
+    assert other.measurements == []
+    assert stray.material is other
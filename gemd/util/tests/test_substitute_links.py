@@ -6,9 +6,11 @@ Focuses in particular on the edge cases that the client doesn't test.
 import pytest
 from uuid import uuid4
 
-from gemd.util.impl import substitute_links
+from gemd.util.impl import substitute_links, substitute_objects
+from gemd.entity.attribute import Condition
 from gemd.entity.link_by_uid import LinkByUID
 from gemd.entity.object import MeasurementRun, MaterialRun, ProcessRun, ProcessSpec
+from gemd.entity.value import NominalReal
 
 
 def test_substitution_without_id():
@@ -73,3 +75,55 @@ def test_object_key_substitution():
     for key, value in subbed.items():
         assert key == LinkByUID.from_entity(run2)
         assert value == LinkByUID.from_entity(spec, name='auto')
+
+
+def test_inplace_substitution():
+    """Test that in-place substitution gives the same result as a copy, without copying."""
+    mat = MaterialRun("A material", uids={"id": str(uuid4())})
+    meas = MeasurementRun("A measurement", material=mat, uids={"id": str(uuid4())})
+    copied = substitute_links(meas)
+    assert copied is not meas
+
+    subbed = substitute_links(meas, inplace=True)
+    assert subbed is meas
+    assert meas.material == LinkByUID.from_entity(mat)
+    assert meas == copied
+    assert mat.measurements == [], "The material should no longer point to the measurement"
+
+    with pytest.raises(ValueError):
+        substitute_links([MaterialRun("no id")], inplace=True)
+
+
+def test_inplace_containers():
+    """Test that in-place substitution rebuilds tuples and replaces dict keys."""
+    mat = MaterialRun("A material", uids={"id": "mat"})
+    link = LinkByUID.from_entity(mat)
+    index = {("id", "mat"): mat}
+
+    container = {"pair": (link, "unchanged"), "same": ("no", "links")}
+    same = container["same"]
+    assert substitute_objects(container, index, inplace=True) is container
+    assert container["pair"] == (mat, "unchanged")
+    assert container["pair"][0] is mat
+    assert container["same"] is same, "Tuples without substitutions are kept"
+
+    keyed = {link: "value", "other": link}
+    substitute_objects(keyed, index, inplace=True)
+    assert list(keyed.items()) == [("other", mat), (mat, "value")]
+    assert all(x is mat for x in keyed if not isinstance(x, str))
+
+
+def test_copy_preserves_sharing():
+    """Test that the copy keeps the class of the root, and objects referenced twice."""
+    class MyProcessRun(ProcessRun):
+        pass
+
+    process = MyProcessRun("A process", uids={"id": str(uuid4())})
+    copied = substitute_links(process)
+    assert isinstance(copied, MyProcessRun) and copied is not process
+    assert copied == process
+
+    value = NominalReal(1, "")
+    conditions = substitute_links([Condition("a", value=value), Condition("b", value=value)])
+    assert conditions[0].value == value and conditions[0].value is not value
+    assert conditions[0].value is conditions[1].value
@@ -53,3 +53,30 @@ def test_recursive_foreach():
 
     for ent in [param_template, meas_template, measurement]:
         assert new_tag in ent.tags
+
+
+def test_inplace_substitution():
+    """substitute_objects(inplace=True) should link the objects it is given, via their setters."""
+    proc = ProcessRun("A process", uids={'id': '123'})
+    mat = MaterialRun("A material", uids={'id': '456'}, process=LinkByUID('id', '123'))
+    param_template = ParameterTemplate("a param template", bounds=RealBounds(0, 100, ''),
+                                       uids={'id': '789'})
+    spec = MeasurementSpec("A spec",
+                           parameters=Parameter("a param", template=LinkByUID('ID', '789')))
+    index = {('id', '123'): proc, ('id', '456'): mat, ('id', '789'): param_template}
+
+    assert substitute_objects(mat, index, inplace=True) is mat
+    assert mat.process is proc
+    assert proc.output_material is mat  # set by the MaterialRun.process setter
+
+    params = spec.parameters
+    substitute_objects(spec, index, inplace=True)
+    assert spec.parameters is params
+    assert spec.parameters[0].template is param_template
+    assert spec.get_parameter(param_template) is spec.parameters[0]
+
+    container = {LinkByUID('id', '123'): [LinkByUID('id', '456')], 'key': (LinkByUID('id', 'x'),)}
+    assert substitute_objects(container, index, inplace=True) is container
+    assert container[proc] == [mat]
+    assert isinstance(container['key'][0], LinkByUID)
+    assert substitute_objects(LinkByUID('id', '123'), index, inplace=True) is proc
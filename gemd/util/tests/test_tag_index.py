@@ -0,0 +1,64 @@
+"""Test the inverted index of entities by tag and name."""
+import pytest
+
+from gemd.demo.cake import make_cake
+from gemd.entity.change_tracker import ChangeTracker
+from gemd.entity.object import MaterialRun, ProcessRun
+from gemd.json import GEMDJson
+from gemd.util import TagIndex
+
+
+def test_queries():
+    """Test hierarchical tag queries, name queries and their combinations."""
+    cake = MaterialRun("cake", tags=["dessert::baked::cake", "color::brown"])
+    cookie = MaterialRun("cookie", tags=["dessert::baked::cookie", "color::brown"])
+    pudding = MaterialRun("pudding", tags=["dessert::chilled", "dessert::baked"])
+    other = ProcessRun("cake", tags=["dessert::bakedgoods"])
+    index = TagIndex([cake, cookie, pudding, other])
+    assert len(index) == 4
+    assert cookie in index
+
+    assert index.tagged("dessert::baked") == {cake, cookie, pudding}
+    assert index.tagged("dessert::baked", exact=True) == {pudding}
+    assert index.tagged("dessert") == {cake, cookie, pudding, other}
+    assert index.tagged("dessert::bake") == set()
+    assert index.tagged_all("dessert::baked", "color") == {cake, cookie}
+    assert index.tagged_all("color::brown", "dessert::chilled") == set()
+    assert index.tagged_all() == set()
+    assert index.tagged_any("dessert::chilled", "dessert::baked::cake") == {cake, pudding}
+    assert index.named("cake") == {cake, other}
+    assert index.named("cake", "cookie") & index.tagged("dessert::baked") == {cake, cookie}
+    assert "color::brown" in index.tags
+
+    # Results are copies
+    index.tagged("color").clear()
+    assert index.tagged("color") == {cake, cookie}
+
+
+def test_maintenance():
+    """Test that the index can be kept up to date."""
+    cake = make_cake(seed=5)
+    context = GEMDJson().raw_loads(GEMDJson().dumps(cake))["context"]
+    index = TagIndex(context)
+    assert len(index) == len(context)
+    frosting = index.named("Frosting")
+    assert frosting and all(x in context for x in frosting)
+
+    material, = {x for x in index.named("Cake") & index.tagged("iced") if x.typ == "material_run"}
+    tracker = ChangeTracker()
+    with tracker:
+        material.tags = ["cake::complete::iced"]
+        material.name = "Iced Cake"
+        added = MaterialRun("Spare Cake", tags=["cake"])
+    index.update(*tracker.modified)
+    assert index.named("Iced Cake") == {material}
+    assert material not in index.named("Cake")
+    assert material not in index.tagged("iced")
+    assert index.tagged("cake::complete") >= {material}
+    assert added in index.tagged("cake")
+
+    index.remove(material)
+    assert material not in index
+    assert material not in index.tagged("cake::complete")
+    with pytest.raises(KeyError):
+        index.remove(material)
@@ -0,0 +1,123 @@
+"""Test the index of template usage."""
+from gemd.demo.cake import make_cake
+from gemd.entity.attribute import Property
+from gemd.entity.bounds import RealBounds
+from gemd.entity.link_by_uid import LinkByUID
+from gemd.entity.object import MaterialRun, MaterialSpec, ProcessRun
+from gemd.entity.template import MaterialTemplate, PropertyTemplate
+from gemd.entity.value import NominalReal
+from gemd.json import GEMDJson
+from gemd.util import TemplateIndex, recursive_foreach
+
+
+def _entities(obj):
+    """Get every entity in a graph."""
+    found = {}
+    recursive_foreach(obj, lambda x: found.setdefault(id(x), x))
+    return list(found.values())
+
+
+def _scan(entities, template):
+    """Find the properties that reference a template the slow way."""
+    found = []
+    for entity in entities:
+        for attribute in getattr(entity, "properties", []):
+            attribute = getattr(attribute, "property", attribute)  # PropertyAndConditions
+            if isinstance(attribute, Property) and attribute.template is template:
+                found.append(attribute)
+    return found
+
+
+def test_index_while_loading():
+    """Test that an index passed to GEMDJson covers everything that is loaded."""
+    index = TemplateIndex()
+    encoder = GEMDJson(template_index=index)
+    assert encoder.template_index is index
+    cake = encoder.copy(make_cake(seed=42))
+    entities = _entities(cake)
+
+    tastiness = next(x for x in entities if x.name == "Tastiness")
+    found = index.attributes(tastiness)
+    assert found
+    assert {id(x) for x in found} == {id(x) for x in _scan(entities, tastiness)}
+    assert {id(x) for x in index.attributes(LinkByUID.from_entity(tastiness))} == \
+        {id(x) for x in found}
+    scope, uid = next(iter(tastiness.uids.items()))
+    assert {id(x) for x in index.attributes((scope.upper(), uid))} == \
+        {id(x) for x in found}
+
+    dessert = next(x for x in entities if x.name == "Dessert")
+    assert {x.name for x in index.object_templates(tastiness)} == {"Dessert", "Taste test"}
+    objects = index.objects(dessert)
+    specs = [x for x in entities if isinstance(x, MaterialSpec) and x.template is dessert]
+    runs = [x for x in entities if isinstance(x, MaterialRun) and x.spec in specs]
+    assert specs and runs
+    assert {id(x) for x in objects} == {id(x) for x in specs + runs}
+    taste_test = [x for x in index.objects(tastiness) if x.template.name == "Taste test"]
+    assert taste_test
+    assert {id(x) for x in index.objects(tastiness)} == {id(x) for x in objects + taste_test}
+
+    assert index.attributes(("missing", "template")) == []
+    assert index.objects(("missing", "template")) == []
+
+
+def test_references_and_aliases():
+    """Test that templates are matched by any of their uids, before or after they are added."""
+    template = PropertyTemplate("density", bounds=RealBounds(0, 10, ""),
+                                uids={"a": "1", "b": "2"})
+    material_template = MaterialTemplate("thing", properties=[LinkByUID("b", "2")],
+                                         uids={"a": "3"})
+    spec = MaterialSpec("spec", template=LinkByUID("a", "3"), uids={"a": "4"})
+    run = MaterialRun("run", spec=LinkByUID("a", "4"))
+    prop = Property("density", value=NominalReal(1, ""), template=LinkByUID("a", "1"))
+
+    index = TemplateIndex()
+    for obj in [prop, run, spec, material_template, template, ProcessRun("ignored")]:
+        index.add(obj)
+
+    # Querying by the uid the references used, or through the template's other uids
+    assert index.attributes(template) == [prop]
+    assert index.attributes(LinkByUID("b", "2")) == [prop]
+    assert index.object_templates(("A", "1")) == [material_template]
+    assert index.objects(template) == [spec, run]
+    assert index.objects(material_template) == [spec, run]
+
+    other = TemplateIndex()
+    other.add(Property("density", value=NominalReal(2, ""), template=template))
+    index.update(other)
+    assert len(index.attributes(template)) == 2
+
+
+def test_loads_batch():
+    """Test that the indices built by each worker are combined."""
+    encoder = GEMDJson()
+    cake = make_cake(seed=42)
+    docs = encoder.dumps_batch([cake])
+
+    index = TemplateIndex()
+    _, loaded = GEMDJson(template_index=index).loads_batch(docs, workers=1)
+    entities = _entities(loaded)
+    tastiness = next(x for x in entities if x.name == "Tastiness")
+    assert {id(x) for x in index.attributes(tastiness)} == \
+        {id(x) for x in _scan(entities, tastiness)}
+
+
+def test_loads_batch_duplicates():
+    """Test that a template duplicated across documents is indexed once, as it is returned."""
+    density = PropertyTemplate("density", uids={"id": "density"},
+                               bounds=RealBounds(0, 10, "g/cm^3"))
+    template = MaterialTemplate("material", uids={"id": "template"}, properties=[density])
+    docs = [GEMDJson().dumps(MaterialSpec(name, template=template, uids={"id": name}))
+            for name in ("first", "second")]
+
+    index = TemplateIndex()
+    first, second = GEMDJson(template_index=index).loads_batch(docs, workers=1)
+    assert first.template is second.template
+    assert index.object_templates(density) == [first.template]
+    assert index.objects(template) == [first, second]
+
+    # A single document is indexed the same way as it is loaded
+    single = TemplateIndex()
+    spec = GEMDJson(template_index=single).loads(docs[0])
+    assert single.object_templates(density) == [spec.template]
+    assert single.objects(template) == [spec]
@@ -41,7 +41,7 @@ setup(name='gemd',
       description="Python binding for Citrine's GEMD data model",
       author='Max Hutchinson',
       author_email='maxhutch@citrine.io',
-      packages=find_packages(),
+      packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
       package_data={
           'gemd': [
               'demo/strehlow_and_cook.pif',